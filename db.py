@@ -1,15 +1,38 @@
 # db.py
+import hashlib
 import sqlite3
+import time
+import zlib
 from pathlib import Path
 
+try:  # optional: smaller + faster than zlib for description text
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # Keep jobs.db inside ./state so GitHub Actions can persist it as an artifact
 STATE_DIR = Path("state")
 STATE_DIR.mkdir(exist_ok=True)
 DB = STATE_DIR / "jobs.db"
 
+# outbox retry schedule: 5 min, 10 min, 20 min ... capped at 6 h; dead after 20 tries
+OUTBOX_BACKOFF_BASE = 300
+OUTBOX_BACKOFF_MAX = 6 * 3600
+OUTBOX_MAX_ATTEMPTS = 20
+# a send still running when the run settles the outbox may yet deliver: not retried for this long
+OUTBOX_INFLIGHT_HOLD = 6 * 3600
 
-def get_conn():
-    conn = sqlite3.connect(DB)
+
+def norm_key(s) -> str:
+    """Normalized company/source key; must match lower(trim(x)) used in migrations."""
+    return (s or "").strip().lower()
+
+
+# ---------------- schema migrations ----------------
+# Each step runs once, in order, inside a transaction; PRAGMA user_version records
+# how many have been applied. Append new steps, never edit applied ones.
+
+def _m1_base(conn):
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS jobs (
@@ -25,22 +48,294 @@ def get_conn():
         )
         """
     )
-    return conn
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY,
+            job_id TEXT NOT NULL,
+            channel TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            attempts INTEGER DEFAULT 0,
+            next_attempt_at REAL DEFAULT 0,
+            sent_at TEXT,
+            last_error TEXT,
+            UNIQUE (job_id, channel)
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (channel, sent_at, next_attempt_at)")
 
 
-def insert_if_new(conn, job):
+def _m2_history(conn):
     """
-    Insert a job if not already present.
-    Returns True if inserted (new job), False if duplicate.
+    Rebuild jobs with a stable integer key (seq) plus first_seen/last_seen and
+    normalized company/source columns, then index them and add full-text search.
     """
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}
+    seen = "COALESCE(inserted_at, CURRENT_TIMESTAMP)" if "inserted_at" in cols else "CURRENT_TIMESTAMP"
+    conn.execute(
+        """
+        CREATE TABLE jobs_new (
+            seq INTEGER PRIMARY KEY,
+            id TEXT NOT NULL UNIQUE,
+            title TEXT,
+            company TEXT,
+            location TEXT,
+            remote INTEGER,
+            url TEXT,
+            posted_at TEXT,
+            description TEXT,
+            source TEXT,
+            company_norm TEXT,
+            source_norm TEXT,
+            first_seen TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_seen TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO jobs_new (id, title, company, location, remote, url, posted_at, description, source,
+                              company_norm, source_norm, first_seen, last_seen)
+        SELECT id, title, company, location, remote, url, posted_at, description, source,
+               lower(trim(company)), lower(trim(source)), {seen}, {seen}
+        FROM jobs WHERE id IS NOT NULL
+        """
+    )
+    conn.execute("DROP TABLE jobs")
+    conn.execute("ALTER TABLE jobs_new RENAME TO jobs")
+    conn.execute("CREATE INDEX jobs_company_seen ON jobs (company_norm, first_seen)")
+    conn.execute("CREATE INDEX jobs_source_seen ON jobs (source_norm, first_seen)")
+    conn.execute("CREATE INDEX jobs_first_seen ON jobs (first_seen)")
+    conn.execute("CREATE INDEX jobs_last_seen ON jobs (last_seen)")
+
+    # contentless FTS: only the index is stored (text already lives in jobs),
+    # rowid = jobs.seq; insert_if_new keeps it in sync
     try:
         conn.execute(
+            "CREATE VIRTUAL TABLE jobs_fts USING fts5("
+            "title, description, content='', tokenize='unicode61 remove_diacritics 2')"
+        )
+        conn.execute("INSERT INTO jobs_fts (rowid, title, description) SELECT seq, title, description FROM jobs")
+    except sqlite3.OperationalError as e:
+        print(f"[warn] db: FTS5 unavailable ({e}); text search falls back to LIKE")
+
+
+def _m3_retention(conn):
+    conn.execute("ALTER TABLE jobs ADD COLUMN digest TEXT")
+    conn.execute("ALTER TABLE jobs ADD COLUMN description_z BLOB")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+
+def _m4_signatures(conn):
+    """Near-duplicate signatures (utils/dedupe.py), backfilled for existing postings."""
+    from utils.dedupe import signature
+    conn.execute(
+        """
+        CREATE TABLE job_sigs (
+            job_id TEXT PRIMARY KEY,
+            group_key TEXT NOT NULL,
+            simhash INTEGER NOT NULL,
+            dup_of TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX job_sigs_group ON job_sigs (group_key)")
+    rows = conn.execute(
+        "SELECT id, title, company, description, description_z FROM jobs WHERE digest IS NULL"
+    ).fetchall()
+    conn.executemany(
+        "INSERT INTO job_sigs (job_id, group_key, simhash) VALUES (?, ?, ?)",
+        [(jid, *signature({"title": t, "company": c, "description": job_description(d, dz)}))
+         for jid, t, c, d, dz in rows],
+    )
+
+
+def _m5_org_health(conn):
+    conn.execute(
+        """
+        CREATE TABLE org_health (
+            key TEXT PRIMARY KEY,
+            consecutive_failures INTEGER DEFAULT 0,
+            last_error TEXT,
+            last_error_at TEXT,
+            last_ok_at TEXT,
+            open_until REAL DEFAULT 0,
+            latencies TEXT
+        )
+        """
+    )
+
+
+def _m6_scheduling(conn):
+    # expected yield (EWMA of new matches per fetch) and leftovers of a run that hit its deadline
+    conn.execute("ALTER TABLE org_health ADD COLUMN yield_rate REAL DEFAULT 0")
+    conn.execute("ALTER TABLE org_health ADD COLUMN deferred INTEGER DEFAULT 0")
+
+
+def _m7_profiles(conn):
+    # seen-state per filter profile; everything seen so far belonged to the single default profile
+    conn.execute(
+        """
+        CREATE TABLE profile_seen (
+            profile TEXT NOT NULL,
+            job_id TEXT NOT NULL,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (profile, job_id)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute("INSERT INTO profile_seen (profile, job_id, first_seen) SELECT 'default', id, first_seen FROM jobs")
+
+
+def _m8_live_sets(conn):
+    # closed-posting detection: per-org live id sets and a hash column to map them back to jobs
+    from utils.livesets import id_hash
+    conn.execute("ALTER TABLE jobs ADD COLUMN id_hash INTEGER")
+    conn.execute("ALTER TABLE jobs ADD COLUMN closed_at TIMESTAMP")
+    rows = conn.execute("SELECT seq, id FROM jobs WHERE id IS NOT NULL").fetchall()
+    conn.executemany("UPDATE jobs SET id_hash = ? WHERE seq = ?", [(id_hash(i), seq) for seq, i in rows])
+    conn.execute("CREATE INDEX idx_jobs_id_hash ON jobs(id_hash)")
+    conn.execute(
+        """
+        CREATE TABLE live_sets (
+            key TEXT PRIMARY KEY,
+            ids BLOB NOT NULL,
+            size INTEGER DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def _m9_sync(conn):
+    # incremental state sync: rows changed since the last export, and deltas already applied
+    conn.execute(
+        """
+        CREATE TABLE sync_dirty (
+            tbl TEXT NOT NULL,
+            pk TEXT NOT NULL,
+            light INTEGER DEFAULT 0,
+            PRIMARY KEY (tbl, pk)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE sync_applied (
+            name TEXT PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+MIGRATIONS = [
+    _m1_base, _m2_history, _m3_retention, _m4_signatures, _m5_org_health, _m6_scheduling, _m7_profiles,
+    _m8_live_sets, _m9_sync,
+]
+
+
+def migrate(conn, quiet=False):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for i, step in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.execute("BEGIN")
+        try:
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {i}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        if not quiet:
+            print(f"[db] applied migration {i}: {step.__name__}")
+
+
+def has_fts(conn) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'jobs_fts'").fetchone() is not None
+
+
+def get_conn():
+    conn = sqlite3.connect(DB, timeout=30)
+    # WAL: readers (main.py serve) never block the run's writes, and vice versa
+    conn.execute("PRAGMA journal_mode = WAL")
+    migrate(conn)
+    return conn
+
+
+def get_read_conn(path=DB):
+    """Read-only connection (no migrations, no writes) usable from any thread."""
+    conn = sqlite3.connect(f"file:{Path(path).resolve()}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA query_only = 1")
+    return conn
+
+
+def get_shard_conn():
+    """
+    For a shard run, which only reads org health: jobs.db read-only, or an
+    empty in-memory database while jobs.db is missing or behind on migrations
+    (`merge` brings it up to date). Shards running in parallel never write it.
+    """
+    if DB.exists():
+        conn = get_read_conn()
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+            return conn
+        conn.close()
+    print("[shard] jobs.db missing or not migrated yet; fetching without org health")
+    conn = sqlite3.connect(":memory:")
+    migrate(conn, quiet=True)
+    return conn
+
+
+def find_near_duplicate(conn, sig, max_distance=3, window_days=30):
+    """
+    Id of an earlier posting with the same group key whose SimHash is within
+    `max_distance` bits, following dup_of to the original. None if the posting
+    is unique. Only postings still open and seen in the last `window_days` are
+    candidates (a re-opened role is news again), and a posting without a
+    description (SimHash 0) is never called a copy. Index lookup on group_key.
+    """
+    from utils.dedupe import hamming
+    gkey, h = sig
+    if not h:
+        return None
+    cutoff = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(time.time() - float(window_days) * 86400))
+    for job_id, other, dup_of in conn.execute(
+        """
+        SELECT s.job_id, s.simhash, s.dup_of FROM job_sigs s JOIN jobs j ON j.id = s.job_id
+        WHERE s.group_key = ? AND j.closed_at IS NULL AND j.last_seen >= ?
+        """,
+        (gkey, cutoff),
+    ):
+        if other and hamming(h, other) <= max_distance:
+            return dup_of or job_id
+    return None
+
+
+def record_match(conn, job, profiles, sig=None, dup_of=None):
+    """
+    Remember a job matched by one or more filter profiles ({profile: channels}),
+    in a single transaction: the job row (inserted once, else last_seen bumped),
+    each profile's seen-state and one outbox entry per channel of every profile
+    seeing it for the first time. `sig`/`dup_of` record the near-duplicate
+    signature; a profile that already saw `dup_of` gets no outbox entry.
+    Returns {profile: collapsed} for the profiles the job is new to
+    (collapsed=True when it was folded into `dup_of`).
+    """
+    from utils.livesets import id_hash
+    jid = job.get("id")
+    if dup_of == jid:
+        dup_of = None
+    fresh = {}
+    with conn:
+        cur = conn.execute(
             """
-            INSERT INTO jobs (id, title, company, location, remote, url, posted_at, description, source)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            INSERT OR IGNORE INTO jobs (id, title, company, location, remote, url, posted_at, description, source,
+                                        company_norm, source_norm, id_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
-                job.get("id"),
+                jid,
                 job.get("title"),
                 job.get("company"),
                 job.get("location"),
@@ -49,9 +344,646 @@ def insert_if_new(conn, job):
                 job.get("posted_at"),
                 job.get("description"),
                 job.get("source"),
+                norm_key(job.get("company")),
+                norm_key(job.get("source")),
+                id_hash(jid) if jid is not None else None,
             ),
         )
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        return False
+        if cur.rowcount:
+            if has_fts(conn):
+                conn.execute(
+                    "INSERT INTO jobs_fts (rowid, title, description) VALUES (?, ?, ?)",
+                    (cur.lastrowid, job.get("title"), job.get("description")),
+                )
+            if sig is not None:
+                conn.execute(
+                    "INSERT OR REPLACE INTO job_sigs (job_id, group_key, simhash, dup_of) VALUES (?, ?, ?, ?)",
+                    (jid, sig[0], sig[1], dup_of),
+                )
+        else:
+            conn.execute("UPDATE jobs SET last_seen = CURRENT_TIMESTAMP WHERE id = ?", (jid,))
+
+        for name, channels in profiles.items():
+            if not conn.execute(
+                "INSERT OR IGNORE INTO profile_seen (profile, job_id) VALUES (?, ?)", (name, jid)
+            ).rowcount:
+                continue
+            collapsed = dup_of is not None and conn.execute(
+                "SELECT 1 FROM profile_seen WHERE profile = ? AND job_id = ?", (name, dup_of)
+            ).fetchone() is not None
+            if not collapsed:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO outbox (job_id, channel) VALUES (?, ?)",
+                    [(jid, ch) for ch in channels],
+                )
+            fresh[name] = collapsed
+    return fresh
+
+
+def insert_if_new(conn, job, channels=(), sig=None, dup_of=None):
+    """
+    Single-profile form of record_match() for the default profile.
+    Returns True if the job is new to it, False if already seen (last_seen is bumped).
+    """
+    return bool(record_match(conn, job, {"default": channels}, sig=sig, dup_of=dup_of))
+
+
+def _chunks(seq, size=500):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def update_live_set(conn, key, ids, complete=True):
+    """
+    Replace the stored set of live posting ids for `key` (source:org) and diff it
+    against the previous run with one merge. Matched jobs whose id disappeared get
+    closed_at; ones that came back have it cleared. An empty listing after a
+    non-empty one looks like a broken fetch, so the stored set is left alone.
+    A listing that was cut off (`complete=False`: page cap, embedded-page
+    fallback) only proves ids present: nothing is closed, and the new ids are
+    added to the stored set instead of replacing it.
+    Returns (added, removed, closed_ids): counts cover every posting of the org,
+    closed_ids only the jobs recorded in jobs.db.
+    """
+    from utils import livesets
+    new = livesets.build(ids)
+    row = conn.execute("SELECT ids FROM live_sets WHERE key = ?", (key,)).fetchone()
+    old = livesets.unpack(row[0]) if row else None
+    if old and not new:
+        return 0, 0, []
+    added, removed = livesets.diff(old, new) if old is not None else (list(new), [])
+    if not complete:
+        removed = []
+        if old is not None:
+            new = livesets.union(old, new)
+
+    closed = []
+    with conn:
+        for chunk in _chunks(removed):
+            marks = ",".join("?" * len(chunk))
+            closed.extend(r[0] for r in conn.execute(
+                f"SELECT id FROM jobs WHERE id_hash IN ({marks}) AND closed_at IS NULL", chunk
+            ))
+            conn.execute(
+                f"UPDATE jobs SET closed_at = CURRENT_TIMESTAMP WHERE id_hash IN ({marks}) AND closed_at IS NULL",
+                chunk,
+            )
+        if old is not None:
+            for chunk in _chunks(added):
+                marks = ",".join("?" * len(chunk))
+                conn.execute(
+                    f"UPDATE jobs SET closed_at = NULL WHERE id_hash IN ({marks}) AND closed_at IS NOT NULL", chunk
+                )
+        conn.execute(
+            """
+            INSERT INTO live_sets (key, ids, size, updated_at) VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (key) DO UPDATE SET ids = excluded.ids, size = excluded.size, updated_at = excluded.updated_at
+            """,
+            (key, livesets.pack(new), len(new)),
+        )
+    return len(added), len(removed), closed
+
+
+def closed_jobs(conn, ids, profile=None):
+    """Job dicts for closed ids, optionally only the ones `profile` was notified about."""
+    out = []
+    ids = list(ids)
+    for chunk in _chunks(ids):
+        marks = ",".join("?" * len(chunk))
+        sql = f"SELECT id, title, company, location, url FROM jobs WHERE id IN ({marks}) AND digest IS NULL"
+        args = list(chunk)
+        if profile is not None:
+            sql += " AND id IN (SELECT job_id FROM profile_seen WHERE profile = ?)"
+            args.append(profile)
+        for job_id, title, company, location, url in conn.execute(sql, args):
+            out.append({"id": job_id, "title": title, "company": company, "location": location, "url": url})
+    return out
+
+
+def _job_filters(conn, text=None, company=None, source=None, since=None, until=None, profile=None, status=None):
+    """WHERE terms + args over `jobs j` shared by search_jobs() and page_jobs()."""
+    where, args = [], []
+    if text:
+        if has_fts(conn):
+            where.append("j.seq IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+            args.append(text)
+        else:
+            where.append("(j.title LIKE ? OR j.description LIKE ?)")
+            args += [f"%{text}%", f"%{text}%"]
+    if company:
+        where.append("j.company_norm = ?")
+        args.append(norm_key(company))
+    if source:
+        where.append("j.source_norm = ?")
+        args.append(norm_key(source))
+    if since:
+        where.append("j.first_seen >= ?")
+        args.append(since)
+    if until:
+        where.append("j.first_seen < ?")
+        args.append(until)
+    if profile:
+        where.append("j.id IN (SELECT job_id FROM profile_seen WHERE profile = ?)")
+        args.append(profile)
+    if status == "open":
+        where.append("j.closed_at IS NULL")
+    elif status == "closed":
+        where.append("j.closed_at IS NOT NULL")
+    return where, args
+
+
+def search_jobs(conn, text=None, company=None, source=None, since=None, until=None, limit=50):
+    """
+    Query historical postings, newest first. `text` is an FTS5 query over
+    title/description; company/source match the normalized columns; since/until
+    bound first_seen ("YYYY-MM-DD" or "YYYY-MM-DD HH:MM:SS").
+    """
+    where, args = _job_filters(conn, text, company, source, since, until)
+    sql = (
+        "SELECT j.id, j.title, j.company, j.location, j.url, j.source, j.first_seen, j.last_seen FROM jobs j"
+        + (" WHERE " + " AND ".join(where) if where else "")
+        + " ORDER BY j.first_seen DESC LIMIT ?"
+    )
+    keys = ("id", "title", "company", "location", "url", "source", "first_seen", "last_seen")
+    return [dict(zip(keys, row)) for row in conn.execute(sql, args + [int(limit)])]
+
+
+PAGE_KEYS = (
+    "id", "title", "company", "location", "remote", "url", "source", "posted_at", "first_seen", "last_seen",
+    "closed_at",
+)
+
+
+def page_jobs(conn, after=None, limit=50, **filters):
+    """
+    One page of postings, newest first, for the read API. Keyset pagination on
+    (first_seen, seq) (the jobs_first_seen index already orders by both): `after`
+    is the previous page's last (first_seen, seq), so every page is one index
+    range scan however deep it is. Filters as _job_filters(); aged-out rows
+    (text already dropped) are skipped. Returns (rows, next_after or None).
+    """
+    where, args = _job_filters(conn, **filters)
+    where.append("j.digest IS NULL")
+    if after is not None:
+        where.append("(j.first_seen, j.seq) < (?, ?)")
+        args += list(after)
+    cols = ", ".join(f"j.{k}" for k in PAGE_KEYS)
+    sql = (
+        f"SELECT {cols}, j.seq FROM jobs j WHERE " + " AND ".join(where)
+        + " ORDER BY j.first_seen DESC, j.seq DESC LIMIT ?"
+    )
+    rows = conn.execute(sql, args + [int(limit) + 1]).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    out = []
+    for row in rows:
+        item = dict(zip(PAGE_KEYS, row))
+        item["remote"] = bool(item["remote"])
+        out.append(item)
+    next_after = (rows[-1][PAGE_KEYS.index("first_seen")], rows[-1][-1]) if more else None
+    return out, next_after
+
+
+def outbox_pending(conn, channel, now=None):
+    """Return [(outbox_id, job_dict)] due for (re)delivery on `channel`, oldest first."""
+    now = time.time() if now is None else now
+    cur = conn.execute(
+        """
+        SELECT o.id, j.id, j.title, j.company, j.location, j.remote, j.url, j.posted_at, j.source
+        FROM outbox o JOIN jobs j ON j.id = o.job_id
+        WHERE o.channel = ? AND o.sent_at IS NULL AND o.next_attempt_at <= ? AND o.attempts < ?
+        ORDER BY o.id
+        """,
+        (channel, now, OUTBOX_MAX_ATTEMPTS),
+    )
+    keys = ("id", "title", "company", "location", "remote", "url", "posted_at", "source")
+    return [(row[0], dict(zip(keys, row[1:]))) for row in cur]
+
+
+def outbox_ids(conn, channel, job_ids):
+    """Outbox ids of `job_ids` on `channel` that are still unsent."""
+    job_ids = list(job_ids)
+    out = []
+    for i in range(0, len(job_ids), 500):
+        chunk = job_ids[i:i + 500]
+        marks = ",".join("?" * len(chunk))
+        out += [r[0] for r in conn.execute(
+            f"SELECT id FROM outbox WHERE channel = ? AND sent_at IS NULL AND job_id IN ({marks})",
+            [channel, *chunk],
+        )]
+    return out
+
+
+def outbox_mark_sent(conn, ids):
+    with conn:
+        conn.executemany(
+            "UPDATE outbox SET sent_at = CURRENT_TIMESTAMP, last_error = NULL WHERE id = ?",
+            [(i,) for i in ids],
+        )
+
+
+def outbox_mark_failed(conn, ids, error="", now=None):
+    """Bump attempts and push next_attempt_at out exponentially."""
+    now = time.time() if now is None else now
+    with conn:
+        conn.executemany(
+            """
+            UPDATE outbox
+            SET attempts = attempts + 1,
+                next_attempt_at = ? + MIN(?, ? * (1 << MIN(attempts, 16))),
+                last_error = ?
+            WHERE id = ?
+            """,
+            [(now, OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE, str(error)[:500], i) for i in ids],
+        )
+
+
+def outbox_mark_inflight(conn, ids, now=None):
+    """Still unsent, no attempt counted, but not due again for OUTBOX_INFLIGHT_HOLD seconds."""
+    now = time.time() if now is None else now
+    with conn:
+        conn.executemany(
+            "UPDATE outbox SET next_attempt_at = ?, last_error = 'in flight' WHERE id = ? AND sent_at IS NULL",
+            [(now + OUTBOX_INFLIGHT_HOLD, i) for i in ids],
+        )
+
+
+# ---------------- retention / compaction ----------------
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compress_text(text: str) -> bytes:
+    data = (text or "").encode("utf-8")
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+
+def decompress_text(blob) -> str:
+    if not blob:
+        return ""
+    blob = bytes(blob)
+    if blob[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("description was zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob).decode("utf-8")
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def job_description(description, description_z) -> str:
+    """Plain description of a jobs row, whichever column it is stored in."""
+    return description if description is not None else decompress_text(description_z)
+
+
+def _digest(title, company, location, url, description) -> str:
+    raw = "|".join(x or "" for x in (title, company, location, url, description))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def get_meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else default
+
+
+def set_meta(conn, key, value):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+
+def compact(conn, retention_days=90, compress=False, vacuum_every_days=7, now=None):
+    """
+    Keep state/jobs.db small enough to upload every run:
+      - postings not seen for `retention_days` keep only id, digest, company/source
+        and timestamps (enough to stay deduplicated); text and FTS entries go
+      - live id sets of orgs not fetched for `retention_days` are dropped
+      - optionally move remaining descriptions into compressed description_z
+      - reclaim free pages every run, full VACUUM every `vacuum_every_days`
+    """
+    now = time.time() if now is None else now
+    cutoff = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(now - int(retention_days) * 86400))
+    fts = has_fts(conn)
+
+    old = conn.execute(
+        """
+        SELECT seq, id, title, company, location, url, description, description_z
+        FROM jobs WHERE last_seen < ? AND digest IS NULL
+        """,
+        (cutoff,),
+    ).fetchall()
+    with conn:
+        for seq, job_id, title, company, location, url, desc, desc_z in old:
+            desc = job_description(desc, desc_z)
+            if fts:
+                conn.execute(
+                    "INSERT INTO jobs_fts (jobs_fts, rowid, title, description) VALUES ('delete', ?, ?, ?)",
+                    (seq, title, desc),
+                )
+            conn.execute(
+                """
+                UPDATE jobs SET title = NULL, location = NULL, url = NULL, posted_at = NULL,
+                                description = NULL, description_z = NULL, digest = ?
+                WHERE seq = ?
+                """,
+                (_digest(title, company, location, url, desc), seq),
+            )
+        conn.execute(
+            "DELETE FROM outbox WHERE created_at < ? AND (sent_at IS NOT NULL OR job_id IN "
+            "(SELECT id FROM jobs WHERE digest IS NOT NULL))",
+            (cutoff,),
+        )
+        conn.execute("DELETE FROM job_sigs WHERE job_id IN (SELECT id FROM jobs WHERE digest IS NOT NULL)")
+        conn.execute("DELETE FROM live_sets WHERE updated_at < ?", (cutoff,))  # orgs no longer fetched
+
+    packed = 0
+    if compress:
+        rows = conn.execute("SELECT seq, description FROM jobs WHERE description IS NOT NULL").fetchall()
+        with conn:
+            conn.executemany(
+                "UPDATE jobs SET description_z = ?, description = NULL WHERE seq = ?",
+                [(compress_text(d), seq) for seq, d in rows],
+            )
+        packed = len(rows)
+
+    # auto_vacuum=INCREMENTAL only takes effect after one full VACUUM
+    needs_mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2
+    last = float(get_meta(conn, "last_vacuum", 0) or 0)
+    if needs_mode or now - last >= int(vacuum_every_days) * 86400:
+        if fts:  # fold FTS delete markers into the index before rewriting the file
+            with conn:
+                conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')")
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+        set_meta(conn, "last_vacuum", int(now))
+        vacuumed = "full"
+    else:
+        conn.execute("PRAGMA incremental_vacuum")
+        vacuumed = "incremental"
+
+    print(f"[db] compact: {len(old)} aged out, {packed} descriptions compressed, {vacuumed} vacuum")
+    return len(old), packed
+
+
+# ---------------- incremental sync ----------------
+# Instead of shipping the whole jobs.db every run, each run exports the rows it
+# changed as a gzip'd JSONL delta; every few runs a full checkpoint (a gzip'd
+# copy of the database) replaces the deltas it covers. restore = newest
+# checkpoint + every delta it has not applied yet (sync_applied), so deltas of
+# overlapping runs are all kept. Triggers only record *which* rows changed
+# (sync_dirty); values are read at export time, so a row touched many times is
+# exported once. An update that only bumps a "light" column (jobs.last_seen,
+# live_sets.updated_at) exports just that column.
+SYNC_DIR = STATE_DIR / "sync"
+
+# table -> (natural key, surrogate columns not exported, light columns)
+SYNC_TABLES = {
+    "jobs": (("id",), ("seq",), ("last_seen",)),
+    "outbox": (("job_id", "channel"), ("id",), ()),
+    "profile_seen": (("profile", "job_id"), (), ()),
+    "job_sigs": (("job_id",), (), ()),
+    "org_health": (("key",), (), ()),
+    "live_sets": (("key",), (), ("updated_at",)),
+    "meta": (("key",), (), ()),
+}
+
+
+def _columns(conn, table):
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def track_changes(conn, enabled=True):
+    """
+    (Re)create the change-tracking triggers, or drop them when sync is off.
+    Recreated every time so columns added by later migrations are covered.
+    """
+    with conn:
+        for table, (key, _, light) in SYNC_TABLES.items():
+            for op in ("ins", "upd", "upd_light", "del"):
+                conn.execute(f"DROP TRIGGER IF EXISTS sync_{table}_{op}")
+            if not enabled:
+                continue
+            pk = "json_array({})".format(", ".join(f"{{row}}.{k}" for k in key))
+            mark = (
+                f"INSERT INTO sync_dirty (tbl, pk, light) VALUES ('{table}', {pk}, {{light}}) "
+                "ON CONFLICT (tbl, pk) DO UPDATE SET light = light AND excluded.light"
+            )
+            conn.execute(
+                f"CREATE TRIGGER sync_{table}_ins AFTER INSERT ON {table} "
+                f"BEGIN {mark.format(row='NEW', light=0)}; END"
+            )
+            conn.execute(
+                f"CREATE TRIGGER sync_{table}_del AFTER DELETE ON {table} "
+                f"BEGIN {mark.format(row='OLD', light=0)}; END"
+            )
+            heavy = [c for c in _columns(conn, table) if c not in light]
+            same = " AND ".join(f"NEW.{c} IS OLD.{c}" for c in heavy)
+            if light:
+                conn.execute(
+                    f"CREATE TRIGGER sync_{table}_upd_light AFTER UPDATE ON {table} WHEN {same} "
+                    f"BEGIN {mark.format(row='NEW', light=1)}; END"
+                )
+            conn.execute(
+                f"CREATE TRIGGER sync_{table}_upd AFTER UPDATE ON {table} "
+                + (f"WHEN NOT ({same}) " if light else "")
+                + f"BEGIN {mark.format(row='NEW', light=0)}; END"
+            )
+
+
+def _sync_name(kind):
+    import secrets
+    return f"{kind}-{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{secrets.token_hex(3)}"
+
+
+def _encode(value):
+    if isinstance(value, (bytes, memoryview)):
+        import base64
+        return {"b64": base64.b64encode(bytes(value)).decode("ascii")}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        import base64
+        return base64.b64decode(value["b64"])
+    return value
+
+
+def export_changes(conn, sync_dir=SYNC_DIR):
+    """
+    Write the rows changed since the last export to <sync_dir>/delta-*.jsonl.gz:
+    a header line, then {"t": table, "k": key, "r": row} per row ("r": null =
+    deleted, "light": true = only the light columns). Returns the path, or None
+    when nothing changed.
+    """
+    import gzip
+    import json
+    dirty = conn.execute("SELECT tbl, pk, light FROM sync_dirty").fetchall()
+    if not dirty:
+        return None
+    sync_dir = Path(sync_dir)
+    sync_dir.mkdir(parents=True, exist_ok=True)
+    name = _sync_name("delta")
+    path = sync_dir / f"{name}.jsonl.gz"
+    tmp = path.with_name(path.name + ".part")
+
+    cols = {t: [c for c in _columns(conn, t) if c not in SYNC_TABLES[t][1]] for t in SYNC_TABLES}
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    with gzip.open(tmp, "wt", encoding="utf-8") as fh:
+        fh.write(json.dumps({"delta": name, "schema": version, "rows": len(dirty)}) + "\n")
+        for table, pk, light in dirty:
+            key, _, light_cols = SYNC_TABLES[table]
+            want = list(light_cols) if light else cols[table]
+            where = " AND ".join(f"{k} = ?" for k in key)
+            row = conn.execute(f"SELECT {', '.join(want)} FROM {table} WHERE {where}", json.loads(pk)).fetchone()
+            rec = {"t": table, "k": json.loads(pk), "r": None}
+            if row is not None:
+                rec["r"] = {c: _encode(v) for c, v in zip(want, row)}
+                if light:
+                    rec["light"] = True
+            fh.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+    tmp.replace(path)
+
+    with conn:
+        conn.executemany("DELETE FROM sync_dirty WHERE tbl = ? AND pk = ?", [(t, pk) for t, pk, _ in dirty])
+        conn.execute("INSERT OR IGNORE INTO sync_applied (name) VALUES (?)", (name,))
+    print(f"[sync] exported {len(dirty)} changed row(s) -> {path}")
+    return path
+
+
+def _apply_row(conn, table, key, row, light, fts):
+    keys, _, _ = SYNC_TABLES[table]
+    where = " AND ".join(f"{k} = ?" for k in keys)
+    old = None
+    if table == "jobs" and fts and not light:
+        old = conn.execute(
+            f"SELECT seq, title, description, description_z, digest FROM jobs WHERE {where}", key
+        ).fetchone()
+        if old and old[4] is None:
+            conn.execute(
+                "INSERT INTO jobs_fts (jobs_fts, rowid, title, description) VALUES ('delete', ?, ?, ?)",
+                (old[0], old[1], job_description(old[2], old[3])),
+            )
+
+    if row is None:
+        conn.execute(f"DELETE FROM {table} WHERE {where}", key)
+        return
+    known = set(_columns(conn, table))
+    row = {c: _decode(v) for c, v in row.items() if c in known}  # tolerate other schema versions
+    if light:
+        sets = ", ".join(f"{c} = ?" for c in row)
+        conn.execute(f"UPDATE {table} SET {sets} WHERE {where}", [*row.values(), *key])
+        return
+    row.update(zip(keys, key))
+    names = list(row)
+    updates = ", ".join(f"{c} = excluded.{c}" for c in names if c not in keys)
+    conn.execute(
+        f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"),
+        list(row.values()),
+    )
+    if table == "jobs" and fts and row.get("digest") is None:
+        seq = old[0] if old else conn.execute(f"SELECT seq FROM jobs WHERE {where}", key).fetchone()[0]
+        conn.execute(
+            "INSERT INTO jobs_fts (rowid, title, description) VALUES (?, ?, ?)",
+            (seq, row.get("title"), job_description(row.get("description"), row.get("description_z"))),
+        )
+
+
+def import_delta(conn, path):
+    """Apply one delta file (in one transaction). Returns the number of rows, or 0 if already applied."""
+    import gzip
+    import json
+    path = Path(path)
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        header = json.loads(fh.readline())
+        name = header["delta"]
+        if conn.execute("SELECT 1 FROM sync_applied WHERE name = ?", (name,)).fetchone():
+            return 0
+        fts = has_fts(conn)
+        n = 0
+        with conn:
+            for line in fh:
+                rec = json.loads(line)
+                _apply_row(conn, rec["t"], rec["k"], rec["r"], rec.get("light"), fts)
+                n += 1
+            conn.execute("INSERT INTO sync_applied (name) VALUES (?)", (name,))
+    return n
+
+
+def sync_files(sync_dir=SYNC_DIR):
+    """(newest checkpoint path or None, [delta paths oldest first])."""
+    sync_dir = Path(sync_dir)
+    checkpoints = sorted(sync_dir.glob("checkpoint-*.db.gz"))
+    return (checkpoints[-1] if checkpoints else None), sorted(sync_dir.glob("delta-*.jsonl.gz"))
+
+
+def checkpoint(conn, sync_dir=SYNC_DIR):
+    """
+    Full copy of the database as <sync_dir>/checkpoint-*.db.gz; older checkpoints
+    and the deltas it already contains are deleted. Export pending changes first.
+    """
+    import gzip
+    import shutil
+    sync_dir = Path(sync_dir)
+    sync_dir.mkdir(parents=True, exist_ok=True)
+    prev, deltas = sync_files(sync_dir)
+    applied = {r[0] for r in conn.execute("SELECT name FROM sync_applied")}
+    covered = [d for d in deltas if d.name.split(".")[0] in applied]
+
+    path = sync_dir / f"{_sync_name('checkpoint')}.db.gz"
+    raw = path.with_suffix("")  # checkpoint-*.db
+    dest = sqlite3.connect(raw)
+    try:
+        conn.backup(dest)
+    finally:
+        dest.close()
+    tmp = path.with_name(path.name + ".part")
+    with open(raw, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as out:
+        shutil.copyfileobj(src, out)
+    raw.unlink()
+    tmp.replace(path)
+
+    for old in [p for p in sync_dir.glob("checkpoint-*.db.gz") if p != path] + covered:
+        old.unlink(missing_ok=True)
+    print(f"[sync] checkpoint -> {path} (replaces {len(covered)} delta(s))")
+    return path
+
+
+def restore(db_path=DB, sync_dir=SYNC_DIR):
+    """
+    Rebuild `db_path` from the sync directory: the newest checkpoint (when there
+    is no database yet) plus every delta not applied to it. Returns the number
+    of deltas applied.
+    """
+    import gzip
+    import shutil
+    db_path = Path(db_path)
+    latest, deltas = sync_files(sync_dir)
+    if not db_path.exists() and latest is not None:
+        tmp = db_path.with_name(db_path.name + ".part")
+        with gzip.open(latest, "rb") as src, open(tmp, "wb") as out:
+            shutil.copyfileobj(src, out)
+        tmp.replace(db_path)
+        print(f"[sync] restored checkpoint {latest.name}")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        migrate(conn)
+        pending = conn.execute("SELECT tbl, pk FROM sync_dirty").fetchall()  # local changes not exported yet
+        applied = 0
+        for path in deltas:
+            try:
+                rows = import_delta(conn, path)
+            except (OSError, EOFError, ValueError, KeyError) as e:  # damaged/partial upload
+                print(f"[warn] sync: skipping {path.name}: {e}")
+                continue
+            if rows:
+                applied += 1
+                print(f"[sync] applied {path.name}: {rows} row(s)")
+        with conn:  # what was just restored is already persisted; local changes stay dirty
+            conn.execute("CREATE TEMP TABLE keep_dirty (tbl TEXT, pk TEXT)")
+            conn.executemany("INSERT INTO keep_dirty VALUES (?, ?)", pending)
+            conn.execute("DELETE FROM sync_dirty WHERE (tbl, pk) NOT IN (SELECT tbl, pk FROM keep_dirty)")
+            conn.execute("DROP TABLE keep_dirty")
+    finally:
+        conn.close()
+    return applied
@@ -1,169 +1,123 @@
 # main.py (Greenhouse + Lever + Ashby + Workday + SmartRecruiters) — hardened
 
-import os
-import yaml
+import sys
+import time
+import argparse
+import functools
+import pathlib
 from datetime import datetime
-from dotenv import load_dotenv
 
-from db import get_conn, insert_if_new
-from utils.filters import match_job
-
-# sources
-from sources.greenhouse import fetch_greenhouse
-from sources.lever import fetch_lever
-from sources.ashby import fetch_ashby
-from sources.workday import fetch_workday
-from sources.smartrec import fetch_smartrec
+from db import (
+    get_conn, get_shard_conn, record_match, find_near_duplicate, compact, update_live_set, closed_jobs,
+    outbox_pending, outbox_ids, outbox_mark_sent, outbox_mark_failed, outbox_mark_inflight,
+    track_changes, export_changes, checkpoint, restore, sync_files, DB,
+)
+from utils.config import load_config as _load_config
+from utils.filters import compile_filter
+from utils.profiles import DEFAULT, ProfileIndex, listing_filter, resolve_profiles
+from utils.scoring import Scorer, top_k
+from utils.dedupe import signature
+from utils.health import HealthTracker, error_class
+from utils.profiling import RunProfiler, parse_modes
+from utils.shards import DeltaWriter, list_deltas, parse_spec, read_delta, shard_of
+from utils.snapshots import SnapshotWriter, list_snapshots, iter_snapshot, prune_snapshots
+
+# sources (plugins are imported lazily by the registry)
+from sources.engine import fetch_all, Deferred
+from sources.boards import BoardCache
+from sources.spool import JobSpool
 
 # notify
-from notify.telegram import send_telegram
+from notify import Dispatcher, build_notifiers, dispatch
 
-TELEGRAM_MAX = 3800  # keep under Telegram's ~4096 limit with a buffer
+NOTIFY_TIMEOUT = 120  # max seconds to wait for queued messages at the end of a run
 
 def load_config():
-    cfg_path = os.getenv("CONFIG_PATH") or "config.yml"
-    with open(cfg_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
-
-def source_fetchers(cfg):
-    """Yield (source_key, org_label, jobs_list_or_exception)."""
-    srcs = (cfg.get("sources") or {})
-
-    # Greenhouse
-    for org in (srcs.get("greenhouse_orgs") or []):
-        try:
-            jobs = fetch_greenhouse(org)
-            yield ("greenhouse", org, jobs, None)
-        except Exception as e:
-            yield ("greenhouse", org, [], e)
-
-    # Lever
-    for org in (srcs.get("lever_orgs") or []):
-        try:
-            jobs = fetch_lever(org)
-            yield ("lever", org, jobs, None)
-        except Exception as e:
-            yield ("lever", org, [], e)
-
-    # Ashby
-    for org in (srcs.get("ashby_orgs") or []):
-        try:
-            jobs = fetch_ashby(org)
-            yield ("ashby", org, jobs, None)
-        except Exception as e:
-            yield ("ashby", org, [], e)
-
-    # SmartRecruiters — accept strings or dicts; always pass dict to fetcher
-    for comp in (srcs.get("smartrec_companies") or []):
-        label = comp.get("company") if isinstance(comp, dict) else str(comp)
-        payload = comp if isinstance(comp, dict) else {"company": label}
-        try:
-            jobs = fetch_smartrec(payload)
-            yield ("smartrecruiters", label, jobs, None)
-        except Exception as e:
-            yield ("smartrecruiters", label, [], e)
-
-    # Workday — accept dicts only; label nicely
-    for tenant in (srcs.get("workday_tenants") or []):
-        label = tenant.get("company") or tenant.get("tenant") or tenant.get("host") or "workday"
-        try:
-            jobs = fetch_workday(tenant)
-            yield ("workday", label, jobs, None)
-        except Exception as e:
-            yield ("workday", label, [], e)
-
-def format_job_line(j):
+    # CONFIG_PATH or config.yml; served from the state/ snapshot when unchanged
+    return _load_config()
+
+def source_fetchers(cfg, allow=None, priority=None, deadline=None, prefilter=None, wrap=None):
+    """Yield (source_key, org_label, jobs, exception_or_None, seconds) as each org finishes (jobs: list or JobSpool)."""
+    # fetched boards are kept briefly in state/cache/ for the tools (peek, check_sources)
+    cache = None
+    if (cfg.get("fetch") or {}).get("board_cache", True):
+        cache = BoardCache()
+        cache.prune()
+    yield from fetch_all(
+        cfg, allow=allow, priority=priority, deadline=deadline, prefilter=prefilter, wrap=wrap, cache=cache,
+    )
+
+SHOW_MAX = 25  # jobs listed in the digest; the rest are only counted
+
+def format_job_line(j, score=None, similar=0):
     loc = j.get("location") or ""
     title = j.get("title") or ""
     company = j.get("company") or ""
     url = j.get("url") or ""
-    return f"• {title} @ {company} — {loc}\n  {url}"
-
-def chunk_and_send(bot, chat, header, lines):
-    """Send one compact summary; if too long, send in chunks."""
-    bot = (bot or "").strip()
-    chat = (str(chat) or "").strip()
-    if not bot or not chat:
-        return
-
-    body = "\n".join(lines)
-    msg = f"{header}\n{body}" if lines else header
-
-    if len(msg) <= TELEGRAM_MAX:
-        send_telegram(bot, chat, msg)
-        return
-
-    # Split into multiple messages respecting limit
-    send_telegram(bot, chat, header)
-    buf, cur = [], 0
-    for line in lines:
-        needed = len(line) + (1 if buf else 0)
-        if cur + needed > TELEGRAM_MAX:
-            send_telegram(bot, chat, "\n".join(buf))
-            buf = [line]
-            cur = len(line)
-        else:
-            if buf:
-                buf.append(line)
-                cur += len(line) + 1
-            else:
-                buf = [line]
-                cur = len(line)
-    if buf:
-        send_telegram(bot, chat, "\n".join(buf))
-
-def run():
-    print("[main] hardened v2 loaded")  # banner so we know this file is running
-    load_dotenv()
-    cfg = load_config()
-
-    # env first; fallback to config.notify if present
-    bot = os.getenv("TELEGRAM_BOT_TOKEN") or (cfg.get("notify", {}) or {}).get("telegram_bot_token")
-    chat = os.getenv("TELEGRAM_CHAT_ID") or (cfg.get("notify", {}) or {}).get("telegram_chat_id")
-
-    # if filters are nested under "filters:", use that; else use top-level keys
-    filters_cfg = cfg.get("filters") or cfg
-
-    conn = get_conn()
-    new_items = []
-    fetched_counts = {}
-    errors = []
-
-    for src, org, jobs, err in source_fetchers(cfg):
-        key = f"{src}:{org}"
-        if err:
-            print(f"[warn] {key}: {err}")
-            errors.append(f"⚠ {key}: {err}")
-            fetched_counts[key] = 0
+    rank = f" [{score:.1f}]" if score is not None else ""
+    more = f" (+{similar} similar)" if similar else ""
+    return f"• {title} @ {company} — {loc}{more}{rank}\n  {url}"
+
+def drain_outbox(conn, notifiers, dispatcher):
+    """
+    Queue matches that earlier runs failed to deliver. The sends run in the
+    background while this run fetches. Returns [(future, outbox_ids)].
+    """
+    out = []
+    for n in notifiers:
+        pending = outbox_pending(conn, n.name)
+        if not pending:
             continue
+        print(f"[outbox] {n.name}: resending {len(pending)} undelivered match(es)")
+        header = f"📬 JobWatch: {len(pending)} undelivered match(es) from earlier runs"
+        lines = [format_job_line(j) for _, j in pending]
+        out.append((dispatcher.submit(n.name, n.send_digest, header, lines), [oid for oid, _ in pending]))
+    return out
+
+def _settle_one(conn, fut, ids):
+    err = "cancelled" if fut.cancelled() else (fut.exception() or ("" if fut.result() else "send failed"))
+    if not err:
+        outbox_mark_sent(conn, ids)
+    else:
+        print(f"[outbox] {len(ids)} notification(s) kept for retry: {err}")
+        outbox_mark_failed(conn, ids, err)
 
-        # Type safety + debug
-        if not isinstance(jobs, list):
-            print(f"[warn] {key}: jobs is {type(jobs).__name__}, forcing []")
-            jobs = []
-        type_set = {type(x).__name__ for x in jobs} if jobs else set()
-        print(f"[debug] {key}: fetched {len(jobs)} (types={sorted(type_set)})")
-
-        # Keep only dict items
-        before = len(jobs)
-        jobs = [j for j in jobs if isinstance(j, dict)]
-        if len(jobs) != before:
-            print(f"[debug] {key}: kept {len(jobs)} dict items after filtering")
-
-        fetched_counts[key] = len(jobs)
-
-        for j in jobs:
-            try:
-                if match_job(j, filters_cfg) and insert_if_new(conn, j):
-                    new_items.append(j)
-            except Exception as e:
-                print(f"[warn] filter/insert failed for {key}: {e}")
+def _settle_late(ids, fut):
+    """Done-callback of a send that outlived the notify timeout: record how it actually ended."""
+    try:
+        conn = get_conn()
+        try:
+            _settle_one(conn, fut, ids)
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"[warn] outbox: late result for {len(ids)} notification(s) not recorded ({e})")
+
+def settle_outbox(conn, deliveries):
+    """
+    Mark outbox entries sent, or schedule a retry with backoff. A send still
+    running may yet deliver, so it is neither: its entries stay unsent but on
+    hold (no resend next run), and its outcome is recorded when it finishes.
+    """
+    for fut, ids in deliveries:
+        if not ids:
+            continue
+        if fut.done():
+            _settle_one(conn, fut, ids)
+            continue
+        print(f"[outbox] {len(ids)} notification(s) still sending; held from resend until it finishes")
+        outbox_mark_inflight(conn, ids)
+        fut.add_done_callback(functools.partial(_settle_late, ids))
 
-    ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+def build_digest(profile, ts, fetched_counts, new_items, similar, scorer, errors, deferred, health, closed=()):
+    """(header, lines) of one profile's digest; the source/error/health sections are shared."""
     fetched_total = sum(fetched_counts.values())
-    header = f"📣 JobWatch @ {ts}\nFetched: {fetched_total} | New matches: {len(new_items)}"
+    label = "" if profile == DEFAULT else f" [{profile}]"
+    header = f"📣 JobWatch{label} @ {ts}\nFetched: {fetched_total} | New matches: {len(new_items)}"
+    if similar:
+        header += f" (+{sum(similar.values())} near-duplicates collapsed)"
 
-    new_items.sort(key=lambda x: (x.get("title","").lower(), x.get("company","").lower()))
+    shown = top_k(new_items, SHOW_MAX, scorer)
 
     lines = []
     if fetched_counts:
@@ -175,26 +129,556 @@ def run():
 
     if new_items:
         lines.append("")
-        lines.append(f"🔥 New matching jobs ({min(len(new_items),25)} shown):")
-        for j in new_items[:25]:
-            lines.append(format_job_line(j))
-        if len(new_items) > 25:
-            lines.append(f"...and {len(new_items)-25} more.")
+        lines.append(f"🔥 New matching jobs ({len(shown)} shown, best first):")
+        for score, j in shown:
+            lines.append(format_job_line(j, score, similar.get(j.get("id"), 0)))
+        if len(new_items) > len(shown):
+            lines.append(f"...and {len(new_items)-len(shown)} more.")
     else:
         lines.append("")
         lines.append("✅ No new matching jobs this run.")
 
+    if closed:
+        lines.append("")
+        lines.append(f"🚪 Closed since the last run ({len(closed)}):")
+        for j in closed[:SHOW_MAX]:
+            lines.append(f"• {j.get('title') or ''} @ {j.get('company') or ''} — {j.get('location') or ''}")
+        if len(closed) > SHOW_MAX:
+            lines.append(f"...and {len(closed)-SHOW_MAX} more.")
+
     if errors:
         lines.append("")
         lines.append("⚠ Errors:")
         lines.extend(errors)
 
-    print(header)
-    for line in lines:
-        print(line)
+    if deferred:
+        lines.append("")
+        lines.append(f"⏭ Out of time: {len(deferred)} org(s) deferred to the next run")
+
+    if health.tripped or health.skipped:
+        lines.append("")
+        lines.append(f"⏸ Circuit open ({len(health.tripped)} tripped now, {len(health.skipped)} skipped):")
+        for k in health.tripped + health.skipped:
+            lines.append(f"  - {health.describe(k)}")
+    return header, lines
+
+def load_profiles(cfg):
+    """
+    Filter profiles share the fetch; "default" is the top-level filters + notify
+    (env first; fallback to config.notify if present). Returns (profiles, {name: notifiers}).
+    """
+    profiles = resolve_profiles(cfg)
+    profile_notifiers = {}
+    for name, _, ncfg in profiles:
+        if name == DEFAULT:
+            profile_notifiers[name] = build_notifiers({"notify": ncfg})
+        else:
+            profile_notifiers[name] = build_notifiers(ncfg, profile=name)
+        if not profile_notifiers[name]:
+            print(f"[warn] notify: no channels configured for profile {name} (telegram/slack/file)")
+    return profiles, profile_notifiers
+
+def open_db(cfg):
+    """jobs.db with change tracking on or off per `sync.enabled`."""
+    conn = get_conn()
+    track_changes(conn, bool((cfg.get("sync") or {}).get("enabled")))
+    return conn
+
+def sync_state(cfg, conn):
+    """Export this run's changes; every `checkpoint_every` deltas, fold them into a checkpoint."""
+    ycfg = cfg.get("sync") or {}
+    if not ycfg.get("enabled"):
+        return
+    try:
+        export_changes(conn)
+        _, deltas = sync_files()
+        if len(deltas) >= int(ycfg.get("checkpoint_every", 24)):
+            checkpoint(conn)
+    except Exception as e:
+        print(f"[warn] sync export failed: {e}")
+
+def health_tracker(conn, cfg):
+    # circuit breaker: orgs that keep failing are skipped with exponential cool-down
+    hcfg = cfg.get("health") or {}
+    return HealthTracker(
+        conn,
+        failure_threshold=hcfg.get("failure_threshold", 3),
+        cooldown=float(hcfg.get("cooldown_minutes", 60)) * 60,
+        max_cooldown=float(hcfg.get("max_cooldown_hours", 168)) * 3600,
+    )
+
+class RunState:
+    """
+    What a run accumulates while orgs finish. match_org() is the fetch side
+    (filters + signatures, no state); apply_*() update jobs.db, org health and
+    live id sets. A sharded run writes match_org()'s output to a delta file and
+    `main.py merge` replays it through apply_*().
+    """
+
+    def __init__(self, cfg, conn, profiles, channels, health):
+        self.conn = conn
+        self.health = health
+        self.channels = channels
+        self.index = ProfileIndex({name: fcfg for name, fcfg, _ in profiles})
+
+        # near-duplicate collapsing (same company + title, similar description)
+        dcfg = cfg.get("dedupe") or {}
+        self.dedupe_on = dcfg.get("enabled", True)
+        self.max_distance = int(dcfg.get("max_distance", 3))
+        self.dup_window = float(dcfg.get("window_days", 30))
+
+        # closed postings: per-org live id sets are diffed against the previous run
+        self.track_closed = (cfg.get("closed") or {}).get("track", True)
+
+        self.new_items = {name: [] for name, _, _ in profiles}
+        self.similar = {name: {} for name, _, _ in profiles}  # canonical job id -> copies collapsed this run
+        self.fetched_counts = {}
+        self.errors = []
+        self.deferred = []
+        self.closed_ids = []
+
+    def match_org(self, key, jobs, sink=None):
+        """
+        (ids, [(job, profile names, signature)] for the ones some profile matches).
+        One pass over `jobs` (a list, or a JobSpool for an org past the memory
+        ceiling); `sink(job)` sees every kept posting (snapshot archive), so the
+        org is never copied into another list.
+        """
+        # Type safety + debug
+        if not isinstance(jobs, (list, JobSpool)):
+            print(f"[warn] {key}: jobs is {type(jobs).__name__}, forcing []")
+            jobs = []
+
+        ids, matches, type_set = [], [], set()
+        for j in jobs:
+            type_set.add(type(j).__name__)
+            if not isinstance(j, dict):  # keep only dict items
+                continue
+            ids.append(j.get("id"))
+            if sink is not None:
+                sink(j)
+            try:
+                names = self.index.match(j)
+                if names:
+                    matches.append((j, names, signature(j) if self.dedupe_on else None))
+            except Exception as e:
+                print(f"[warn] filter failed for {key}: {e}")
+        print(f"[debug] {key}: fetched {len(jobs)} (types={sorted(type_set)})")
+        if len(ids) != len(jobs):
+            print(f"[debug] {key}: kept {len(ids)} dict items after filtering")
+        return ids, matches
+
+    def apply_deferred(self, key):
+        self.health.defer(key)
+        self.deferred.append(key)
+
+    def apply_error(self, key, error, seconds, message=None):
+        self.health.record(key, error, seconds)
+        message = message or str(error)
+        print(f"[warn] {key}: {message}")
+        self.errors.append(f"⚠ {key}: {message}")
+        self.fetched_counts[key] = 0
+
+    def apply_org(self, key, seconds, fetched, ids, matches, complete=True):
+        self.health.record(key, None, seconds)
+        self.fetched_counts[key] = fetched
+
+        org_new = 0
+        for j, names, sig in matches:
+            try:
+                dup = find_near_duplicate(self.conn, sig, self.max_distance, self.dup_window) if sig else None
+                # a near-duplicate is remembered as seen but gets no outbox entry of its own
+                fresh = record_match(self.conn, j, {n: self.channels.get(n, []) for n in names}, sig=sig, dup_of=dup)
+                for name, collapsed in fresh.items():
+                    if collapsed:
+                        self.similar[name][dup] = self.similar[name].get(dup, 0) + 1
+                    elif name in self.new_items:
+                        self.new_items[name].append(j)
+                if not all(fresh.values()):
+                    org_new += 1
+            except Exception as e:
+                print(f"[warn] insert failed for {key}: {e}")
+        self.health.record_yield(key, org_new)
+
+        if self.track_closed:
+            try:
+                added, removed, closed = update_live_set(self.conn, key, ids, complete)
+                self.closed_ids.extend(closed)
+                if removed:
+                    print(f"[diff] {key}: +{added} -{removed} ({len(closed)} matched closed)")
+            except Exception as e:
+                print(f"[warn] {key}: live set update failed: {e}")
+
+def finish_run(cfg, conn, state, profiles, profile_notifiers, dispatcher, deliveries, run_deadline=None, prof=None):
+    """Save org health, send one digest per profile, settle the outbox and compact jobs.db."""
+    prof = prof or RunProfiler()
+    health = state.health
+    with prof.stage("db"):
+        health.save()
 
-    chunk_and_send(bot, chat, header, lines)
+    ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+    if state.deferred:
+        print("[deadline] deferred: " + ", ".join(state.deferred))
+    report_closed = (cfg.get("closed") or {}).get("report")
+    with prof.stage("notify"):
+        for name, fcfg, _ in profiles:
+            # most relevant first; only the top SHOW_MAX are listed
+            scorer = Scorer(fcfg, cfg.get("scoring"))
+            closed = closed_jobs(conn, state.closed_ids, name) if state.closed_ids and report_closed else []
+            header, lines = build_digest(
+                name, ts, state.fetched_counts, state.new_items[name], state.similar[name], scorer,
+                state.errors, state.deferred, health, closed,
+            )
+            print(header)
+            for line in lines:
+                print(line)
+
+            futures = dispatch(profile_notifiers[name], header, lines, dispatcher)
+            new_ids = [j.get("id") for j in state.new_items[name]]
+            for ch, fut in futures.items():
+                deliveries.append((fut, outbox_ids(conn, ch, new_ids)))
+
+        notify_timeout = NOTIFY_TIMEOUT
+        if run_deadline is not None:
+            notify_timeout = max(5.0, min(notify_timeout, run_deadline - time.monotonic()))
+        dispatcher.close(timeout=notify_timeout)
+        settle_outbox(conn, deliveries)
+
+    # keep the persisted state small (checkpoints copy the whole file)
+    scfg = cfg.get("storage") or {}
+    with prof.stage("db"):
+        try:
+            compact(
+                conn,
+                retention_days=scfg.get("retention_days", 90),
+                compress=bool(scfg.get("compress_descriptions")),
+                vacuum_every_days=scfg.get("vacuum_every_days", 7),
+            )
+        except Exception as e:
+            print(f"[warn] db compact failed: {e}")
+        sync_state(cfg, conn)
+    conn.close()
+
+def run(snapshot=False, deadline=None, shard=None, shard_out=None, profile=None):
+    """
+    Fetch, filter and notify. With `shard=(i, n)` only the orgs that hash to
+    shard i are fetched and the results go to a delta file instead (no
+    notifications, jobs.db untouched); `merge` combines the shards.
+    `profile` ("cpu", "mem", "cpu,mem"; default JOBWATCH_PROFILE) writes a
+    per-stage profile to state/profile-<ts>/; with "mem" the orgs' fetch times
+    are not recorded in org health (tracemalloc slows them all down).
+    """
+    print("[main] hardened v2 loaded")  # banner so we know this file is running
+    started = time.monotonic()
+    prof = RunProfiler.from_env(profile)
+    from dotenv import load_dotenv
+    load_dotenv()
+    cfg = load_config()
+    acfg = cfg.get("archive") or {}
+
+    # run budget: fetching stops `notify_reserve_seconds` before the deadline so
+    # the digest still goes out in time; unfinished orgs go first next run
+    rcfg = cfg.get("run") or {}
+    budget = float(deadline if deadline is not None else rcfg.get("deadline_seconds") or 0)
+    run_deadline = started + budget if budget > 0 else None
+    fetch_deadline = None
+    if run_deadline is not None:
+        reserve = min(float(rcfg.get("notify_reserve_seconds", 60)), budget / 2)
+        fetch_deadline = run_deadline - reserve
+
+    if shard:
+        profiles, profile_notifiers = resolve_profiles(cfg), {}
+    else:
+        profiles, profile_notifiers = load_profiles(cfg)
+    channels = {name: [n.name for n in ns] for name, ns in profile_notifiers.items()}
+
+    # two-phase fetching: descriptions only for postings whose title/location can still match
+    prefilter = None
+    if (cfg.get("fetch") or {}).get("two_phase"):
+        prefilter = listing_filter({name: fcfg for name, fcfg, _ in profiles})
+
+    # optional archive of everything fetched, for `main.py refilter`
+    snap = SnapshotWriter() if (snapshot or acfg.get("snapshots")) else None
+
+    conn = get_shard_conn() if shard else open_db(cfg)  # a shard only reads org health
+    health = health_tracker(conn, cfg)
+    state = RunState(cfg, conn, profiles, channels, health)
+
+    allow, writer = health.allow, None
+    if shard:
+        i, n = shard
+        writer = DeltaWriter(i, n, shard_out)
+        allow = lambda key: shard_of(key, n) == i and health.allow(key)
+        print(f"[shard] {i}/{n}: fetching this shard's orgs only")
+    else:
+        dispatcher = Dispatcher()
+        deliveries = drain_outbox(conn, [x for ns in profile_notifiers.values() for x in ns], dispatcher)
+
+    fetches = source_fetchers(
+        cfg, allow=allow, priority=health.priority, deadline=fetch_deadline, prefilter=prefilter,
+        wrap=prof.wrap if prof.enabled else None,
+    )
+    timed = "mem" not in prof.modes  # tracemalloc slows every fetch thread: keep those times out of org health
+    for src, org, jobs, err, secs in fetches:
+        key = f"{src}:{org}"
+        secs = secs if timed else None
+        if isinstance(err, Deferred):
+            if writer:
+                writer.org(key, deferred=True)
+            else:
+                with prof.stage("db"):
+                    state.apply_deferred(key)
+            continue
+        if err:
+            if writer:
+                print(f"[warn] {key}: {err}")
+                writer.org(key, error=error_class(err), message=str(err), seconds=secs)
+            else:
+                with prof.stage("db"):
+                    state.apply_error(key, err, secs)
+            continue
+
+        sink = (lambda j: snap.write(key, (j,))) if snap else None
+        with prof.stage("filter"):
+            ids, matches = state.match_org(key, jobs, sink=sink)
+        truncated = getattr(jobs, "truncated", "")  # listing cut off: missing ids aren't closed postings
+        if truncated:
+            print(f"[diff] {key}: listing incomplete ({truncated}); not checking for closed postings")
+        if isinstance(jobs, JobSpool):
+            jobs.close()
+        if writer:
+            extra = {"truncated": truncated} if truncated else {}
+            writer.org(key, seconds=secs, fetched=len(ids), ids=ids,
+                       matches=[{"job": j, "profiles": names, "sig": sig} for j, names, sig in matches], **extra)
+        else:
+            with prof.stage("db"):
+                state.apply_org(key, secs, len(ids), ids, matches, complete=not truncated)
+
+    if snap:
+        print(f"[archive] {snap.count} postings -> {snap.close()}")
+        prune_snapshots(acfg.get("keep", 48))
+
+    if writer:
+        path = writer.close(skipped=health.skipped)
+        print(f"[shard] {writer.orgs} org(s) -> {path}; run `python main.py merge` once every shard is done")
+        conn.close()
+        prof.finish()
+        return 0
+
+    finish_run(cfg, conn, state, profiles, profile_notifiers, dispatcher, deliveries, run_deadline, prof)
+    prof.finish()
+    return 0
+
+def merge(files=(), keep=False, profile=None):
+    """
+    Replay shard deltas into state/jobs.db (new matches, near-duplicates, org
+    health, live id sets) and send one combined digest. Consumed deltas are
+    deleted unless `keep`. `profile` works as in run() (there is no fetch stage).
+    """
+    prof = RunProfiler.from_env(profile)
+    from dotenv import load_dotenv
+    load_dotenv()
+    cfg = load_config()
+    paths = [pathlib.Path(f) for f in files] or list_deltas()
+    if not paths:
+        print("[merge] no shard deltas found (run `python main.py run --shard i/N` first)")
+        return 1
+
+    profiles, profile_notifiers = load_profiles(cfg)
+    channels = {name: [n.name for n in ns] for name, ns in profile_notifiers.items()}
+    dispatcher = Dispatcher()
+    conn = open_db(cfg)
+    deliveries = drain_outbox(conn, [x for ns in profile_notifiers.values() for x in ns], dispatcher)
+    health = health_tracker(conn, cfg)
+    state = RunState(cfg, conn, profiles, channels, health)
+
+    shards, counts = set(), set()
+    for path in paths:
+        with prof.stage("db"):
+            header, orgs, trailer = read_delta(path)
+        shards.add(header.get("shard"))
+        counts.add(header.get("of"))
+        if trailer is None:
+            print(f"[merge] {path}: incomplete (shard died?); applying the {len(orgs)} org(s) it recorded")
+        with prof.stage("db"):
+            for rec in orgs:
+                key = rec["key"]
+                if rec.get("deferred"):
+                    state.apply_deferred(key)
+                elif rec.get("error"):
+                    state.apply_error(key, rec["error"], rec.get("seconds"), rec.get("message"))
+                else:
+                    matches = [(m["job"], m["profiles"], m.get("sig")) for m in rec.get("matches") or []]
+                    state.apply_org(key, rec.get("seconds"), rec.get("fetched", 0), rec.get("ids") or [], matches,
+                                    complete=not rec.get("truncated"))
+        if trailer:
+            health.skipped.extend(trailer.get("skipped") or [])
+        print(f"[merge] {path}: shard {header.get('shard')}/{header.get('of')}, {len(orgs)} org(s)")
+
+    if len(counts) == 1:
+        missing = sorted(set(range(1, next(iter(counts)) + 1)) - shards)
+        if missing:
+            print(f"[merge] shard(s) {missing} missing; their orgs are not updated this run")
+    else:
+        print(f"[merge] deltas come from different shard counts {sorted(counts)}")
+
+    finish_run(cfg, conn, state, profiles, profile_notifiers, dispatcher, deliveries, prof=prof)
+    prof.finish()
+    if not keep:
+        for path in paths:
+            path.unlink(missing_ok=True)
+    return 0
+
+
+def refilter(config_path=None, files=(), use_all=False, limit=50, profile=DEFAULT):
+    """
+    Preview what the current (or another) filter config would match, using the
+    archived snapshots instead of the network. Matches the profile has not seen
+    yet are marked "new".
+    """
+    cfg = _load_config(config_path) if config_path else load_config()
+    filters = {name: fcfg for name, fcfg, _ in resolve_profiles(cfg)}
+    if profile not in filters:
+        print(f"[refilter] unknown profile {profile!r}; have: {', '.join(filters)}")
+        return 2
+    matcher = compile_filter(filters[profile])
+
+    paths = list(files) or list_snapshots()
+    if not paths:
+        print("[refilter] no snapshots yet; run with --snapshot or set archive.snapshots: true")
+        return 1
+    if not files and not use_all:
+        paths = paths[-1:]
+
+    conn = get_conn()
+    t0 = time.perf_counter()
+    scanned, matched, new, seen_ids = 0, 0, 0, set()
+    for path in paths:
+        for j in iter_snapshot(path):
+            scanned += 1
+            jid = j.get("id")
+            if jid in seen_ids or not matcher(j):
+                continue
+            seen_ids.add(jid)
+            matched += 1
+            is_new = conn.execute(
+                "SELECT 1 FROM profile_seen WHERE profile = ? AND job_id = ?", (profile, jid)
+            ).fetchone() is None
+            new += is_new
+            if matched <= limit:
+                print(("[new] " if is_new else "      ") + format_job_line(j))
+    dt = time.perf_counter() - t0
+    print(f"[refilter] {len(paths)} snapshot(s), {scanned} postings scanned, {matched} match "
+          f"({new} new to profile {profile}) in {dt:.2f}s")
+    return 0
+
+def sync(action):
+    """`restore` (newest checkpoint + unapplied deltas), `export` pending changes, or force a `checkpoint`."""
+    if action == "restore":
+        restore()
+        return 0
+    from dotenv import load_dotenv
+    load_dotenv()
+    conn = open_db(load_config())
+    try:
+        path = export_changes(conn)
+        if action == "checkpoint":
+            checkpoint(conn)
+        elif path is None:
+            print("[sync] nothing changed since the last export")
+    finally:
+        conn.close()
+    return 0
+
+def serve(host=None, port=None, verbose=False):
+    """Read-only /jobs API over state/jobs.db (see utils/api.py)."""
+    from utils.api import serve as serve_api
+    if not DB.exists():
+        print(f"[serve] {DB} does not exist yet; run first (or `sync restore`)")
+        return 1
+    scfg = load_config().get("serve") or {}
+    serve_api(
+        host=host or scfg.get("host", "127.0.0.1"), port=port or scfg.get("port", 8080),
+        cache_size=scfg.get("cache_size", 256), max_limit=scfg.get("max_limit", 500), verbose=verbose,
+    )
+    return 0
+
+def show_health(only_open=False):
+    conn = get_conn()
+    rows = HealthTracker(conn).report()
+    print(f"{'org':<45} {'fails':>5} {'open':>4} {'p50ms':>7} {'p95ms':>7}  last error")
+    for key, fails, err, is_open, p50, p95 in rows:
+        if only_open and not is_open:
+            continue
+        p50 = "" if p50 is None else p50
+        p95 = "" if p95 is None else p95
+        print(f"{key:<45} {fails:>5} {'yes' if is_open else '':>4} {p50:>7} {p95:>7}  {err}")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JobWatch")
+    parser.add_argument("--profile-run", nargs="?", const="all", metavar="cpu,mem",
+                        help="Profile the run's stages into state/profile-<ts>/ (env: JOBWATCH_PROFILE)")
+    sub = parser.add_subparsers(dest="command")
+
+    p_run = sub.add_parser("run", help="Fetch, filter and notify (default)")
+    p_run.add_argument("--snapshot", action="store_true", help="Archive fetched postings to state/snapshots/")
+    p_run.add_argument("--deadline", type=float, help="Run time budget in seconds (overrides run.deadline_seconds)")
+    p_run.add_argument("--shard", metavar="I/N", help="Fetch only shard I of N and write a delta (see `merge`)")
+    p_run.add_argument("--shard-out", help="Delta file path (default: state/shards/delta-I-of-N.jsonl.gz)")
+    p_run.add_argument("--profile-run", nargs="?", const="all", default=argparse.SUPPRESS, metavar="cpu,mem",
+                       help="Profile the run's stages into state/profile-<ts>/ (env: JOBWATCH_PROFILE)")
+
+    p_merge = sub.add_parser("merge", help="Combine shard deltas into state/jobs.db and send one digest")
+    p_merge.add_argument("files", nargs="*", help="Delta files (default: state/shards/delta-*.jsonl.gz)")
+    p_merge.add_argument("--keep", action="store_true", help="Don't delete the deltas after merging")
+    p_merge.add_argument("--profile-run", nargs="?", const="all", default=argparse.SUPPRESS, metavar="cpu,mem",
+                         help="Profile the merge's stages into state/profile-<ts>/ (env: JOBWATCH_PROFILE)")
+
+    p_ref = sub.add_parser("refilter", help="Preview filter matches from archived snapshots (no network)")
+    p_ref.add_argument("files", nargs="*", help="Snapshot files (default: latest in state/snapshots/)")
+    p_ref.add_argument("--config", help="Config to take filters from (default: CONFIG_PATH or config.yml)")
+    p_ref.add_argument("--all", action="store_true", help="Scan every archived snapshot")
+    p_ref.add_argument("-n", "--limit", type=int, default=50, help="How many matches to print")
+    p_ref.add_argument("--profile", default=DEFAULT, help="Filter profile to preview (default: %(default)s)")
+
+    p_health = sub.add_parser("health", help="Per-org failure streaks, open circuits and latency")
+    p_health.add_argument("--open", action="store_true", help="Only orgs whose circuit is open")
+
+    p_sync = sub.add_parser("sync", help="Incremental state: restore jobs.db, export changes, checkpoint")
+    p_sync.add_argument("action", choices=("restore", "export", "checkpoint"))
+
+    p_serve = sub.add_parser("serve", help="Read-only HTTP API: GET /jobs with filters and pagination")
+    p_serve.add_argument("--host", help="Bind address (default: serve.host or 127.0.0.1)")
+    p_serve.add_argument("--port", type=int, help="Port (default: serve.port or 8080)")
+    p_serve.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+
+    args = parser.parse_args(argv)
+    try:
+        parse_modes(args.profile_run)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.command == "serve":
+        return serve(args.host, args.port, args.verbose)
+    if args.command == "sync":
+        return sync(args.action)
+    if args.command == "health":
+        return show_health(args.open)
+    if args.command == "refilter":
+        return refilter(args.config, args.files, args.all, args.limit, args.profile)
+    if args.command == "merge":
+        return merge(args.files, args.keep, profile=args.profile_run)
+    shard = getattr(args, "shard", None)
+    if shard:
+        try:
+            shard = parse_spec(shard)
+        except ValueError as e:
+            parser.error(str(e))
+    return run(
+        snapshot=getattr(args, "snapshot", False), deadline=getattr(args, "deadline", None),
+        shard=shard, shard_out=getattr(args, "shard_out", None), profile=args.profile_run,
+    )
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
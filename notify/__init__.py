@@ -0,0 +1,53 @@
+# notify/__init__.py
+import os
+
+from notify.dispatcher import Dispatcher
+
+
+def _setting(env_key, ncfg, cfg_key):
+    """Env wins; config values like "${SLACK_WEBHOOK_URL}" are expanded, unresolved ones count as unset."""
+    val = (os.getenv(env_key) if env_key else "") or os.path.expandvars(str(ncfg.get(cfg_key) or ""))
+    val = val.strip()
+    return "" if "${" in val else val
+
+
+def build_notifiers(cfg, profile=None):
+    """
+    Return the configured channels (Telegram, Slack webhook, file/stdout sink).
+    For a named filter profile, `cfg` is that profile's notify section and the
+    channels are named "<profile>:telegram" etc.; only the bot token falls back to
+    the environment, so one profile never posts to another's chat.
+    """
+    if profile is None:
+        ncfg, env, prefix = cfg.get("notify") or {}, lambda k: k, ""
+    else:
+        ncfg, env, prefix = cfg or {}, lambda k: None, f"{profile}:"
+    out = []
+
+    bot = _setting(env("TELEGRAM_BOT_TOKEN"), ncfg, "telegram_bot_token")
+    if not bot and profile is not None:
+        bot = _setting("TELEGRAM_BOT_TOKEN", {}, "")
+    chat = _setting(env("TELEGRAM_CHAT_ID"), ncfg, "telegram_chat_id")
+    if bot and chat:
+        from notify.telegram import TelegramNotifier
+        out.append(TelegramNotifier(bot, chat, name=prefix + "telegram"))
+
+    hook = _setting(env("SLACK_WEBHOOK_URL"), ncfg, "slack_webhook_url")
+    if hook:
+        from notify.slack import SlackNotifier
+        out.append(SlackNotifier(hook, name=prefix + "slack"))
+
+    sink = _setting(env("NOTIFY_FILE"), ncfg, "file_sink")
+    if sink:
+        from notify.sink import FileSink
+        out.append(FileSink(sink, name=prefix + "file"))
+
+    return out
+
+
+def dispatch(notifiers, header, lines, dispatcher: Dispatcher):
+    """
+    Queue one digest per channel. Channels run concurrently on their own worker,
+    so total latency is the slowest channel, not the sum. Returns {name: Future[bool]}.
+    """
+    return {n.name: dispatcher.submit(n.name, n.send_digest, header, lines) for n in notifiers}
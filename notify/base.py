@@ -0,0 +1,28 @@
+# notify/base.py
+from notify.packing import pack_messages
+
+
+class Notifier:
+    """
+    One notify channel. Subclasses set `name` and `max_chars` and implement send();
+    pack() turns a digest into channel-sized messages (strings by default).
+    """
+
+    name = "notifier"
+    max_chars = 4000
+
+    def pack(self, header, lines):
+        return pack_messages(header, lines, self.max_chars)
+
+    def send(self, message) -> bool:
+        raise NotImplementedError
+
+    def send_digest(self, header, lines) -> bool:
+        """Send every packed message in order; True only if all of them went out."""
+        ok = True
+        for msg in self.pack(header, lines):
+            ok = self.send(msg) and ok
+        return ok
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
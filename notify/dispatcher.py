@@ -0,0 +1,31 @@
+# notify/dispatcher.py
+from concurrent.futures import ThreadPoolExecutor, wait
+
+
+class Dispatcher:
+    """
+    Sends notifications on background threads so the fetch pipeline never waits
+    on a notify API. Each key (e.g. one Telegram chat) gets its own single worker,
+    which keeps messages for that key in order.
+    """
+
+    def __init__(self):
+        self._pools = {}
+        self._futures = []
+
+    def submit(self, key, fn, *args, **kwargs):
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"notify-{key}")
+        fut = pool.submit(fn, *args, **kwargs)
+        self._futures.append(fut)
+        return fut
+
+    def close(self, timeout=None) -> bool:
+        """Wait up to `timeout` seconds for queued sends. Returns True if all finished."""
+        done, pending = wait(self._futures, timeout=timeout)
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        if pending:
+            print(f"[warn] notify: {len(pending)} send(s) still pending at shutdown")
+        return not pending
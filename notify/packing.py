@@ -0,0 +1,38 @@
+# notify/packing.py
+
+
+def split_long_line(line: str, limit: int):
+    """Break a single line that is longer than `limit` at whitespace (hard cut as last resort)."""
+    out = []
+    while len(line) > limit:
+        cut = line.rfind(" ", 0, limit + 1)
+        if cut <= 0:
+            cut = limit
+        out.append(line[:cut].rstrip())
+        line = line[cut:].lstrip()
+    out.append(line)
+    return out
+
+
+def pack_messages(header: str, lines, limit: int):
+    """
+    Pack header + lines into as few messages as possible, each at most `limit` chars.
+    Lines are never reordered; a line only moves to the next message when it does
+    not fit, and lines longer than `limit` are split first.
+    """
+    pieces = []
+    for line in ([header] if header else []) + list(lines or []):
+        pieces.extend(split_long_line(line, limit) if len(line) > limit else [line])
+
+    msgs, buf, cur = [], [], 0
+    for piece in pieces:
+        needed = len(piece) + (1 if buf else 0)
+        if buf and cur + needed > limit:
+            msgs.append("\n".join(buf))
+            buf, cur = [], 0
+            needed = len(piece)
+        buf.append(piece)
+        cur += needed
+    if buf:
+        msgs.append("\n".join(buf))
+    return msgs
@@ -0,0 +1,30 @@
+# notify/sink.py
+import sys
+import threading
+from datetime import datetime
+
+from notify.base import Notifier
+
+
+class FileSink(Notifier):
+    """Writes digests to a local file (or stdout with path "-"); handy for testing."""
+
+    name = "file"
+    max_chars = 4096
+
+    def __init__(self, path: str = "-", name: str = "file"):
+        self.path = path
+        self.name = name
+        self._lock = threading.Lock()
+
+    def send(self, message) -> bool:
+        stamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+        text = f"----- {self.name} @ {stamp} -----\n{message}\n"
+        with self._lock:
+            if self.path == "-":
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            else:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(text)
+        return True
@@ -0,0 +1,61 @@
+# notify/slack.py
+import time
+import requests
+
+from notify.base import Notifier
+from notify.packing import pack_messages
+from notify.ratelimit import TokenBucket
+
+SLACK_SECTION_MAX = 2900  # Slack rejects section text over 3000 chars
+SLACK_MAX_BLOCKS = 50     # and messages with more than 50 blocks
+TIMEOUT = 15
+MAX_ATTEMPTS = 4
+
+SESSION = requests.Session()
+
+
+class SlackNotifier(Notifier):
+    """Incoming-webhook sender; each message is a list of mrkdwn section blocks."""
+
+    name = "slack"
+    max_chars = SLACK_SECTION_MAX
+
+    def __init__(self, webhook_url: str, name: str = "slack"):
+        self.webhook_url = (webhook_url or "").strip()
+        self.name = name
+        # Slack allows roughly one webhook post per second
+        self.bucket = TokenBucket(rate=1, capacity=1)
+
+    def pack(self, header, lines):
+        sections = pack_messages(header, lines, self.max_chars)
+        return [sections[i:i + SLACK_MAX_BLOCKS] for i in range(0, len(sections), SLACK_MAX_BLOCKS)]
+
+    def send(self, message) -> bool:
+        if not self.webhook_url:
+            print("[warn] slack: missing webhook url")
+            return False
+        payload = {
+            "text": (message[0] if message else "")[:150],  # fallback for notifications
+            "blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": s}} for s in message],
+        }
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.bucket.acquire()
+            try:
+                r = SESSION.post(self.webhook_url, json=payload, timeout=TIMEOUT)
+            except Exception as e:
+                print(f"[warn] slack exception (attempt {attempt}):", e)
+                time.sleep(min(2 ** attempt, 10))
+                continue
+            if r.status_code == 200:
+                return True
+            if r.status_code == 429:
+                wait = float(r.headers.get("Retry-After") or 1)
+                print(f"[warn] slack: rate limited, retry after {wait:.0f}s")
+                self.bucket.pause(wait)
+                continue
+            print("[warn] slack:", r.status_code, r.text)
+            if r.status_code < 500:
+                return False
+            time.sleep(min(2 ** attempt, 10))
+        print("[warn] slack: giving up after", MAX_ATTEMPTS, "attempts")
+        return False
@@ -1,19 +1,84 @@
 # notify/telegram.py
+import time
 import requests
 
+from notify.base import Notifier
+from notify.ratelimit import TokenBucket
+
+TELEGRAM_MAX = 3800  # keep under Telegram's ~4096 limit with a buffer
+API = "https://api.telegram.org/bot{token}/sendMessage"
+TIMEOUT = 15
+MAX_ATTEMPTS = 4
+
+# one pooled connection to api.telegram.org for every message of the run
+SESSION = requests.Session()
+
+# Telegram allows ~30 msg/s per bot and ~1 msg/s into the same chat
+GLOBAL_BUCKET = TokenBucket(rate=30, capacity=30)
+_CHAT_BUCKETS = {}
+
+
+def _chat_bucket(chat_id: str) -> TokenBucket:
+    b = _CHAT_BUCKETS.get(chat_id)
+    if b is None:
+        b = _CHAT_BUCKETS.setdefault(chat_id, TokenBucket(rate=1, capacity=1))
+    return b
+
+
+def _retry_after(r) -> float:
+    try:
+        return float(((r.json() or {}).get("parameters") or {}).get("retry_after") or 1)
+    except Exception:
+        return 1.0
+
+
 def send_telegram(bot_token: str, chat_id: str, text: str) -> bool:
     bot_token = (bot_token or "").strip()
     chat_id = (str(chat_id) or "").strip()
     if not bot_token or not chat_id:
         print("[warn] telegram: missing bot token or chat id")
         return False
-    try:
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        r = requests.post(url, json={"chat_id": chat_id, "text": text})
-        if r.status_code != 200:
+
+    url = API.format(token=bot_token)
+    bucket = _chat_bucket(chat_id)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        bucket.acquire()
+        GLOBAL_BUCKET.acquire()
+        try:
+            r = SESSION.post(url, json={"chat_id": chat_id, "text": text}, timeout=TIMEOUT)
+        except Exception as e:
+            print(f"[warn] telegram exception (attempt {attempt}):", e)
+            time.sleep(min(2 ** attempt, 10))
+            continue
+
+        if r.status_code == 200:
+            return True
+        if r.status_code == 429:
+            wait = _retry_after(r)
+            print(f"[warn] telegram: rate limited, retry after {wait:.0f}s")
+            bucket.pause(wait)
+            continue
+        if r.status_code >= 500:
             print("[warn] telegram:", r.status_code, r.text)
-            return False
-        return True
-    except Exception as e:
-        print("[warn] telegram exception:", e)
+            time.sleep(min(2 ** attempt, 10))
+            continue
+
+        # 4xx other than 429 will not get better by retrying
+        print("[warn] telegram:", r.status_code, r.text)
         return False
+
+    print("[warn] telegram: giving up after", MAX_ATTEMPTS, "attempts")
+    return False
+
+
+class TelegramNotifier(Notifier):
+    name = "telegram"
+    max_chars = TELEGRAM_MAX
+
+    def __init__(self, bot_token: str, chat_id: str, name: str = "telegram"):
+        self.bot_token = (bot_token or "").strip()
+        self.chat_id = (str(chat_id) or "").strip()
+        self.name = name
+
+    def send(self, message) -> bool:
+        return send_telegram(self.bot_token, self.chat_id, message)
@@ -1 +1,164 @@
+# sources/__init__.py
+"""
+Source plugin registry.
 
+Each plugin declares its config key, how to label/shape a config entry, and the
+module + function names that fetch it. Modules are imported on first use, so a
+source with an empty list in config.yml never loads its dependencies.
+
+`canonical(payload)` is the board's identity ("Stripe " and "stripe" are the
+same Greenhouse board); iter_targets() skips entries whose key was already seen.
+"""
+import importlib
+
+
+def _str_label(item):
+    return str(item).strip()
+
+
+def _str_payload(item):
+    return str(item).strip()
+
+
+def _slug_key(payload):
+    return str(payload).strip().lower()
+
+
+class SourcePlugin:
+    def __init__(self, key, config_key, module, fetch, probe=None, label=_str_label, payload=_str_payload,
+                 aliases=(), paginated=False, max_concurrency=4, listing=None, detail=None, canonical=_slug_key):
+        self.key = key                    # name used in summaries, e.g. "greenhouse:stripe"
+        self.config_key = config_key      # list under `sources:` in config.yml
+        self.module = module
+        self.fetch_name = fetch
+        self.probe_name = probe           # optional slug -> (ok, count, home_url) check
+        self.label = label
+        self.payload = payload
+        self.aliases = tuple(aliases)
+        self.paginated = paginated        # fetcher walks several pages per org
+        self.max_concurrency = max_concurrency  # orgs of this source fetched at once
+        self.listing_name = listing       # optional two-phase fetch: payload -> [(job, ref)] without descriptions
+        self.detail_name = detail         # ... and (payload, ref, job) -> fields to add to a kept job
+        self.canonical = canonical        # payload -> board identity, for dedupe / coalescing / caching
+
+    def _resolve(self, name):
+        return getattr(importlib.import_module(self.module), name)
+
+    def fetch(self, payload):
+        return self._resolve(self.fetch_name)(payload)
+
+    @property
+    def two_phase(self):
+        return self.listing_name is not None and self.detail_name is not None
+
+    def listing(self, payload):
+        return self._resolve(self.listing_name)(payload)
+
+    def detail(self, payload, ref, job):
+        return self._resolve(self.detail_name)(payload, ref, job)
+
+    @property
+    def can_probe(self):
+        return self.probe_name is not None
+
+    def probe(self, slug):
+        return self._resolve(self.probe_name)(slug)
+
+    def targets(self, cfg):
+        """Yield (label, payload) for every configured org of this source."""
+        srcs = (cfg.get("sources") or {})
+        for item in (srcs.get(self.config_key) or []):
+            yield self.label(item), self.payload(item)
+
+    def __repr__(self):
+        return f"<SourcePlugin {self.key}>"
+
+
+# SmartRecruiters — accept strings or dicts; always pass dict to fetcher
+def _smartrec_label(item):
+    return item.get("company") if isinstance(item, dict) else str(item)
+
+
+def _smartrec_payload(item):
+    return item if isinstance(item, dict) else {"company": str(item).strip()}
+
+
+def _smartrec_key(payload):
+    from sources.smartrec import _norm_slug
+    return _norm_slug(payload) or ""
+
+
+# Workday — accept dicts only; label nicely
+def _workday_label(item):
+    return item.get("company") or item.get("tenant") or item.get("host") or "workday"
+
+
+def _workday_payload(item):
+    return item
+
+
+def _workday_key(payload):
+    # host + career site; the wdN data-centre part doesn't tell two boards apart
+    host = payload.get("host") or payload.get("tenant") or ""
+    return f"{host}/{payload.get('path') or payload.get('tenant') or ''}".strip().lower()
+
+
+REGISTRY = {}
+
+
+def register(plugin: SourcePlugin):
+    REGISTRY[plugin.key] = plugin
+    return plugin
+
+
+register(SourcePlugin("greenhouse", "greenhouse_orgs", "sources.greenhouse", "fetch_greenhouse",
+                      probe="probe_greenhouse", max_concurrency=8,
+                      listing="list_greenhouse", detail="detail_greenhouse"))
+register(SourcePlugin("lever", "lever_orgs", "sources.lever", "fetch_lever",
+                      probe="probe_lever", max_concurrency=8))  # its listing already carries descriptions
+register(SourcePlugin("ashby", "ashby_orgs", "sources.ashby", "fetch_ashby",
+                      probe="probe_ashby", max_concurrency=4))
+register(SourcePlugin("smartrecruiters", "smartrec_companies", "sources.smartrec", "fetch_smartrec",
+                      probe="probe_smartrec", label=_smartrec_label, payload=_smartrec_payload,
+                      aliases=("smartrec",), paginated=True, max_concurrency=2, canonical=_smartrec_key))
+register(SourcePlugin("workday", "workday_tenants", "sources.workday", "fetch_workday",
+                      label=_workday_label, payload=_workday_payload, max_concurrency=2,
+                      listing="list_workday", detail="detail_workday", canonical=_workday_key))
+
+
+def get_plugin(name: str) -> SourcePlugin:
+    name = (name or "").strip().lower()
+    if name in REGISTRY:
+        return REGISTRY[name]
+    for p in REGISTRY.values():
+        if name in p.aliases:
+            return p
+    raise KeyError(f"unknown source: {name}")
+
+
+def plugin_names(with_aliases=False):
+    names = list(REGISTRY)
+    if with_aliases:
+        names += [a for p in REGISTRY.values() for a in p.aliases]
+    return names
+
+
+def iter_targets(cfg, quiet=False):
+    """
+    Yield (plugin, label, payload) for every configured org, in registry order.
+    An org listed twice (same canonical key) is yielded once, first entry wins.
+    """
+    for plugin in REGISTRY.values():
+        seen = {}
+        for label, payload in plugin.targets(cfg):
+            try:
+                key = plugin.canonical(payload)
+            except (AttributeError, TypeError):  # malformed entry: let the fetcher report it
+                key = None
+            if key is not None and key in seen:
+                if not quiet:
+                    print(f"[warn] config: {plugin.key}: {label!r} duplicates {seen[key]!r}; skipped")
+                continue
+            if key is not None:
+                seen[key] = label
+            yield plugin, label, payload
@@ -1,14 +1,16 @@
-import requests, json, datetime
-from bs4 import BeautifulSoup
+import requests, json
 from utils.text import strip_html, stable_id
+from utils.dates import normalize_posted
+from sources import budget
 
 SESSION = requests.Session()
 SESSION.headers.update({"User-Agent": "Mozilla/5.0 (JobWatch)"})
 
 def fetch_ashby(org: str):
     url = f"https://jobs.ashbyhq.com/{org}"
-    r = SESSION.get(url, timeout=30)
+    r = SESSION.get(url, timeout=budget.timeout(30))
     r.raise_for_status()
+    from bs4 import BeautifulSoup  # heavy (bs4 + lxml); only load when Ashby is actually fetched
     soup = BeautifulSoup(r.text, "lxml")
     script = soup.find("script", id="_NEXT_DATA_", type="application/json")
     if not script:
@@ -21,7 +23,7 @@ def fetch_ashby(org: str):
         loc = ", ".join([l.get("name","") for l in j.get("locations",[])]) or (j.get("location","") or "")
         job_url = j.get("jobUrl") or j.get("url") or f"https://jobs.ashbyhq.com/{org}/{j.get('slug','')}"
         desc = strip_html(j.get("description",""))
-        updated = j.get("updatedAt") or j.get("createdAt") or datetime.datetime.utcnow().isoformat()
+        posted_at, posted_ts = normalize_posted(j.get("updatedAt") or j.get("createdAt"))
         remote = "remote" in (f"{loc} {desc}".lower())
         out.append({
             "id": stable_id(job_url, title, org),
@@ -30,8 +32,28 @@ def fetch_ashby(org: str):
             "location": loc,
             "remote": remote,
             "url": job_url,
-            "posted_at": updated,
+            "posted_at": posted_at,
+            "posted_ts": posted_ts,
             "description": desc,
             "source": "ashby",
         })
-    return out
\ No newline at end of file
+    return out
+
+def probe_ashby(slug: str, timeout: int = 20):
+    """(found, job_count, board_url) — cheap existence check used by tools/discover_ats.py."""
+    url = f"https://jobs.ashbyhq.com/{slug}"
+    try:
+        r = SESSION.get(url, timeout=timeout)
+        if r.status_code != 200 or not r.text:
+            return False, 0, ""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(r.text, "lxml")
+        script = soup.find("script", id="_NEXT_DATA_", type="application/json")
+        if not script or not script.string:
+            return False, 0, ""
+        data = json.loads(script.string)
+        jobs = data.get("props", {}).get("pageProps", {}).get("jobs", []) or []
+        return (True, len(jobs), url) if jobs or data else (False, 0, "")
+    except Exception:
+        pass
+    return False, 0, ""
@@ -0,0 +1,134 @@
+# sources/boards.py
+"""
+Board-level fetch layer shared by main.py and the tools.
+
+- Single flight: concurrent fetches of the same board (same plugin.canonical
+  key) share one request; latecomers wait for the first one's result (or
+  its exception). The result list is shared, not copied.
+- Board cache: every fetched board is written to state/cache/<source>/ as
+  gzip'd JSON. Tools read it within a short TTL (default 10 min), so
+  `peek`/`check_sources` right after a run don't download the boards again.
+  main.py reads it only when fetch.board_cache_ttl is set. Entries from a
+  two-phase fetch are marked partial: postings the listing filter rejected
+  have no description.
+- Fetchers may return iterators; they are collected here (sources.spool), up
+  to a per-org memory ceiling past which the postings wait on disk.
+"""
+import gzip
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+from sources import budget
+from sources.spool import JobList, gather
+
+CACHE_DIR = Path("state") / "cache"
+DEFAULT_TTL = 600
+
+_inflight = {}
+_lock = threading.Lock()
+
+
+def single_flight(key, fn):
+    """fn() unless an identical call is already running, in which case its result."""
+    with _lock:
+        fut = _inflight.get(key)
+        owner = fut is None
+        if owner:
+            fut = _inflight[key] = Future()
+    if not owner:
+        return fut.result()
+    try:
+        result = fn()
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        with _lock:
+            _inflight.pop(key, None)
+
+
+class BoardCache:
+    def __init__(self, root=CACHE_DIR, ttl=DEFAULT_TTL):
+        self.root = Path(root)
+        self.ttl = float(ttl)
+
+    def _path(self, plugin, payload) -> Path:
+        key = plugin.canonical(payload)
+        name = hashlib.blake2b(key.encode("utf-8"), digest_size=10).hexdigest()
+        return self.root / plugin.key / f"{name}.json.gz"
+
+    def get(self, plugin, payload, partial_ok=True):
+        """Cached jobs for a board fetched less than `ttl` seconds ago, else None."""
+        path = self._path(plugin, payload)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, EOFError, ValueError):
+            return None
+        if entry.get("partial") and not partial_ok:
+            return None
+        jobs = entry.get("jobs")
+        if entry.get("truncated") and jobs is not None:
+            jobs = JobList(jobs)
+            jobs.truncated = entry["truncated"]
+        return jobs
+
+    def put(self, plugin, payload, jobs, partial=False):
+        path = self._path(plugin, payload)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.part")
+            head = json.dumps({"key": plugin.canonical(payload), "fetched_at": int(time.time()), "partial": partial,
+                               "truncated": getattr(jobs, "truncated", "")}, ensure_ascii=False)
+            with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=3) as fh:
+                # streamed one job at a time, so a spooled board isn't loaded back into memory
+                fh.write(head[:-1] + ', "jobs": [')
+                for n, job in enumerate(jobs):
+                    fh.write((", " if n else "") + json.dumps(job, ensure_ascii=False))
+                fh.write("]}")
+            tmp.replace(path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[warn] board cache: {plugin.key}:{plugin.canonical(payload)} not cached ({e})")
+
+    def prune(self, max_age=None):
+        """Delete entries older than `max_age` seconds (default: the TTL)."""
+        cutoff = time.time() - (self.ttl if max_age is None else max_age)
+        for path in self.root.glob("*/*.json.gz"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+
+def fetch_board(plugin, payload, cache=None, fetch=None, partial=False, read_cache=True, max_bytes=None,
+                partial_ok=None):
+    """
+    Jobs of one board: from `cache` when fresh (and `read_cache`), else fetched
+    once per canonical key however many callers ask concurrently, then cached.
+    `fetch(payload)` defaults to plugin.fetch; `partial` marks a two-phase result.
+    `partial_ok` (default: `partial`) also accepts a cached two-phase entry, whose
+    rejected postings have no description: fine for callers that only count or
+    list titles, which still cache what they fetch themselves as complete.
+    An iterator result becomes a list, or a JobSpool past `max_bytes`.
+    """
+    if cache is not None and read_cache:
+        jobs = cache.get(plugin, payload, partial_ok=partial if partial_ok is None else partial_ok)
+        if jobs is not None:
+            return jobs
+    fetch = fetch or plugin.fetch
+    label = f"{plugin.key}:{plugin.canonical(payload)}"
+    jobs = single_flight((plugin.key, plugin.canonical(payload), partial),
+                         lambda: gather(fetch, payload, max_bytes, label))
+    if cache is not None and jobs is not None and not budget.expired():
+        cache.put(plugin, payload, jobs, partial=partial)
+    return jobs
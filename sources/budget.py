@@ -0,0 +1,59 @@
+# sources/budget.py
+"""
+The run's fetch deadline, as seen from inside a fetcher.
+
+fetch_all() runs every org under until(deadline) (a thread-local, so each
+fetch worker carries its own). Fetchers then cap every request with
+timeout(n) and call check() between pages: an org still running at the
+deadline stops within one request's worth of time and is reported as
+Deferred, instead of paging on in a thread nobody waits for while the
+interpreter holds the process open to join it.
+"""
+import time
+import threading
+from contextlib import contextmanager
+
+
+class Deferred(Exception):
+    """The run's fetch deadline passed before this org was fetched (or finished)."""
+
+
+_local = threading.local()
+MIN_TIMEOUT = 1.0  # a request started just before the deadline still gets a real chance
+
+
+def current():
+    """The deadline (time.monotonic() value) of this thread's fetch, or None."""
+    return getattr(_local, "deadline", None)
+
+
+@contextmanager
+def until(deadline):
+    prev = current()
+    _local.deadline = deadline
+    try:
+        yield
+    finally:
+        _local.deadline = prev
+
+
+def expired() -> bool:
+    deadline = current()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def check():
+    """Raise Deferred once the deadline has passed (call between pages / before retries)."""
+    if expired():
+        raise Deferred("fetch deadline reached")
+
+
+def timeout(seconds):
+    """`seconds`, capped to the time left before the deadline; Deferred if none is left."""
+    deadline = current()
+    if deadline is None:
+        return seconds
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise Deferred("fetch deadline reached")
+    return min(seconds, max(left, MIN_TIMEOUT))
@@ -0,0 +1,177 @@
+# sources/engine.py
+import time
+import functools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from sources import budget, iter_targets
+from sources.budget import Deferred
+from sources.boards import BoardCache, fetch_board
+from sources.spool import DEFAULT_MAX_MB
+
+DEFAULT_WORKERS = 8
+DEFAULT_DETAIL_WORKERS = 4
+
+
+def _timed(fn, payload):
+    t0 = time.perf_counter()
+    try:
+        jobs = fn(payload)
+    except Exception as e:
+        return [], e, time.perf_counter() - t0
+    secs = time.perf_counter() - t0
+    after = getattr(fn, "after", None)  # e.g. the profiler's memory snapshot: not part of the org's latency
+    if after is not None:
+        after()
+    return jobs, None, secs
+
+
+def _two_phase(plugin, payload, keep=None, workers=DEFAULT_DETAIL_WORKERS, label=""):
+    """
+    List the org without descriptions, then fetch details (concurrently) only for
+    postings `keep(job)` accepts. Rejected postings are returned listing-only so
+    counts and live-id sets still see them. Falls back to the one-shot fetch when
+    the listing is unavailable or any detail call fails.
+    """
+    listing = plugin.listing(payload)
+    if listing is None:
+        return plugin.fetch(payload)
+    wanted = [(job, ref) for job, ref in listing if keep(job)]
+    deadline = budget.current()  # thread-local: hand it to the detail workers
+
+    def one(item):
+        job, ref = item
+        try:
+            with budget.until(deadline):
+                job.update(plugin.detail(payload, ref, job) or {})
+        except Exception as e:
+            return e
+        return None
+
+    if wanted:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(wanted))), thread_name_prefix="detail") as ex:
+            failed = [e for e in ex.map(one, wanted) if e]
+        if failed:
+            budget.check()  # out of time: don't start the one-shot refetch
+            print(f"[two-phase] {plugin.key}:{label}: {len(failed)} detail call(s) failed ({failed[0]}); refetching in one go")
+            return plugin.fetch(payload)
+    print(f"[two-phase] {plugin.key}:{label}: details for {len(wanted)}/{len(listing)} posting(s)")
+    return [job for job, _ in listing]
+
+
+def fetch_all(cfg, max_workers=None, allow=None, priority=None, deadline=None, prefilter=None, wrap=None,
+              cache=None):
+    """
+    Fetch every configured org concurrently and yield
+    (source_key, org_label, jobs, error, seconds) as each one finishes.
+
+    - never more than plugin.max_concurrency orgs of one source run at once, so a
+      slow ATS can't occupy every worker
+    - `allow("source:org")` returning False skips an org
+    - `priority("source:org")` orders the work (lower runs first); ties are
+      handed out round-robin across sources
+    - `deadline` (time.monotonic() value): nothing new starts after it, and orgs
+      not finished by then are yielded with a Deferred error instead of waited on;
+      running fetchers see it through sources.budget (request timeouts capped to
+      the time left, checks between pages), so they stop too instead of paging
+      on in the background
+    - `prefilter(job)` enables two-phase fetching for sources that support it:
+      descriptions are only downloaded for listing entries it accepts
+    - `wrap(plugin, label, fn)` may replace each org's fetch callable (profiling);
+      its `after()`, if any, runs once the fetch has been timed
+    - every org goes through sources.boards.fetch_board: identical concurrent
+      fetches are coalesced, and results are written to `cache` (a BoardCache)
+      when given; fetch.board_cache_ttl > 0 also serves fresh entries from it
+    - an org whose postings pass fetch.org_memory_mb (default 64; 0 = no limit)
+      comes back as a disk-backed sources.spool.JobSpool instead of a list
+    """
+    fcfg = cfg.get("fetch") or {}
+    max_workers = int(max_workers or fcfg.get("max_workers") or DEFAULT_WORKERS)
+    detail_workers = int(fcfg.get("detail_workers") or DEFAULT_DETAIL_WORKERS)
+    reuse = float(fcfg.get("board_cache_ttl") or 0)
+    reader = BoardCache(cache.root, reuse) if cache is not None and reuse > 0 else None
+    ceiling = fcfg.get("org_memory_mb", DEFAULT_MAX_MB)
+    max_bytes = int(float(ceiling) * 1024 * 1024) if ceiling else None
+
+    def task(plugin, label):
+        fn, partial = plugin.fetch, False
+        if prefilter is not None and plugin.two_phase:
+            fn = functools.partial(_two_phase, plugin, keep=prefilter, workers=detail_workers, label=label)
+            partial = True
+
+        def board(payload):
+            if reader is not None:
+                jobs = reader.get(plugin, payload, partial_ok=partial)
+                if jobs is not None:
+                    return jobs
+            with budget.until(deadline):
+                try:
+                    return fetch_board(plugin, payload, cache=cache, fetch=fn, partial=partial, read_cache=False,
+                                       max_bytes=max_bytes)
+                except Deferred:
+                    raise
+                except Exception as e:
+                    if budget.expired():  # a request cut short by the capped timeout
+                        raise Deferred(f"cut off at deadline ({type(e).__name__})") from e
+                    raise
+
+        return wrap(plugin, label, board) if wrap is not None else board
+
+    queues, running, started = {}, {}, {}
+    for plugin, label, payload in iter_targets(cfg):
+        key = f"{plugin.key}:{label}"
+        if allow is not None and not allow(key):
+            continue
+        queues.setdefault(plugin.key, []).append((priority(key) if priority else 0, plugin, label, payload))
+        running.setdefault(plugin.key, 0)
+        started.setdefault(plugin.key, 0)
+    if not queues:
+        return
+    for k in queues:
+        queues[k] = deque(sorted(queues[k], key=lambda t: t[0]))
+
+    def expired():
+        return deadline is not None and time.monotonic() >= deadline
+
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+    futures = {}
+
+    def fill():
+        while len(futures) < max_workers and not expired():
+            best = None
+            for key, q in queues.items():
+                if q and running[key] < max(1, q[0][1].max_concurrency):
+                    rank = (q[0][0], started[key])
+                    if best is None or rank < best[0]:
+                        best = (rank, key)
+            if best is None:
+                return
+            key = best[1]
+            _, plugin, label, payload = queues[key].popleft()
+            running[key] += 1
+            started[key] += 1
+            futures[pool.submit(_timed, task(plugin, label), payload)] = (plugin, label)
+
+    try:
+        fill()
+        while futures:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                break  # deadline hit with work still in flight
+            for fut in done:
+                plugin, label = futures.pop(fut)
+                running[plugin.key] -= 1
+                jobs, err, secs = fut.result()
+                yield plugin.key, label, jobs, err, secs
+            fill()
+
+        # whatever is left (in flight or never started) is handed back as deferred
+        for plugin, label in futures.values():
+            yield plugin.key, label, [], Deferred("abandoned at deadline"), 0.0
+        for q in queues.values():
+            for _, plugin, label, _ in q:
+                yield plugin.key, label, [], Deferred("not started before deadline"), 0.0
+    finally:
+        # abandoned fetches stop on their own at their next budget check or capped timeout
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -1,23 +1,62 @@
-import requests, datetime
+import requests
 from utils.text import strip_html, stable_id
+from utils.dates import normalize_posted
+from sources import budget
+
+BOARD = "https://boards-api.greenhouse.io/v1/boards/{org}/jobs"
+
+# pooled keep-alive connection for the per-posting detail calls of two-phase fetching
+SESSION = requests.Session()
+
+def _is_remote(desc):
+    return "remote" in desc.lower() or "work from home" in desc.lower()
+
+def _normalize(j, org, desc):
+    posted_at, posted_ts = normalize_posted(j.get("updated_at"))
+    return {
+        "id": stable_id(j.get("absolute_url",""), j.get("title",""), org),
+        "title": j.get("title",""),
+        "company": org,
+        "location": (j.get("location") or {}).get("name",""),
+        "remote": _is_remote(desc),
+        "url": j.get("absolute_url",""),
+        "posted_at": posted_at,
+        "posted_ts": posted_ts,
+        "description": desc,
+        "source": "greenhouse"
+    }
 
 def fetch_greenhouse(org: str):
-    url = f"https://boards-api.greenhouse.io/v1/boards/{org}/jobs?content=true"
-    r = requests.get(url, timeout=20)
+    url = BOARD.format(org=org) + "?content=true"
+    r = requests.get(url, timeout=budget.timeout(20))
     r.raise_for_status()
     data = r.json()
-    out = []
-    for j in data.get("jobs", []):
-        desc = strip_html(j.get("content", ""))
-        out.append({
-            "id": stable_id(j.get("absolute_url",""), j.get("title",""), org),
-            "title": j.get("title",""),
-            "company": org,
-            "location": (j.get("location") or {}).get("name",""),
-            "remote": ("remote" in desc.lower() or "work from home" in desc.lower()),
-            "url": j.get("absolute_url",""),
-            "posted_at": j.get("updated_at") or datetime.datetime.utcnow().isoformat(),
-            "description": desc,
-            "source": "greenhouse"
-        })
-    return out
+    return [_normalize(j, org, strip_html(j.get("content", ""))) for j in data.get("jobs", [])]
+
+def list_greenhouse(org: str):
+    """Two-phase mode, step 1: the board without descriptions -> [(job, greenhouse_job_id)]."""
+    r = SESSION.get(BOARD.format(org=org), timeout=budget.timeout(20))
+    r.raise_for_status()
+    return [(_normalize(j, org, ""), j.get("id")) for j in r.json().get("jobs", [])]
+
+def detail_greenhouse(org: str, ref, job):
+    """Two-phase mode, step 2: description of one posting that passed the title filter."""
+    r = SESSION.get(f"{BOARD.format(org=org)}/{ref}", timeout=budget.timeout(20))
+    r.raise_for_status()
+    desc = strip_html(r.json().get("content", ""))
+    return {"description": desc, "remote": _is_remote(desc)}
+
+def probe_greenhouse(slug: str, timeout: int = 20):
+    """(found, job_count, board_url) — cheap existence check used by tools/discover_ats.py."""
+    url = f"https://boards-api.greenhouse.io/v1/boards/{slug}/jobs"
+    try:
+        r = requests.get(url, timeout=timeout)
+        if r.status_code == 200:
+            jobs = r.json().get("jobs") or []
+            return True, len(jobs), f"https://boards.greenhouse.io/{slug}"
+        if r.status_code in (401, 403):
+            # board exists but restricted -> treat as match with 0
+            return True, 0, f"https://boards.greenhouse.io/{slug}"
+    except Exception:
+        pass
+    return False, 0, ""
@@ -1,9 +1,11 @@
-import requests, datetime
+import requests
 from utils.text import strip_html, stable_id
+from utils.dates import normalize_posted
+from sources import budget
 
 def fetch_lever(org: str):
     url = f"https://api.lever.co/v0/postings/{org}?mode=json"
-    r = requests.get(url, timeout=20)
+    r = requests.get(url, timeout=budget.timeout(20))
     r.raise_for_status()
     out = []
     for j in r.json():
@@ -13,6 +15,7 @@ def fetch_lever(org: str):
         categories = j.get("categories") or {}
         location = ", ".join([v for v in categories.values() if isinstance(v, str)])
         remote = ("remote" in (categories.get("commitment","") or "").lower()) or ("remote" in desc.lower())
+        posted_at, posted_ts = normalize_posted(j.get("createdAt"))  # epoch milliseconds
         out.append({
             "id": stable_id(hosted, title, org),
             "title": title,
@@ -20,8 +23,24 @@ def fetch_lever(org: str):
             "location": location,
             "remote": remote,
             "url": hosted,
-            "posted_at": j.get("createdAt") or datetime.datetime.utcnow().isoformat(),
+            "posted_at": posted_at,
+            "posted_ts": posted_ts,
             "description": desc,
             "source": "lever"
         })
     return out
+
+def probe_lever(slug: str, timeout: int = 20):
+    """(found, job_count, board_url) — cheap existence check used by tools/discover_ats.py."""
+    url = f"https://api.lever.co/v0/postings/{slug}?mode=json"
+    try:
+        r = requests.get(url, timeout=timeout)
+        if r.status_code == 200:
+            data = r.json()
+            if isinstance(data, list):
+                return True, len(data), f"https://jobs.lever.co/{slug}"
+        if r.status_code in (401, 403):
+            return True, 0, f"https://jobs.lever.co/{slug}"
+    except Exception:
+        pass
+    return False, 0, ""
@@ -2,6 +2,9 @@
 import time
 import requests
 from utils.text import strip_html
+from utils.dates import normalize_posted
+from sources import budget
+from sources.spool import mark_truncated
 
 SESSION = requests.Session()
 SESSION.headers.update({
@@ -28,34 +31,43 @@ def _norm_slug(item):
 
 def fetch_smartrec(slug_or_dict, max_pages: int = 5, sleep: float = 0.5):
     """
-    Returns a list of normalized job dicts from SmartRecruiters.
+    Yields normalized job dicts from SmartRecruiters, each posting id once
+    (pages overlap when postings are added mid-walk); sources.spool collects
+    them under the per-org memory ceiling.
     Safely handles odd API items (e.g., stray strings) by skipping them.
     """
     slug = _norm_slug(slug_or_dict)
     if not slug:
-        return []
+        return
 
-    out = []
+    seen = set()
     page = 1
     while page <= max_pages:
         url = API.format(slug=slug)
+        wait = budget.timeout(30)  # Deferred once the run's fetch deadline has passed
         try:
-            r = SESSION.get(url, params={"page": page}, timeout=30)
+            r = SESSION.get(url, params={"page": page}, timeout=wait)
         except Exception:
+            budget.check()  # cut short by the deadline: deferred, not a shorter board
+            if page == 1:
+                raise  # nothing fetched: let the caller record the failure
             # transient network error: stop early for this run
+            mark_truncated(f"page {page} failed")
             break
 
-        if r.status_code == 404:
-            # company not found on SR
-            break
-        if r.status_code in (401, 403):
-            # board exists but hidden; treat as empty
+        if r.status_code in (401, 403, 404):
+            if page == 1:
+                # unknown company (404) or hidden board (401/403): report it so the
+                # circuit breaker can back off instead of silently returning empty
+                r.raise_for_status()
+            mark_truncated(f"page {page}: HTTP {r.status_code}")
             break
 
         try:
             data = r.json() or {}
         except Exception:
             # bad JSON -> stop
+            mark_truncated(f"page {page}: bad JSON")
             break
 
         items = data.get("content") or []
@@ -67,6 +79,10 @@ def fetch_smartrec(slug_or_dict, max_pages: int = 5, sleep: float = 0.5):
             if not isinstance(j, dict):
                 # skip weird entries like plain strings
                 continue
+            if j.get("id"):
+                if j["id"] in seen:
+                    continue
+                seen.add(j["id"])
             try:
                 title = j.get("name", "") or ""
                 url2 = (j.get("ref") or {}).get("jobAd", "") or ""
@@ -81,29 +97,44 @@ def fetch_smartrec(slug_or_dict, max_pages: int = 5, sleep: float = 0.5):
                         loc_parts.append(str(v))
                 loc_str = ", ".join(loc_parts)
 
-                created = j.get("releasedDate") or j.get("createdOn") or ""
+                posted_at, posted_ts = normalize_posted(j.get("releasedDate") or j.get("createdOn"))
 
                 # description (HTML -> text)
                 desc_html = (((j.get("jobAd") or {}).get("sections") or {})
                              .get("jobDescription") or {}).get("text", "") or ""
                 desc = strip_html(desc_html)
 
-                out.append({
+                job = {
                     "id": f"sr:{j.get('id','')}",
                     "title": title,
                     "company": comp,
                     "location": loc_str,
                     "remote": "remote" in f"{title} {desc}".lower(),
                     "url": url2 or f"https://jobs.smartrecruiters.com/{slug}/{j.get('id','')}",
-                    "posted_at": created,
+                    "posted_at": posted_at,
+                    "posted_ts": posted_ts,
                     "description": desc,
                     "source": "smartrecruiters",
-                })
+                }
             except Exception:
                 # never let one bad post break the batch
                 continue
+            yield job
 
         page += 1
         time.sleep(sleep)
+    else:
+        mark_truncated(f"page cap ({max_pages})")  # there may be more pages
 
-    return out
\ No newline at end of file
+def probe_smartrec(slug: str, timeout: int = 20):
+    """(found, job_count, board_url) — cheap existence check used by tools/discover_ats.py."""
+    try:
+        r = SESSION.get(API.format(slug=slug), params={"page": 1}, timeout=timeout)
+        if r.status_code == 200:
+            items = (r.json() or {}).get("content") or []
+            return True, len(items), f"https://careers.smartrecruiters.com/{slug}"
+        if r.status_code in (401, 403):
+            return True, 0, f"https://careers.smartrecruiters.com/{slug}"
+    except Exception:
+        pass
+    return False, 0, ""
@@ -0,0 +1,158 @@
+# sources/spool.py
+"""
+Memory-bounded collection of one org's postings.
+
+Paginated fetchers (Workday, SmartRecruiters) yield jobs one at a time;
+collect() gathers them for the rest of the run. Below the ceiling
+(fetch.org_memory_mb) the result is a plain list. Past it, every job is moved
+to a temporary JSONL file and a JobSpool is returned instead: it has len(),
+bool() and can be iterated any number of times (each pass re-reads the file),
+which is all the run needs. So a tenant with thousands of long descriptions
+costs one posting of memory at a time, not the whole board.
+
+The size estimate is rough on purpose (string lengths plus a per-dict
+overhead); it only has to tell a normal board from a runaway one.
+
+A fetcher whose listing stops short of the whole board (page cap, a later page
+failing, the one-page embedded-HTML fallback) calls mark_truncated(); gather()
+hands that on as the result's `truncated` reason, so the closed-posting diff
+doesn't read the missing ids as postings that went away.
+"""
+import os
+import json
+import tempfile
+import threading
+
+DEFAULT_MAX_MB = 64
+_JOB_OVERHEAD = 600  # ~bytes of dict + key slots for one normalized posting
+
+_local = threading.local()
+
+
+def mark_truncated(reason="truncated"):
+    """Called from inside a fetcher: this org's listing is not the whole board."""
+    _local.truncated = reason
+
+
+class JobList(list):
+    """A fetched board that carries why it is incomplete (`truncated`, "" when it isn't)."""
+    truncated = ""
+
+
+def job_size(job) -> int:
+    if not isinstance(job, dict):
+        return _JOB_OVERHEAD
+    return _JOB_OVERHEAD + sum(len(v) for v in job.values() if isinstance(v, str))
+
+
+class JobSpool:
+    """Append-only job buffer that moves to a temp file once it passes `max_bytes`."""
+    truncated = ""
+
+    def __init__(self, max_bytes, label=""):
+        self.max_bytes = max_bytes
+        self.label = label
+        self._mem = []
+        self._bytes = 0
+        self._count = 0
+        self._path = None
+        self._fh = None
+
+    @property
+    def spilled(self) -> bool:
+        return self._path is not None
+
+    def append(self, job):
+        self._count += 1
+        if self._path is not None:
+            self._write(job)
+            return
+        self._mem.append(job)
+        self._bytes += job_size(job)
+        if self._bytes > self.max_bytes:
+            self._spill()
+
+    def _write(self, job):
+        self._fh.write(json.dumps(job, ensure_ascii=False, separators=(",", ":")))
+        self._fh.write("\n")
+
+    def _spill(self):
+        fd, self._path = tempfile.mkstemp(prefix="jobwatch-spool-", suffix=".jsonl")
+        self._fh = os.fdopen(fd, "w", encoding="utf-8")
+        print(f"[spool] {self.label}: over {self.max_bytes / (1024 * 1024):g} MiB after {self._count} postings; "
+              f"buffering on disk ({self._path})")
+        for job in self._mem:
+            self._write(job)
+        self._mem = []
+
+    def seal(self):
+        """No more appends; flushes the temp file so concurrent readers see all of it."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+        if self._path is None:
+            yield from self._mem
+            return
+        if self._fh is not None:
+            self._fh.flush()
+        with open(self._path, encoding="utf-8") as fh:
+            for line in fh:
+                yield json.loads(line)
+
+    def close(self):
+        """Delete the temp file (safe to call twice; also done when garbage-collected)."""
+        self.seal()
+        if self._path is not None:
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass
+            self._path = None
+        self._mem = []
+
+    def __del__(self):
+        self.close()
+
+
+def collect(jobs, max_bytes=None, label=""):
+    """
+    A fetcher's result as something the run can iterate repeatedly: lists pass
+    through; iterators become a list, or a JobSpool once past `max_bytes`
+    (None/0 = no ceiling).
+    """
+    if isinstance(jobs, (list, JobSpool)) or jobs is None:
+        return jobs
+    if not max_bytes:
+        return list(jobs)
+    spool = JobSpool(max_bytes, label)
+    try:
+        for job in jobs:
+            spool.append(job)
+    except BaseException:
+        spool.close()
+        raise
+    if not spool.spilled:
+        out, spool._mem = spool._mem, []
+        return out
+    spool.seal()
+    return spool
+
+
+def gather(fetch, payload, max_bytes=None, label=""):
+    """collect(fetch(payload)), with the fetcher's mark_truncated() reason attached as `truncated`."""
+    _local.truncated = ""
+    jobs = collect(fetch(payload), max_bytes, label)
+    reason, _local.truncated = _local.truncated, ""
+    if reason and jobs is not None:
+        if not isinstance(jobs, (JobList, JobSpool)):
+            jobs = JobList(jobs)
+        jobs.truncated = reason
+    return jobs
@@ -1,10 +1,18 @@
 # sources/workday.py
-import re, json, time, datetime
+import re, json, time
 import requests
-from bs4 import BeautifulSoup
 from utils.text import strip_html, stable_id
+from utils.dates import normalize_posted
+from sources import budget
+from sources.spool import mark_truncated
 
 UA = {"User-Agent": "Mozilla/5.0 (JobWatch)"}
+CXS_PAGE = 20        # the search API rejects larger pages
+CXS_MAX_PAGES = 50
+
+# pooled keep-alive connection for the search API / per-posting detail calls (two-phase mode)
+SESSION = requests.Session()
+SESSION.headers.update(UA)
 
 def _host(t):
     # allow separate host vs path tenant.
@@ -20,6 +28,49 @@ def _public_root(t):
     # most tenants work with this English locale root
     return f"https://{_host(t)}/en-US/{_path_tenant(t)}"
 
+def _cxs_root(t):
+    # JSON API behind the public site: /wday/cxs/<tenant>/<site>
+    host_name = t.get("host") or t["tenant"]
+    return f"https://{_host(t)}/wday/cxs/{host_name}/{_path_tenant(t)}"
+
+def _cxs_jobs_url(t):
+    return _cxs_root(t) + "/jobs"
+
+TENANT_URL = re.compile(
+    r"https?://(?P<host>[^./]+)\.(?P<subdomain>wd\d+)\.myworkdayjobs\.com/(?:(?P<locale>[a-z]{2}-[A-Z]{2})/)?(?P<path>[^/?#]+)",
+    re.IGNORECASE,
+)
+
+def parse_tenant_url(u: str) -> dict:
+    """https://nvidia.wd5.myworkdayjobs.com/en-US/NVIDIAExternalCareerSite -> tenant dict ({} if not Workday)."""
+    m = TENANT_URL.search((u or "").strip())
+    if not m:
+        return {}
+    host = m.group("host")
+    label = host.replace("-", " ").replace("_", " ").title()
+    return {"subdomain": m.group("subdomain").lower(), "host": host, "path": m.group("path"), "company": label}
+
+def probe_workday(tenant, session=None, timeout=10):
+    """
+    One lightweight call to the tenant's search API (limit=1).
+    Returns (ok, total_jobs, public_url).
+    """
+    sess = session or requests
+    try:
+        r = sess.post(
+            _cxs_jobs_url(tenant),
+            json={"appliedFacets": {}, "limit": 1, "offset": 0, "searchText": ""},
+            headers={**UA, "Accept": "application/json"},
+            timeout=timeout,
+        )
+        if r.status_code == 200:
+            data = r.json() or {}
+            if isinstance(data, dict) and ("total" in data or "jobPostings" in data):
+                return True, int(data.get("total") or 0), _public_root(tenant)
+    except Exception:
+        pass
+    return False, 0, ""
+
 def _search_urls(t):
     """
     Return a list of likely search/landing URLs to try in order.
@@ -33,51 +84,70 @@ def _search_urls(t):
         root,  # landing itself
     ]
 
+POSTING_LISTS = ("jobPostings", "items", "results")
+
+def _posting_key(j):
+    """Identity of a raw posting, to drop the copies nested page JSON repeats."""
+    key = j.get("externalPath") or j.get("externalPathKey") or j.get("id") or j.get("bulletFields")
+    if key:
+        return str(key)
+    return json.dumps(j, sort_keys=True, default=str)
+
+def _walk(x, seen):
+    """Yield every not-yet-seen posting dict under a posting-list key, depth first."""
+    if isinstance(x, dict):
+        for k in POSTING_LISTS:
+            v = x.get(k)
+            if isinstance(v, list):
+                for p in v:
+                    if isinstance(p, dict):
+                        key = _posting_key(p)
+                        if key not in seen:
+                            seen.add(key)
+                            yield p
+        for v in x.values():
+            yield from _walk(v, seen)
+    elif isinstance(x, list):
+        for v in x:
+            yield from _walk(v, seen)
+
 def _extract_jobs_from_html(html):
     """
     Workday embeds JSON in one or more <script> tags.
-    We look for a JSON block that contains job listings.
+    We look for a JSON block that contains job listings and yield its postings,
+    each once, however many nested lists repeat it.
     """
+    from bs4 import BeautifulSoup  # heavy (bs4 + lxml); only load when a page is parsed
     soup = BeautifulSoup(html, "lxml")
+    blocks = [(s.string or s.text or "").strip() for s in soup.find_all("script")]
+    blocks = [txt for txt in blocks if "jobPostings" in txt]
+    soup = None  # the parse tree is the largest thing here; don't keep it while postings are consumed
 
     # Strategy 1: big JSON object with 'jobPostings'
-    for s in soup.find_all("script"):
-        txt = (s.string or s.text or "").strip()
-        if not txt or "jobPostings" not in txt and '"jobPostings"' not in txt:
-            continue
+    for txt in blocks:
         start, end = txt.find("{"), txt.rfind("}")
         if start != -1 and end != -1 and end > start:
-            blob = txt[start:end+1]
             try:
-                data = json.loads(blob)
-                postings = []
-                def walk(x):
-                    nonlocal postings
-                    if isinstance(x, dict):
-                        for k in ("jobPostings", "items", "results"):
-                            v = x.get(k)
-                            if isinstance(v, list) and v:
-                                postings.extend(v)
-                        for v in x.values():
-                            walk(v)
-                    elif isinstance(x, list):
-                        for v in x:
-                            walk(v)
-                walk(data)
-                if postings:
-                    return postings
+                data = json.loads(txt[start:end+1])
             except Exception:
-                pass
+                continue
+            found = 0
+            for p in _walk(data, set()):
+                found += 1
+                yield p
+            if found:
+                return
 
     # Strategy 2: fallback heuristic search for objects w/ externalPath
-    m_all = re.findall(r'\{[^<>]+?"externalPath"[^<>]+?\}', html)
-    postings = []
-    for mm in m_all:
+    seen = set()
+    for mm in re.finditer(r'\{[^<>]+?"externalPath"[^<>]+?\}', html):
         try:
-            postings.append(json.loads(mm))
+            p = json.loads(mm.group(0))
         except Exception:
             continue
-    return postings
+        if isinstance(p, dict) and _posting_key(p) not in seen:
+            seen.add(_posting_key(p))
+            yield p
 
 def fetch_workday(tenant):
     """
@@ -88,14 +158,18 @@ def fetch_workday(tenant):
 
     Backward compatible with:
       { "subdomain": "wd5", "tenant": "nvidia", "company": "NVIDIA" }
+
+    A generator: postings are normalized as they are read, each job id once
+    (sources.spool collects them under the per-org memory ceiling).
     """
     sess = requests.Session()
     sess.headers.update(UA)
 
     html = None
     for url in _search_urls(tenant):
+        wait = budget.timeout(25)  # Deferred once the run's fetch deadline has passed
         try:
-            r = sess.get(url, timeout=25)
+            r = sess.get(url, timeout=wait)
             if r.status_code in (200, 204) and r.text:
                 html = r.text
                 break
@@ -105,53 +179,116 @@ def fetch_workday(tenant):
 
     if not html:
         # last attempt: plain root
+        wait = budget.timeout(25)
         try:
-            r = sess.get(_public_root(tenant), timeout=25)
+            r = sess.get(_public_root(tenant), timeout=wait)
             if r.status_code in (200, 204) and r.text:
                 html = r.text
         except Exception:
             pass
 
     if not html:
-        return []
-
-    raw_posts = _extract_jobs_from_html(html)
-    out = []
-    company = tenant.get("company") or (tenant.get("host") or tenant.get("tenant"))
-
-    for j in raw_posts:
-        title = (j.get("title") or j.get("titleLocalized") or j.get("displayJobTitle") or "").strip()
-
-        # location
-        loc = ""
-        if isinstance(j.get("locations"), list):
-            loc = ", ".join([x.get("formattedName","") or x.get("name","") for x in j["locations"]])
-        loc = loc or j.get("locationsText","") or j.get("location","") or ""
-
-        # url
-        ext = j.get("externalPath") or j.get("externalPathKey") or j.get("canonicalPositionUrl") or ""
-        if ext.startswith("/"):
-            ext = ext[1:]
-        job_url = f"{_public_root(tenant)}/job/{ext}" if ext else _public_root(tenant)
-
-        # description (often short in embedded JSON)
-        desc = j.get("externalPostingDescription") or j.get("jobPostingInfo",{}).get("jobDescription","") or ""
-        desc = strip_html(desc)
-
-        posted = j.get("postedOn") or j.get("startDate") or j.get("timeUpdated") or j.get("updatedAt") \
-                 or datetime.datetime.utcnow().isoformat()
-        remote = "remote" in f"{title} {loc} {desc}".lower()
-
-        if title and job_url:
-            out.append({
-                "id": stable_id(job_url, title, company),
-                "title": title,
-                "company": company,
-                "location": loc,
-                "remote": remote,
-                "url": job_url,
-                "posted_at": posted,
-                "description": desc,
-                "source": "workday",
-            })
-    return out
\ No newline at end of file
+        budget.check()  # the requests above were cut short by the deadline: deferred, not an empty board
+        return
+
+    # the embedded JSON holds about one page of a board, so it never proves a posting gone
+    mark_truncated("embedded-page fallback")
+    company = _company(tenant)
+    seen = set()
+    for j in _extract_jobs_from_html(html):
+        job = _normalize(j, tenant, company)
+        if job and job["id"] not in seen:
+            seen.add(job["id"])
+            yield job
+
+def _company(tenant):
+    return tenant.get("company") or (tenant.get("host") or tenant.get("tenant"))
+
+def _normalize(j, tenant, company):
+    """One Workday posting (embedded page JSON or search API) -> job dict, None without a title."""
+    title = (j.get("title") or j.get("titleLocalized") or j.get("displayJobTitle") or "").strip()
+
+    # location
+    loc = ""
+    if isinstance(j.get("locations"), list):
+        loc = ", ".join([x.get("formattedName","") or x.get("name","") for x in j["locations"]])
+    loc = loc or j.get("locationsText","") or j.get("location","") or ""
+
+    # url
+    ext = j.get("externalPath") or j.get("externalPathKey") or j.get("canonicalPositionUrl") or ""
+    if ext.startswith("/"):
+        ext = ext[1:]
+    job_url = f"{_public_root(tenant)}/job/{ext}" if ext else _public_root(tenant)
+
+    # description (often short in embedded JSON)
+    desc = j.get("externalPostingDescription") or j.get("jobPostingInfo",{}).get("jobDescription","") or ""
+    desc = strip_html(desc)
+
+    # "Posted 3 Days Ago" on the search API, ISO dates in some embedded JSON
+    posted_at, posted_ts = normalize_posted(
+        j.get("postedOn") or j.get("startDate") or j.get("timeUpdated") or j.get("updatedAt")
+    )
+    remote = "remote" in f"{title} {loc} {desc}".lower()
+
+    if not (title and job_url):
+        return None
+    return {
+        "id": stable_id(job_url, title, company),
+        "title": title,
+        "company": company,
+        "location": loc,
+        "remote": remote,
+        "url": job_url,
+        "posted_at": posted_at,
+        "posted_ts": posted_ts,
+        "description": desc,
+        "source": "workday",
+    }
+
+def list_workday(tenant):
+    """
+    Two-phase mode, step 1: walk the search API (titles, locations, dates; no
+    descriptions) -> [(job, externalPath)]. None if the tenant doesn't expose it,
+    so the caller falls back to fetch_workday().
+    """
+    company = _company(tenant)
+    out, offset, total, seen = [], 0, None, set()
+    for _ in range(CXS_MAX_PAGES):
+        r = SESSION.post(
+            _cxs_jobs_url(tenant),
+            json={"appliedFacets": {}, "limit": CXS_PAGE, "offset": offset, "searchText": ""},
+            headers={"Accept": "application/json"},
+            timeout=budget.timeout(25),  # Deferred once the run's fetch deadline has passed
+        )
+        if offset == 0 and r.status_code != 200:
+            return None
+        r.raise_for_status()  # a later page failing must not look like postings closing
+        data = r.json() or {}
+        posts = data.get("jobPostings") or []
+        if total is None:
+            total = int(data.get("total") or 0)  # later pages may report 0
+        for j in posts:
+            job = _normalize(j, tenant, company)
+            if job and job["id"] not in seen:  # offsets shift when postings open/close mid-walk
+                seen.add(job["id"])
+                out.append((job, j.get("externalPath")))
+        offset += len(posts)
+        if not posts or offset >= total:
+            break
+    if offset < total:
+        mark_truncated(f"listed {offset} of {total}")  # page cap (or an early empty page)
+    return out
+
+def detail_workday(tenant, ref, job):
+    """Two-phase mode, step 2: full description of one posting via the search API's job endpoint."""
+    if not ref:
+        return {}
+    r = SESSION.get(_cxs_root(tenant) + "/" + ref.lstrip("/"), headers={"Accept": "application/json"},
+                    timeout=budget.timeout(25))
+    r.raise_for_status()
+    info = (r.json() or {}).get("jobPostingInfo") or {}
+    desc = strip_html(info.get("jobDescription") or "")
+    return {
+        "description": desc,
+        "remote": "remote" in f"{job.get('title')} {job.get('location')} {desc}".lower(),
+    }
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# tools/bench_startup.py
+"""
+Startup benchmark based on `python -X importtime`.
+
+  python tools/bench_startup.py            # import main + load config, 5 runs
+  python tools/bench_startup.py -r 10 --module tools.peek --top 15
+
+Prints the median import time, the slowest top-level imports and how long
+load_config() takes with a cold vs warm state/config.snapshot.json.
+"""
+
+import sys, time, pathlib, argparse, statistics, subprocess
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def import_profile(module: str):
+    """
+    Run one fresh interpreter with -X importtime.
+    Returns (wall_ms, total_us for `module`, {direct import: cumulative_us}).
+    """
+    t0 = time.perf_counter()
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = (time.perf_counter() - t0) * 1000
+    if p.returncode != 0:
+        raise SystemExit(f"[bench] import {module} failed:\n{p.stderr[-2000:]}")
+    total, children = 0, {}
+    for line in p.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package" (2 spaces per nesting level)
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cum, name = line[len("import time:"):].split("|")
+        except ValueError:
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == module:
+            total = int(cum)
+        elif depth == 1:
+            children[name.strip()] = int(cum)
+    return wall, total, children
+
+
+def config_timing():
+    code = (
+        "import time, utils.config as c\n"
+        "c.SNAPSHOT.unlink(missing_ok=True)\n"
+        "t=time.perf_counter(); c.load_config(); cold=time.perf_counter()-t\n"
+        "t=time.perf_counter(); c.load_config(); warm=time.perf_counter()-t\n"
+        "print(cold*1000, warm*1000)\n"
+    )
+    p = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if p.returncode != 0:
+        return None
+    cold, warm = map(float, p.stdout.split())
+    return cold, warm
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Measure JobWatch cold-start cost")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="How many of the slowest imports to list")
+    args = parser.parse_args(argv)
+
+    walls, totals, per_pkg = [], [], {}
+    for _ in range(args.runs):
+        wall, total, children = import_profile(args.module)
+        walls.append(wall)
+        totals.append(total / 1000)
+        for k, v in children.items():
+            per_pkg.setdefault(k, []).append(v)
+
+    print(f"[bench] import {args.module}: median {statistics.median(totals):.1f} ms cumulative, "
+          f"{statistics.median(walls):.1f} ms interpreter wall ({args.runs} runs)")
+    ranked = sorted(per_pkg.items(), key=lambda kv: -statistics.median(kv[1]))
+    for name, vals in ranked[:args.top]:
+        print(f"  {statistics.median(vals) / 1000:8.1f} ms  {name}")
+
+    cfg = config_timing()
+    if cfg:
+        print(f"[bench] load_config: cold {cfg[0]:.1f} ms (YAML parse), warm {cfg[1]:.2f} ms (snapshot)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
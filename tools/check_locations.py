@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# tools/check_locations.py
+"""
+Regression cases for the structured location filter (utils/locations.py).
+
+  python tools/check_locations.py        # exit status 1 if any case fails
+
+Each case runs match_job() with one include/exclude_locations term against a
+posting location, and compares the result with the expected one and with the
+old substring filter. A case marked `same` must agree with the substring
+filter. That guards against parses that add a place the string does not name,
+e.g. "Birmingham, AL, USA" also parsing as the English Birmingham, so that
+exclude "uk" rejects it.
+"""
+import sys, pathlib
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from utils.filters import match_job, _norm
+
+# (location, config key, term, expected match_job result, same as the substring filter?)
+CASES = [
+    # "City, ST[, Country]": the qualifier picks the city, no foreign namesake is added
+    ("Birmingham, AL, USA", "exclude_locations", "uk", True, True),
+    ("Manchester, NH, USA", "exclude_locations", "uk", True, True),
+    ("Melbourne, FL, USA", "exclude_locations", "australia", True, True),
+    ("London, KY, USA", "exclude_locations", "uk", True, True),
+    ("Victoria, TX, USA", "exclude_locations", "australia", True, True),
+    ("Waterloo, IA, USA", "exclude_locations", "canada", True, True),
+    ("Vancouver, WA, USA", "exclude_locations", "canada", True, True),
+    ("Birmingham, AL, USA", "exclude_locations", "usa", False, True),
+    ("Tbilisi, Georgia", "exclude_locations", "usa", True, True),
+    ("Paris, TX", "exclude_locations", "france", True, True),
+    ("Columbus, GA", "exclude_locations", "ohio", True, True),
+    ("Columbus, GA", "include_locations", "georgia", True, False),  # "GA" is Georgia
+    # the namesakes themselves still parse as before
+    ("Birmingham, UK", "exclude_locations", "uk", False, True),
+    ("Melbourne, Australia", "exclude_locations", "australia", False, True),
+    ("Vancouver, BC", "exclude_locations", "canada", False, False),  # no "canada" in the string
+    ("Paris", "exclude_locations", "france", False, False),
+    ("Tbilisi, Georgia", "include_locations", "georgia", True, True),
+    ("Atlanta, Georgia", "include_locations", "georgia", True, True),
+    ("Cambridge, UK", "exclude_locations", "cambridge", False, True),
+    ("Cambridge, MA", "exclude_locations", "cambridge", False, True),
+    ("Atlanta, Georgia", "include_locations", "usa", True, False),
+    # "In-Office" is not Indiana: a bare region code only counts after a comma or a city
+    ("In-Office - Seattle", "include_locations", "indiana", False, True),
+    ("Seattle, WA (In-Office)", "include_locations", "indiana", False, True),
+    ("In-Office - Seattle", "include_locations", "washington", True, False),
+    ("Seattle (WA)", "include_locations", "washington", True, False),
+    # the reason for structured matching: "uk" is not a substring match
+    ("Kyiv, Ukraine", "exclude_locations", "uk", True, False),
+]
+
+
+def substring_filter(loc, key, term):
+    """match_job's location step before the gazetteer: a plain substring test."""
+    hit = term in _norm(loc)
+    return hit if key == "include_locations" else not hit
+
+
+def main():
+    failed = 0
+    for loc, key, term, expected, same in CASES:
+        job = {"title": "Data Engineer", "company": "Acme", "location": loc, "description": ""}
+        got = match_job(job, {key: [term]})
+        old = substring_filter(loc, key, term)
+        ok = got == expected and (old == got) == same
+        failed += not ok
+        print(f"{'ok ' if ok else 'FAIL'} {loc:<24} {key}={term!r:<12} -> {got} (substring filter: {old})")
+    print(f"\n{len(CASES) - failed}/{len(CASES)} passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
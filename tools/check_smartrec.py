@@ -1,28 +1,37 @@
 #!/usr/bin/env python3
 # tools/check_smartrec.py
-import sys, pathlib, yaml
+import sys, pathlib
 
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from sources.smartrec import fetch_smartrec
+from sources import get_plugin
+from sources.boards import BoardCache, fetch_board
+from utils.config import load_config
 
 def main():
-    cfg_path = ROOT / "config.yml"
-    cfg = yaml.safe_load(cfg_path.read_text(encoding="utf-8")) or {}
+    cfg = load_config(ROOT / "config.yml")
     comps = (cfg.get("sources", {}) or {}).get("smartrec_companies", []) or []
 
     if not comps:
         print("[check] No smartrec_companies in config.yml")
         return
 
+    plugin = get_plugin("smartrecruiters")
+    cache = BoardCache(ROOT / "state" / "cache")
+    fresh = "--fresh" in sys.argv[1:]
     total = 0
     nonzero = 0
+    seen = set()
     for comp in comps:
         label = comp.get("company") if isinstance(comp, dict) else str(comp)
         payload = comp if isinstance(comp, dict) else {"company": label}
+        if plugin.canonical(payload) in seen:
+            print(f"[dup]  {label}")
+            continue
+        seen.add(plugin.canonical(payload))
         try:
-            jobs = fetch_smartrec(payload) or []
+            jobs = fetch_board(plugin, payload, cache=cache, read_cache=not fresh, partial_ok=True) or []
             n = len([j for j in jobs if isinstance(j, dict)])
             total += 1
             if n > 0:
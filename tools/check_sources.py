@@ -1,39 +1,33 @@
 #!/usr/bin/env python3
 # tools/check_sources.py
-import sys, pathlib, yaml
+import sys, pathlib
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from sources.greenhouse import fetch_greenhouse
-from sources.lever import fetch_lever
-from sources.ashby import fetch_ashby
-from sources.smartrec import fetch_smartrec
-from sources.workday import fetch_workday
+from sources import REGISTRY, iter_targets
+from sources.boards import BoardCache, fetch_board
+from utils.config import load_config
 
 def safe_len(objs): return len([o for o in (objs or []) if isinstance(o, dict)])
 
 def main():
-    cfg = yaml.safe_load((ROOT/"config.yml").read_text(encoding="utf-8")) or {}
-    srcs = cfg.get("sources", {}) or {}
+    cfg = load_config(ROOT/"config.yml")
+    # boards fetched in the last 10 minutes (e.g. by main.py) come from state/cache/; --fresh refetches
+    cache = BoardCache(ROOT/"state"/"cache")
+    fresh = "--fresh" in sys.argv[1:]
 
-    def check_list(name, items, fetch_fn, fmt=lambda x: x):
-        if not items: return
-        print(f"\n== {name} ==")
-        for it in items:
-            label = it.get("company") if isinstance(it, dict) else str(it)
-            payload = fmt(it)
+    targets = {}
+    for plugin, label, payload in iter_targets(cfg):
+        targets.setdefault(plugin.key, []).append((label, payload))
+    for plugin in REGISTRY.values():
+        if not targets.get(plugin.key): continue
+        print(f"\n== {plugin.key} ==")
+        for label, payload in targets[plugin.key]:
             try:
-                jobs = fetch_fn(payload)
-                print(f"[{name}] {label:<35} -> {safe_len(jobs)}")
+                jobs = fetch_board(plugin, payload, cache=cache, read_cache=not fresh, partial_ok=True)
+                print(f"[{plugin.key}] {label:<35} -> {safe_len(jobs)}")
             except Exception as e:
-                print(f"[{name}] {label:<35} -> ERR: {e}")
-
-    check_list("greenhouse", srcs.get("greenhouse_orgs", []), fetch_greenhouse, lambda x: str(x))
-    check_list("lever",      srcs.get("lever_orgs", []),      fetch_lever,      lambda x: str(x))
-    check_list("ashby",      srcs.get("ashby_orgs", []),      fetch_ashby,      lambda x: str(x))
-    check_list("smartrec",   srcs.get("smartrec_companies", []), fetch_smartrec,
-               lambda x: x if isinstance(x, dict) else {"company": str(x)})
-    check_list("workday",    srcs.get("workday_tenants", []), fetch_workday,    lambda x: x)
+                print(f"[{plugin.key}] {label:<35} -> ERR: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# tools/companies.py
+"""
+Company registry: raw employer lists (H1B LCA dumps) -> classified, deduplicated
+companies in SQLite (state/companies.db) -> the text lists and the generated
+SmartRecruiters config.
+
+  python tools/companies.py ingest [files...]   # default tools/companies_raw.txt
+  python tools/companies.py export              # tools/companies_clean.txt + companies_consultancies.txt
+  python tools/companies.py smartrec            # config.generated.yml smartrec_companies
+  python tools/companies.py refresh [files...]  # all three
+
+Incremental: a file whose size/mtime hasn't changed since it was ingested is
+skipped, and of a changed one only names the registry doesn't know yet are
+classified. Names are matched on a normalized key (case, punctuation, legal
+suffixes like INC/LLC/Corp and "formerly known as ..." dropped), its
+space-less form ("Data Dog" = "Datadog") and, for longer names, a spelling one
+edit away from a known one. Brand/consultancy keywords are found with one Aho-Corasick pass
+per name. Outputs are only rewritten when the registry changed.
+
+An empty registry (state/ is not committed, so a fresh clone) is first filled
+from tools/companies_raw.txt, and a committed list is never replaced by an
+empty one without --force.
+"""
+
+import re, sys, time, pathlib, sqlite3, argparse
+from collections import deque
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+DB = ROOT / "state" / "companies.db"
+RAW = ROOT / "tools" / "companies_raw.txt"
+CLEAN = ROOT / "tools" / "companies_clean.txt"
+CONSULT = ROOT / "tools" / "companies_consultancies.txt"
+GENERATED = ROOT / "config.generated.yml"
+ACTIVE = ROOT / "config.yml"
+
+SKIP_FULL = {
+    "Employer Name\tH1B LCA Filings Count",
+    "Employer Name H1B LCA Filings Count",
+}
+SKIP_PREFIX = ("Employer Name", "H1B", "Filings", "Count", "[", "]")
+CHAT_STAMP = re.compile(r"^\[?\d{1,2}/\d{1,2}/\d{2,4},\s*\d{1,2}:\d{2}")  # "[9/9/25, 14:28:51] Abhi: ..." pasted from chat
+
+# strong product/company hints: any one makes a name product-like
+BRAND_KEYS = [
+    "google", "meta", "amazon", "microsoft", "tesla", "ibm", "apple", "expedia",
+    "ford", "netflix", "tiktok", "toyota", "cisco", "paypal", "stripe", "uber",
+    "airbnb", "pinterest", "reddit", "robinhood", "cloudflare", "palantir",
+    "databricks", "datadog", "brex", "gusto", "lyft", "plaid", "figma",
+    "snowflake", "nvidia", "qualtrics", "workday", "servicenow", "salesforce",
+    "bytedance", "optum", "mastercard", "barclays", "dropbox", "nike", "amgen",
+]
+# two or more distinct ones (and no brand) make a name a likely consultancy
+CONSULT_KEYS = [
+    "consult", "staff", "solutions", "services", "llc", "inc.", "corp", "corporation",
+    "technologies", "technology", "tech", "systems", " it", "it ", "dba ", "group",
+    "llp", "ltd", "partners", "associates",
+]
+
+LEGAL = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation", "co", "company",
+    "plc", "pllc", "pc", "na", "sa", "ag", "gmbh", "pvt", "the",
+}
+FUZZY_MIN_LEN = 8      # shorter names are too easy to confuse ("Itstac" / "Istac"); longer ones match within 1 edit
+
+
+# ---------------- keyword automaton ----------------
+class Automaton:
+    """Aho-Corasick over a fixed keyword list: all (overlapping) hits in one pass."""
+
+    def __init__(self, words):
+        self.goto, self.fail, self.out = [{}], [0], [set()]
+        for idx, word in enumerate(words):
+            node = 0
+            for ch in word:
+                nxt = self.goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(set())
+                node = nxt
+            self.out[node].add(idx)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                f = self.goto[f].get(ch, 0)
+                self.fail[nxt] = f if f != nxt else 0
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+    def hits(self, text):
+        """Set of keyword indexes occurring in `text`."""
+        found, node = set(), 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            if self.out[node]:
+                found |= self.out[node]
+        return found
+
+
+_KEYS = Automaton(BRAND_KEYS + CONSULT_KEYS)
+_N_BRAND = len(BRAND_KEYS)
+
+
+def classify(name):
+    hits = _KEYS.hits(name.lower())
+    if any(i < _N_BRAND for i in hits):
+        return "product"
+    return "consultancy" if len(hits) >= 2 else "product"
+
+
+# ---------------- names ----------------
+def clean_line(line):
+    """Employer name from one raw dump line, or None for headers/junk."""
+    line = line.strip()
+    if not line or line in SKIP_FULL or CHAT_STAMP.match(line):
+        return None
+    line = re.sub(r"\s+\d+\s*$", "", line)   # trailing filing count
+    line = re.sub(r"^\W+", "", line)         # bullets / leading punctuation
+    line = re.sub(r"\s+", " ", line).strip()
+    if line.startswith(SKIP_PREFIX) or len(line) < 2 or len(line.split()) > 12:
+        return None
+    return line
+
+
+def filings(line):
+    m = re.search(r"\s(\d+)\s*$", line)
+    return int(m.group(1)) if m else 0
+
+
+def norm_name(name):
+    """Matching key: lowercased words without punctuation, legal suffixes or "formerly known as ..."."""
+    s = name.lower().replace("&", " and ")
+    s = re.split(r"\b(?:formerly known as|fka|f/k/a|d/b/a|dba)\b", s)[0]
+    words = re.findall(r"[a-z0-9]+", s)
+    while words and words[-1] in LEGAL:
+        words.pop()
+    while words and words[0] == "the":
+        words.pop(0)
+    return " ".join(words)
+
+
+def to_slug(s):
+    """SmartRecruiters company slug guess (same rule inject_smartrec.py always used)."""
+    s = s.strip().replace("&", "and")
+    s = re.sub(r"[^a-zA-Z0-9\- ]+", "", s)
+    return s.replace(" ", "").lower()
+
+
+# ---------------- registry ----------------
+def connect(path=DB):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS companies (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            norm TEXT NOT NULL UNIQUE,
+            squash TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            slug TEXT,
+            filings INTEGER DEFAULT 0,
+            source TEXT,
+            added_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS companies_squash ON companies (squash);
+        CREATE TABLE IF NOT EXISTS aliases (norm TEXT PRIMARY KEY, company_id INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS ingested (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, names INTEGER);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """
+    )
+    return conn
+
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+class _Index:
+    """
+    In-memory view of the registry for one ingest: exact and space-less lookups,
+    plus names one inserted or dropped letter away from a known one ("Solution" /
+    "Solutions"). Substitutions are not merged: "Csi" and "Cdi" are different
+    firms. Lookups go through single-character deletions, so they cost
+    O(name length) whatever the registry size.
+    """
+
+    def __init__(self, conn):
+        self.norm = dict(conn.execute("SELECT norm, id FROM companies"))
+        self.norm.update(conn.execute("SELECT norm, company_id FROM aliases"))
+        self.squash = {}
+        self.near = {}  # one-letter deletion of a known squash -> id
+        for sq, cid in conn.execute("SELECT squash, id FROM companies ORDER BY id"):
+            self._index(sq, cid)
+
+    def _index(self, squash, cid):
+        self.squash.setdefault(squash, cid)
+        if len(squash) >= FUZZY_MIN_LEN:
+            for key in _deletes(squash):
+                if not key[-1:].isdigit():
+                    self.near.setdefault(key, cid)
+
+    def find(self, norm, squash):
+        cid = self.norm.get(norm) or self.squash.get(squash)
+        if cid or len(squash) < FUZZY_MIN_LEN:
+            return cid
+        cid = self.near.get(squash)  # a letter short of a known name
+        if cid:
+            return cid
+        for key in _deletes(squash):  # a letter more
+            cid = self.squash.get(key) if len(key) >= FUZZY_MIN_LEN else None
+            if cid:
+                return cid
+        return None
+
+    def add(self, norm, squash, cid):
+        self.norm[norm] = cid
+        self._index(squash, cid)
+
+
+def ingest(conn, files, force=False):
+    """Add the names of `files` the registry doesn't know yet. Returns (new, merged) counts."""
+    index = None
+    new = merged = 0
+    for path in files:
+        path = pathlib.Path(path)
+        st = path.stat()
+        row = conn.execute("SELECT size, mtime FROM ingested WHERE path = ?", (str(path.resolve()),)).fetchone()
+        if row and not force and row == (st.st_size, st.st_mtime):
+            print(f"[companies] {path.name}: unchanged since last ingest")
+            continue
+        index = index or _Index(conn)
+        seen = 0
+        with conn:
+            for raw in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+                name = clean_line(raw)
+                if name is None:
+                    continue
+                seen += 1
+                norm = norm_name(name)
+                if not norm:
+                    continue
+                squash = norm.replace(" ", "")
+                cid = index.find(norm, squash)
+                if cid is not None:
+                    if norm not in index.norm:  # new spelling of a known company
+                        conn.execute("INSERT OR IGNORE INTO aliases (norm, company_id) VALUES (?, ?)", (norm, cid))
+                        index.norm[norm] = cid
+                        merged += 1
+                    continue
+                cur = conn.execute(
+                    "INSERT INTO companies (name, norm, squash, kind, slug, filings, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (name, norm, squash, classify(name), to_slug(name), filings(raw), path.name),
+                )
+                index.add(norm, squash, cur.lastrowid)
+                new += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO ingested (path, size, mtime, names) VALUES (?, ?, ?, ?)",
+                (str(path.resolve()), st.st_size, st.st_mtime, seen),
+            )
+        print(f"[companies] {path.name}: {seen} names read")
+    if new or merged:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('changed_at', ?)", (str(time.time()),))
+        conn.commit()
+    print(f"[companies] {new} new, {merged} merged into known companies")
+    return new, merged
+
+
+def _stale(conn, output):
+    """True if the registry changed after `output` was last written by this tool."""
+    changed = conn.execute("SELECT value FROM meta WHERE key = 'changed_at'").fetchone()
+    written = conn.execute("SELECT value FROM meta WHERE key = ?", (f"written:{output}",)).fetchone()
+    return changed is None or written is None or float(written[0]) < float(changed[0])
+
+
+def _written(conn, output):
+    with conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"written:{output}", str(time.time())))
+
+
+def _seed(conn):
+    """
+    state/ isn't committed, so a fresh clone starts with an empty registry:
+    fill it from tools/companies_raw.txt before anything is exported from it.
+    """
+    if conn.execute("SELECT 1 FROM companies LIMIT 1").fetchone() is None and RAW.exists():
+        print(f"[companies] registry is empty; ingesting {RAW.relative_to(ROOT)} first")
+        ingest(conn, [RAW], force=True)
+
+
+def _keeps(path, count, force):
+    """True (with a warning) when writing `count` entries would empty a non-empty `path`."""
+    if count or force or not path.exists() or not path.read_text(encoding="utf-8").strip():
+        return False
+    print(f"[warn] registry has nothing for {path.name}; keeping the existing file (--force to empty it)")
+    return True
+
+
+def export(conn, clean=CLEAN, consult=CONSULT, force=False):
+    _seed(conn)
+    if not force and not _stale(conn, "lists") and clean.exists() and consult.exists():
+        print("[companies] lists up to date")
+        return
+    groups = {"product": [], "consultancy": []}
+    for name, kind in conn.execute("SELECT name, kind FROM companies ORDER BY id"):
+        groups[kind].append(name)
+    if _keeps(clean, len(groups["product"]), force) or _keeps(consult, len(groups["consultancy"]), force):
+        return
+    clean.write_text("\n".join(groups["product"]) + "\n", encoding="utf-8")
+    consult.write_text("\n".join(groups["consultancy"]) + "\n", encoding="utf-8")
+    _written(conn, "lists")
+    print(f"Saved {len(groups['product'])} product-like -> {clean.relative_to(ROOT)}")
+    print(f"Saved {len(groups['consultancy'])} likely consultancies -> {consult.relative_to(ROOT)}")
+
+
+def inject_smartrec(conn, target=GENERATED, active=ACTIVE, force=False):
+    """Write the product-like companies' slugs to `target` (minus what `active` already lists)."""
+    import yaml
+    _seed(conn)
+    if not force and not _stale(conn, f"smartrec:{target}") and target.exists():
+        print(f"[companies] {target.name} up to date")
+        return
+    listed = set()
+    if active.exists() and active.resolve() != target.resolve():
+        srcs = (yaml.safe_load(active.read_text(encoding="utf-8")) or {}).get("sources") or {}
+        for item in srcs.get("smartrec_companies") or []:
+            listed.add(to_slug(item.get("company", "") if isinstance(item, dict) else str(item)))
+
+    slugs, seen = [], set()
+    for (slug,) in conn.execute("SELECT slug FROM companies WHERE kind = 'product' ORDER BY id"):
+        if slug and slug not in seen:
+            seen.add(slug)
+            slugs.append(slug)
+    skipped = sum(1 for s in slugs if s in listed)
+    slugs = [s for s in slugs if s not in listed]
+
+    cfg = yaml.safe_load(target.read_text(encoding="utf-8")) if target.exists() else None
+    cfg = cfg or {}
+    cfg.setdefault("sources", {})
+    if not slugs and cfg["sources"].get("smartrec_companies") and not force:
+        print(f"[warn] registry has no smartrecruiters slugs; keeping {target.name}'s list (--force to empty it)")
+        return
+    if cfg["sources"].get("smartrec_companies") != slugs:
+        cfg["sources"]["smartrec_companies"] = slugs
+        target.write_text(yaml.safe_dump(cfg, sort_keys=False, allow_unicode=True), encoding="utf-8")
+    _written(conn, f"smartrec:{target}")
+    print(f"Injected {len(slugs)} smartrecruiters companies into {target.name}"
+          + (f" ({skipped} already in {active.name} skipped)" if skipped else ""))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Incremental company registry")
+    parser.add_argument("command", choices=("ingest", "export", "smartrec", "refresh"))
+    parser.add_argument("files", nargs="*", help=f"Raw lists to ingest (default: {RAW.relative_to(ROOT)})")
+    parser.add_argument("--db", type=pathlib.Path, default=DB, help="Registry database")
+    parser.add_argument("--target", type=pathlib.Path, default=GENERATED, help="Config the smartrec slugs go to")
+    parser.add_argument("--force", action="store_true",
+                        help="Re-read unchanged files, rewrite outputs (even with an empty list)")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+    t0 = time.perf_counter()
+    if args.command in ("ingest", "refresh"):
+        ingest(conn, args.files or [RAW], force=args.force)
+    if args.command in ("export", "refresh"):
+        export(conn, force=args.force)
+    if args.command in ("smartrec", "refresh"):
+        inject_smartrec(conn, target=args.target, force=args.force)
+    conn.close()
+    print(f"[companies] done in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
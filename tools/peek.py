@@ -21,11 +21,8 @@ import sys, json, pathlib, argparse
 ROOT = pathlib.Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT))
 
-from sources.greenhouse import fetch_greenhouse
-from sources.lever import fetch_lever
-from sources.ashby import fetch_ashby
-from sources.smartrec import fetch_smartrec
-from sources.workday import fetch_workday
+from sources import get_plugin, plugin_names
+from sources.boards import BoardCache, DEFAULT_TTL, fetch_board
 
 
 def pr(s=""):
@@ -52,51 +49,44 @@ def parse_workday_arg(arg: str) -> dict:
 
 def main(argv):
     parser = argparse.ArgumentParser(description="Peek jobs from a source")
-    parser.add_argument("source", choices=["greenhouse", "lever", "ashby", "smartrec", "workday"])
+    parser.add_argument("source", choices=plugin_names(with_aliases=True))
     parser.add_argument("org_or_json", help="Org/slug for all but workday; JSON string or .json file for workday")
     parser.add_argument("-n", "--limit", type=int, default=5, help="How many to show (default 5)")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_TTL,
+                        help="Reuse a board fetched within this many seconds (default %(default)s)")
+    parser.add_argument("--fresh", action="store_true", help="Ignore state/cache/ and download the board")
     args = parser.parse_args(argv)
 
     pr(f"[peek] source={args.source} arg={args.org_or_json} limit={args.limit}")
 
     try:
-        if args.source == "greenhouse":
-            jobs = fetch_greenhouse(args.org_or_json)
-
-        elif args.source == "lever":
-            jobs = fetch_lever(args.org_or_json)
-
-        elif args.source == "ashby":
-            jobs = fetch_ashby(args.org_or_json)
-
-        elif args.source == "smartrec":
-            # Accept either {"company": "<slug>"} or just "<slug>"
-            comp = args.org_or_json.strip()
-            payload = {"company": comp} if not comp.startswith("{") else json.loads(comp)
-            jobs = fetch_smartrec(payload)
-
-        elif args.source == "workday":
-            conf = parse_workday_arg(args.org_or_json)
+        plugin = get_plugin(args.source)
+        arg = args.org_or_json.strip()
+        if plugin.key == "workday":
+            conf = parse_workday_arg(arg)
             if not isinstance(conf, dict):
                 raise ValueError("Workday argument must resolve to a JSON object")
-            jobs = fetch_workday(conf)
-
+            item = conf
+        elif arg.startswith("{"):
+            # e.g. smartrec: accept either {"company": "<slug>"} or just "<slug>"
+            item = json.loads(arg)
         else:
-            pr("Unknown source.")
-            return
+            item = arg
+        cache = BoardCache(ROOT / "state" / "cache", ttl=args.max_age)
+        jobs = fetch_board(plugin, plugin.payload(item), cache=cache, read_cache=not args.fresh, partial_ok=True)
 
     except Exception as e:
         pr(f"[error] fetch failed: {e}")
         return
 
     if not isinstance(jobs, list):
-        pr(f"[warn] fetch returned {type(jobs)._name_}, expected list — nothing to show.")
+        pr(f"[warn] fetch returned {type(jobs).__name__}, expected list — nothing to show.")
         return
 
     pr(f"[peek] fetched {len(jobs)} item(s)")
     for i, j in enumerate(jobs[: args.limit], 1):
         if not isinstance(j, dict):
-            pr(f"{i:>2}. [skip non-dict item: {type(j)._name_}]")
+            pr(f"{i:>2}. [skip non-dict item: {type(j).__name__}]")
             continue
         show(j, i)
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# tools/profile_diff.py
+"""
+Compare two profiled runs (`python main.py run --profile-run`).
+
+  python tools/profile_diff.py state/profile-20261018T0900Z state/profile-20261019T0900Z
+  python tools/profile_diff.py OLD NEW --stage fetch --top 20
+
+Prints per-stage wall time, the functions whose self time changed most and
+the per-source memory peaks. Accepts profile directories or their summary.json.
+"""
+
+import sys, json, pathlib, argparse
+
+
+def load(path):
+    path = pathlib.Path(path)
+    if path.is_dir():
+        path = path / "summary.json"
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _self_times(stage):
+    # only the top-N are recorded; a function missing on one side counts as 0 there
+    return {r["func"]: r["self"] for r in stage.get("top_self", [])}
+
+
+def _kib(n):
+    return f"{(n or 0) / 1024:,.0f} KiB"
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Diff two JobWatch profile summaries")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--stage", action="append", help="Only these stages (repeatable)")
+    parser.add_argument("--top", type=int, default=10, help="Functions listed per stage")
+    args = parser.parse_args(argv)
+
+    old, new = load(args.old), load(args.new)
+    print(f"old {old.get('started')}  ->  new {new.get('started')}")
+    stages = list(new["stages"]) + [s for s in old["stages"] if s not in new["stages"]]
+    for name in stages:
+        if args.stage and name not in args.stage:
+            continue
+        a, b = old["stages"].get(name, {}), new["stages"].get(name, {})
+        wa, wb = a.get("wall_seconds", 0), b.get("wall_seconds", 0)
+        line = f"\n== {name}: {wa:.3f}s -> {wb:.3f}s ({wb - wa:+.3f}s)"
+        if "peak_traced_bytes" in a or "peak_traced_bytes" in b:
+            line += f", peak {_kib(a.get('peak_traced_bytes'))} -> {_kib(b.get('peak_traced_bytes'))}"
+        print(line)
+        sa, sb = _self_times(a), _self_times(b)
+        changes = sorted(set(sa) | set(sb), key=lambda f: -abs(sb.get(f, 0) - sa.get(f, 0)))
+        for func in changes[:args.top]:
+            ta, tb = sa.get(func, 0), sb.get(func, 0)
+            print(f"  {tb - ta:+9.4f}s  {ta:8.4f} -> {tb:8.4f}  {func}")
+
+    sources = sorted(set(old.get("sources", {})) | set(new.get("sources", {})))
+    if sources:
+        print("\n== memory per source (largest org snapshot)")
+        for src in sources:
+            a, b = old.get("sources", {}).get(src, {}), new.get("sources", {}).get(src, {})
+            print(f"  {src:<16} {_kib(a.get('peak')):>12} -> {_kib(b.get('peak')):>12}  ({b.get('org') or '-'})")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
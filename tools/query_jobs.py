@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# tools/query_jobs.py
+"""
+Search job history in state/jobs.db.
+
+Examples:
+  python tools/query_jobs.py --company stripe --since 2026-10-12
+  python tools/query_jobs.py "data engineer" --source greenhouse -n 20
+  python tools/query_jobs.py "airflow OR dagster" --since 2026-10-01 --json
+"""
+
+import sys, json, time, pathlib, argparse
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from db import get_conn, search_jobs
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Query historical postings")
+    parser.add_argument("text", nargs="?", help="Full-text query over title/description (FTS5 syntax)")
+    parser.add_argument("--company", help="Company/org (case-insensitive)")
+    parser.add_argument("--source", help="greenhouse, lever, ashby, smartrecruiters, workday")
+    parser.add_argument("--since", help="first_seen >= this (YYYY-MM-DD)")
+    parser.add_argument("--until", help="first_seen < this (YYYY-MM-DD)")
+    parser.add_argument("-n", "--limit", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print JSON lines instead of a table")
+    args = parser.parse_args(argv)
+
+    conn = get_conn()
+    t0 = time.perf_counter()
+    try:
+        rows = search_jobs(conn, args.text, args.company, args.source, args.since, args.until, args.limit)
+    except Exception as e:
+        print(f"[error] query failed: {e}")
+        return 1
+    ms = (time.perf_counter() - t0) * 1000
+
+    for r in rows:
+        if args.json:
+            print(json.dumps(r, ensure_ascii=False))
+        else:
+            print(f"{r['first_seen'][:10]}  {r['title']} @ {r['company']} — {r['location'] or ''}")
+            print(f"            {r['url']}")
+    print(f"[query] {len(rows)} row(s) in {ms:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# tools/workday_validate.py
+"""
+Bulk Workday tenant validation / discovery.
+
+Inputs are tenant URLs or plain company names (args and/or -f file, one per line).
+URLs are checked as-is; names are expanded into host x wdN x site-path candidates.
+Every candidate is validated with one limit=1 call to the tenant's search API,
+in parallel on a bounded pool. The best-ranked hit per input wins (candidates
+are ordered most likely first); once one is found, that input's lower-ranked
+candidates are skipped without a request.
+
+Examples:
+  python tools/workday_validate.py https://nvidia.wd5.myworkdayjobs.com/en-US/NVIDIAExternalCareerSite
+  python tools/workday_validate.py "Dell" "Accenture" --workers 48
+  python tools/workday_validate.py -f tools/companies_clean.txt --max-candidates 60 > workday.yml
+"""
+
+import re, sys, time, pathlib, argparse, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import yaml
+import requests
+from requests.adapters import HTTPAdapter
+
+from sources.workday import parse_tenant_url, probe_workday
+
+SUBDOMAINS = ["wd1", "wd5", "wd3", "wd12", "wd103", "wd501", "wd10", "wd108"]
+_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "plc", "the", "group", "holdings"}
+
+
+def host_variants(name: str):
+    ws = [w for w in re.split(r"[^a-z0-9]+", name.lower()) if w and w not in _SUFFIXES]
+    if not ws:
+        return []
+    out = ["".join(ws), "-".join(ws), ws[0]]
+    return list(dict.fromkeys(v for v in out if v))
+
+
+def path_variants(host: str):
+    cap = "".join(p.capitalize() for p in re.split(r"[-_]", host))
+    up = host.upper()
+    return list(dict.fromkeys([
+        host, f"{cap}Careers", "External", "Careers", f"{cap}_Careers", "External_Careers",
+        f"{up}ExternalCareerSite", f"{cap}ExternalCareerSite", f"{host}_careers", "jobs",
+    ]))
+
+
+def candidates(item: str, max_candidates: int):
+    """Ordered tenant dicts to try for one input line."""
+    t = parse_tenant_url(item)
+    if t:
+        return [t]
+    label = item.strip()
+    out = []
+    hosts = host_variants(label)
+    # breadth first: most likely path on every wdN before the long tail
+    paths = {h: path_variants(h) for h in hosts}
+    for i in range(max(len(p) for p in paths.values()) if paths else 0):
+        for sub in SUBDOMAINS:
+            for h in hosts:
+                if i < len(paths[h]):
+                    out.append({"subdomain": sub, "host": h, "path": paths[h][i], "company": label})
+    return out[:max_candidates]
+
+
+def interleave(lists):
+    """Round-robin across inputs so every input gets its likeliest probes early."""
+    iters = [iter(l) for l in lists]
+    while iters:
+        alive = []
+        for it in iters:
+            v = next(it, None)
+            if v is not None:
+                yield v
+                alive.append(it)
+        iters = alive
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Validate/discover Workday tenants in parallel")
+    parser.add_argument("items", nargs="*", help="Tenant URLs or company names")
+    parser.add_argument("-f", "--file", help="File with one URL or company name per line")
+    parser.add_argument("--workers", type=int, default=32, help="Parallel probes (default 32)")
+    parser.add_argument("--max-candidates", type=int, default=80, help="Probe budget per company name")
+    parser.add_argument("--timeout", type=float, default=8.0)
+    args = parser.parse_args(argv)
+
+    items = [i.strip() for i in args.items if i.strip()]
+    if args.file:
+        items += [l.strip() for l in pathlib.Path(args.file).read_text(encoding="utf-8").splitlines() if l.strip()]
+    items = list(dict.fromkeys(items))
+    if not items:
+        parser.print_usage()
+        return 2
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=args.workers, pool_maxsize=args.workers)
+    session.mount("https://", adapter)
+
+    found, lock = {}, threading.Lock()  # item -> (rank, tenant, jobs, url) of its best-ranked hit so far
+    per_item = [[(item, rank, c) for rank, c in enumerate(candidates(item, args.max_candidates))] for item in items]
+    total = sum(len(p) for p in per_item)
+    print(f"[validate] {len(items)} input(s), {total} candidate(s), {args.workers} workers", file=sys.stderr)
+
+    def check(item, rank, tenant):
+        best = found.get(item)
+        if best is not None and best[0] < rank:  # a likelier candidate already won; skip the request
+            return
+        ok, n, url = probe_workday(tenant, session=session, timeout=args.timeout)
+        if ok:
+            with lock:
+                best = found.get(item)
+                if best is None or rank < best[0]:
+                    found[item] = (rank, tenant, n, url)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(check, item, rank, t) for item, rank, t in interleave(per_item)]
+        for fut in as_completed(futures):
+            fut.result()
+
+    for item in items:
+        if item in found:
+            _, t, n, url = found[item]
+            print(f"[ok]   {item} -> {t['host']}.{t['subdomain']}/{t['path']} (jobs={n}) {url}", file=sys.stderr)
+        else:
+            print(f"[miss] {item}", file=sys.stderr)
+    print(f"[validate] {len(found)}/{len(items)} valid in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    if found:
+        print("# ---- Suggested config.yml snippet ----")
+        print("sources:")
+        print("  workday_tenants:")
+        for item in items:
+            if item in found:
+                t = found[item][1]
+                entry = {k: t[k] for k in ("subdomain", "host", "path", "company")}
+                print("    - " + yaml.safe_dump(entry, default_flow_style=True, sort_keys=False, width=10_000).strip())
+    return 0 if found else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,154 @@
+# utils/api.py
+"""
+Read-only HTTP API over state/jobs.db: `python main.py serve`.
+
+  GET /jobs?q=python&company=acme&source=workday&since=2026-10-01&until=...
+           &profile=default&status=open|closed&limit=50&after=<cursor>
+
+Newest first. The response is {"jobs": [...], "next": cursor or null}; pass
+`next` back as `after` for the following page (keyset pagination, so deep
+pages cost the same as the first one). `q` is an FTS5 query.
+
+Every response carries an ETag (hash of the body); send it back as
+If-None-Match and an unchanged page is a bodyless 304. Pages are kept in an
+in-memory LRU that is dropped whenever the database changes (SQLite's
+data_version moves when another connection commits), so a dashboard polling
+the same query only touches SQLite after a run wrote something.
+
+The server holds one read-only connection; with jobs.db in WAL mode its reads
+never block a concurrent `main.py run`, and it never writes.
+"""
+import json
+import base64
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from db import DB, get_read_conn, page_jobs
+
+FILTERS = ("q", "company", "source", "since", "until", "profile", "status")
+DEFAULT_LIMIT = 50
+
+
+def encode_cursor(after) -> str:
+    raw = json.dumps(list(after), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str):
+    try:
+        first_seen, seq = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        return str(first_seen), int(seq)
+    except (ValueError, TypeError):
+        raise ValueError("bad cursor")
+
+
+class JobsAPI:
+    """Query + cache layer; the HTTP handler only parses and writes."""
+
+    def __init__(self, conn, cache_size=256, max_limit=500):
+        self.conn = conn
+        self.cache_size = int(cache_size)
+        self.max_limit = int(max_limit)
+        self._cache = OrderedDict()  # query key -> (etag, body)
+        self._version = None
+        self._lock = threading.Lock()  # one connection shared by the handler threads
+        self.hits = self.misses = 0
+
+    def query(self, params):
+        """(etag, body bytes) for parsed query params; ValueError on bad input."""
+        unknown = set(params) - set(FILTERS) - {"limit", "after"}
+        if unknown:
+            raise ValueError(f"unknown parameter(s): {', '.join(sorted(unknown))}")
+        limit = int(params.get("limit") or DEFAULT_LIMIT)
+        if not 1 <= limit <= self.max_limit:
+            raise ValueError(f"limit must be 1..{self.max_limit}")
+        if params.get("status") not in (None, "", "open", "closed"):
+            raise ValueError("status must be open or closed")
+        after = decode_cursor(params["after"]) if params.get("after") else None
+        filters = {k: params[k] for k in FILTERS if params.get(k)}
+        filters["text"] = filters.pop("q", None)
+        key = (limit, after, tuple(sorted(filters.items())))
+
+        with self._lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return hit
+            self.misses += 1
+            try:
+                rows, next_after = page_jobs(self.conn, after=after, limit=limit, **filters)
+            except sqlite3.OperationalError as e:  # typically FTS syntax in `q`
+                raise ValueError(f"bad query: {e}")
+            body = json.dumps(
+                {"jobs": rows, "next": encode_cursor(next_after) if next_after else None},
+                ensure_ascii=False, separators=(",", ":"),
+            ).encode("utf-8")
+            etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+            self._cache[key] = (etag, body)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return etag, body
+
+
+class Handler(BaseHTTPRequestHandler):
+    api = None  # set by serve()
+    server_version = "JobWatch"
+    quiet = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found; try /jobs"})
+        try:
+            qs = parse_qs(url.query, keep_blank_values=True)
+            etag, body = self.api.query({k: v[-1] for k, v in qs.items()})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        tags = [t.strip() for t in (self.headers.get("If-None-Match") or "").split(",")]
+        if etag in tags or "*" in tags:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self._send(200, body, etag)
+
+    def _send(self, status, payload, etag=None):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")  # always revalidate; 304s are cheap
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+
+def serve(host="127.0.0.1", port=8080, cache_size=256, max_limit=500, db_path=DB, verbose=False):
+    conn = get_read_conn(db_path)
+    Handler.api = JobsAPI(conn, cache_size=cache_size, max_limit=max_limit)
+    Handler.quiet = not verbose
+    httpd = ThreadingHTTPServer((host, int(port)), Handler)
+    httpd.daemon_threads = True
+    print(f"[serve] http://{host}:{httpd.server_address[1]}/jobs (read-only {db_path})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        conn.close()
+        print(f"[serve] stopped; cache hits {Handler.api.hits}, misses {Handler.api.misses}")
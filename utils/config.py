@@ -0,0 +1,124 @@
+# utils/config.py
+import os
+import json
+import hashlib
+from pathlib import Path
+
+SNAPSHOT = Path("state") / "config.snapshot.json"
+SNAPSHOT_VERSION = 1
+
+LIST_KEYS = (
+    "include_titles", "exclude_titles", "keywords_any", "must_have_any", "ignore_words",
+    "include_locations", "exclude_locations",
+)
+SECTION_KEYS = ("sources", "notify", "filters", "fetch", "storage", "archive", "scoring", "dedupe", "health", "run",
+                "profiles", "closed", "sync", "serve")
+
+
+def _parse_yaml(text: str):
+    import yaml  # only paid for when the snapshot is stale
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)  # libyaml is ~10x faster when present
+    return yaml.load(text, Loader=loader) or {}
+
+
+def validate_config(cfg):
+    """Return a list of problems (empty when the config is usable)."""
+    problems = []
+    if not isinstance(cfg, dict):
+        return ["top level must be a mapping"]
+    for key in SECTION_KEYS:
+        if cfg.get(key) is not None and not isinstance(cfg[key], dict):
+            problems.append(f"{key}: expected a mapping, got {type(cfg[key]).__name__}")
+    scopes = [("", cfg), ("filters.", cfg.get("filters") or {})]
+    profiles = cfg.get("profiles") or {}
+    if isinstance(profiles, dict):
+        for name, p in profiles.items():
+            if p is not None and not isinstance(p, dict):
+                problems.append(f"profiles.{name}: expected a mapping, got {type(p).__name__}")
+                continue
+            p = p or {}
+            scopes.append((f"profiles.{name}.", p.get("filters") or p))
+            if p.get("notify") is not None and not isinstance(p["notify"], dict):
+                problems.append(f"profiles.{name}.notify: expected a mapping")
+    for scope, fc in scopes:
+        if not isinstance(fc, dict):
+            continue
+        for key in LIST_KEYS:
+            val = fc.get(key)
+            if val is not None and not isinstance(val, list):
+                problems.append(f"{scope}{key}: expected a list, got {type(val).__name__}")
+        days = fc.get("min_posted_days_ago")
+        if days is not None and not isinstance(days, int):
+            problems.append(f"{scope}min_posted_days_ago: expected an integer")
+    srcs = cfg.get("sources") or {}
+    if isinstance(srcs, dict):
+        for key, val in srcs.items():
+            if val is not None and not isinstance(val, list):
+                problems.append(f"sources.{key}: expected a list, got {type(val).__name__}")
+        for i, t in enumerate(srcs.get("workday_tenants") or []):
+            if not isinstance(t, dict) or not t.get("subdomain") or not (t.get("host") or t.get("tenant")):
+                problems.append(f"sources.workday_tenants[{i}]: needs subdomain and host/tenant")
+    return problems
+
+
+def _read_snapshot(path: Path, st, digest=None):
+    try:
+        snap = json.loads(SNAPSHOT.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+    if snap.get("version") != SNAPSHOT_VERSION or snap.get("path") != str(path.resolve()):
+        return None
+    if snap.get("mtime_ns") == st.st_mtime_ns and snap.get("size") == st.st_size:
+        return snap
+    if digest is not None and snap.get("sha256") == digest:
+        return snap
+    return None
+
+
+def _write_snapshot(path: Path, st, digest, cfg):
+    snap = {
+        "version": SNAPSHOT_VERSION,
+        "path": str(path.resolve()),
+        "mtime_ns": st.st_mtime_ns,
+        "size": st.st_size,
+        "sha256": digest,
+        "config": cfg,
+    }
+    try:
+        SNAPSHOT.parent.mkdir(exist_ok=True)
+        tmp = SNAPSHOT.with_suffix(".tmp")
+        tmp.write_text(json.dumps(snap, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(SNAPSHOT)
+    except Exception as e:
+        print(f"[warn] config snapshot not written: {e}")
+
+
+def load_config(path=None, use_snapshot=True):
+    """
+    Load + validate config.yml. A validated copy is cached as JSON in
+    state/config.snapshot.json, keyed by mtime/size and sha256 of the file, so
+    unchanged configs skip YAML parsing (and the yaml import) entirely.
+    """
+    path = Path(path or os.getenv("CONFIG_PATH") or "config.yml")
+    st = path.stat()
+
+    if use_snapshot:
+        snap = _read_snapshot(path, st)
+        if snap is not None:
+            return snap["config"]
+
+    raw = path.read_bytes()
+    digest = hashlib.sha256(raw).hexdigest()
+    if use_snapshot:
+        snap = _read_snapshot(path, st, digest)
+        if snap is not None:  # touched but unchanged: refresh the mtime key
+            _write_snapshot(path, st, digest, snap["config"])
+            return snap["config"]
+
+    cfg = _parse_yaml(raw.decode("utf-8"))
+    problems = validate_config(cfg)
+    if problems:
+        raise ValueError(f"invalid config {path}: " + "; ".join(problems))
+    if use_snapshot:
+        _write_snapshot(path, st, digest, cfg)
+    return cfg
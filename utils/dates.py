@@ -0,0 +1,88 @@
+# utils/dates.py
+"""
+Posting dates -> integer epoch seconds, once, when a source normalizes a posting.
+
+Sources disagree on the format: Greenhouse/Ashby/SmartRecruiters send ISO 8601,
+Lever epoch milliseconds, Workday text like "Posted 3 Days Ago". Absolute strings
+are memoized (the same timestamps repeat across orgs and runs); relative ones
+are memoized as a day offset and anchored to the current UTC day.
+"""
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+DAY = 86400
+_RELATIVE = re.compile(r"\b(?:(today|just now)|(yesterday)|(\d+)\+?\s*days?\s+ago)\b", re.IGNORECASE)
+
+
+def _from_number(x) -> Optional[int]:
+    x = int(x)
+    if x <= 0:
+        return None
+    return x // 1000 if x > 10**11 else x  # epoch ms (Lever) vs seconds
+
+
+@lru_cache(maxsize=8192)
+def _parse_absolute(text: str) -> Optional[int]:
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            dt = parsedate_to_datetime(text)  # RFC 2822, e.g. from RSS-ish feeds
+        except (TypeError, ValueError):
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+@lru_cache(maxsize=256)
+def _relative_days(text: str) -> Optional[int]:
+    m = _RELATIVE.search(text)
+    if not m:
+        return None
+    if m.group(1):
+        return 0
+    if m.group(2):
+        return 1
+    return int(m.group(3))  # "30+ Days Ago" -> at least 30
+
+
+def parse_posted(value: Any, now: Optional[float] = None) -> Optional[int]:
+    """Epoch seconds for any source's posted/updated value; None if unreadable."""
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return _from_number(value)
+    text = str(value).strip()
+    if text.isdigit():
+        return _from_number(text)
+    if "ago" in text.lower() or "today" in text.lower() or "yesterday" in text.lower():
+        days = _relative_days(text)
+        if days is not None:
+            now = time.time() if now is None else now
+            return (int(now) // DAY - days) * DAY
+    return _parse_absolute(text)
+
+
+def iso(ts: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+def normalize_posted(value: Any, now: Optional[float] = None) -> Tuple[Optional[str], Optional[int]]:
+    """(posted_at, posted_ts) for a job dict: UTC ISO text + epoch, or (raw text, None) if unreadable."""
+    ts = parse_posted(value, now)
+    if ts is None:
+        return (str(value) if value not in (None, "") else None), None
+    return iso(ts), ts
+
+
+def job_ts(job: Dict[str, Any]) -> Optional[int]:
+    """A job's posted_ts; parses posted_at for postings stored before it existed (old snapshots)."""
+    ts = job.get("posted_ts")
+    if ts is None:
+        ts = parse_posted(job.get("posted_at"))
+    return ts
@@ -0,0 +1,67 @@
+# utils/dedupe.py
+"""
+Near-duplicate signatures for postings that appear on several boards or under
+several Workday locations with different URLs (and therefore different ids).
+
+group_key: hash of normalized company + title (location is left out on purpose,
+           multi-location copies are exactly what we want to collapse)
+simhash:   64-bit SimHash over 3-word shingles of the description; two postings
+           in the same group are duplicates when the hashes differ in only a few bits
+"""
+import re
+import hashlib
+
+from utils.text import strip_html
+
+_SUFFIXES = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "plc", "gmbh", "lp", "llp", "the"}
+_PAREN = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_NONWORD = re.compile(r"[^a-z0-9]+")
+
+
+def norm_company(s) -> str:
+    words = _NONWORD.sub(" ", (s or "").lower()).split()
+    return " ".join(w for w in words if w not in _SUFFIXES)
+
+
+def norm_title(s) -> str:
+    # "Data Engineer (Remote) - 12345" -> "data engineer"
+    t = _PAREN.sub(" ", (s or "").lower())
+    t = re.sub(r"\b(req|job)?\s*#?\s*\d{4,}\b", " ", t)
+    return " ".join(_NONWORD.sub(" ", t).split())
+
+
+def group_key(job) -> str:
+    raw = f"{norm_company(job.get('company'))}|{norm_title(job.get('title'))}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash; 0 for empty text (callers treat 0 as "no description")."""
+    words = _NONWORD.sub(" ", (text or "").lower()).split()
+    if not words:
+        return 0
+    shingles = {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+    # bit-column majority vote; counting '1's per column of the binary strings keeps
+    # the inner loop in C instead of 64 Python ops per shingle
+    rows = [format(_h64(sh), "064b") for sh in shingles]
+    half = len(rows) / 2
+    bits = "".join("1" if col.count("1") > half else "0" for col in zip(*rows))
+    return int(bits, 2)
+
+
+def to_signed(h: int) -> int:
+    """SQLite INTEGER is signed 64-bit."""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+def signature(job):
+    """(group_key, signed simhash) for a normalized job dict."""
+    return group_key(job), to_signed(simhash(strip_html(job.get("description") or "")))
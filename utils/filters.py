@@ -1,9 +1,11 @@
 # utils/filters.py
 import re
-from datetime import datetime, timezone
+import time
 from typing import Dict, Any, Iterable, Optional
 
 from utils.text import strip_html
+from utils.dates import DAY, job_ts
+from utils.locations import parse_location, parse_term, place_matches
 
 
 def _norm(s: Optional[str]) -> str:
@@ -54,22 +56,161 @@ def _all_match(text: str, terms: Iterable[str]) -> bool:
     return True
 
 
-def _days_since_iso(iso_str: Optional[str]) -> Optional[int]:
-    if not iso_str:
+def _age_cutoff(max_age_days, now: Optional[float] = None) -> Optional[int]:
+    """Postings stamped at or before this epoch are more than `max_age_days` whole days old."""
+    if max_age_days is None:
         return None
-    try:
-        dt = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return int((datetime.now(timezone.utc) - dt).total_seconds() // 86400)
-    except Exception:
+    now = time.time() if now is None else now
+    return int(now) - (int(max_age_days) + 1) * DAY
+
+
+def _parse_term(raw):
+    """("sub", lowered) or ("re", compiled) for one filter term; None if blank."""
+    term = (raw or "").strip()
+    if not term:
         return None
+    if len(term) >= 2 and term.startswith("/") and term.endswith("/"):
+        try:
+            return "re", re.compile(term[1:-1], flags=re.IGNORECASE)
+        except re.error:
+            # fallback to substring if regex is invalid
+            return "sub", term[1:-1].lower()
+    return "sub", term.lower()
+
+
+class _Terms:
+    """Pre-processed term list with the same semantics as _match_any (substring or /regex/)."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.subs, self.regexes = [], []
+        for raw in terms or []:
+            parsed = _parse_term(raw)
+            if parsed is None:
+                continue
+            kind, val = parsed
+            (self.regexes if kind == "re" else self.subs).append(val)
+
+    def __bool__(self):
+        return bool(self.subs or self.regexes)
+
+    def any(self, t: str) -> bool:
+        """`t` must already be normalized with _norm()."""
+        return any(s in t for s in self.subs) or any(r.search(t) for r in self.regexes)
+
+
+def _parse_loc_term(raw):
+    """
+    Like _parse_term, but a plain location term the gazetteer understands
+    ("usa", "uk", "remote - usa") becomes ("place", (patterns, text)) and is
+    compared on structured fields, so "uk" no longer matches "Ukraine".
+    """
+    parsed = _parse_term(raw)
+    if parsed is None or parsed[0] == "re":
+        return parsed
+    patterns = parse_term(parsed[1])
+    return ("place", (patterns, parsed[1])) if patterns else parsed
+
+
+def _place_hit(value, loc: str, places) -> bool:
+    """A ("place", value) term against a posting; postings the gazetteer can't read fall back to substring."""
+    patterns, text = value
+    if not places:
+        return text in loc
+    return any(place_matches(pat, p) for pat in patterns for p in places)
+
+
+class _LocTerms:
+    """include/exclude_locations: structured place terms plus substring/regex ones."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.places, self.rest = [], _Terms(())
+        for raw in terms or []:
+            parsed = _parse_loc_term(raw)
+            if parsed is None:
+                continue
+            kind, val = parsed
+            if kind == "place":
+                self.places.append(val)
+            else:
+                (self.rest.regexes if kind == "re" else self.rest.subs).append(val)
+
+    def __bool__(self):
+        return bool(self.places or self.rest)
+
+    def any(self, loc: str) -> bool:
+        """`loc` must already be normalized with _norm()."""
+        if self.rest and self.rest.any(loc):
+            return True
+        if self.places:
+            places = parse_location(loc)
+            return any(_place_hit(v, loc, places) for v in self.places)
+        return False
+
+
+class CompiledFilter:
+    """
+    match_job() with the config pre-processed once: terms are lower-cased and
+    regexes compiled up front, and the description is only stripped/normalized
+    when a keyword list actually needs it. Call it like a function: f(job) -> bool.
+    """
+
+    def __init__(self, cfg: Dict[str, Any], now: Optional[float] = None):
+        self.include_titles = _Terms(cfg.get("include_titles"))
+        self.exclude_titles = _Terms(cfg.get("exclude_titles"))
+        self.include_locations = _LocTerms(cfg.get("include_locations"))
+        self.exclude_locations = _LocTerms(cfg.get("exclude_locations"))
+        self.keywords_any = _Terms(cfg.get("keywords_any"))
+        self.must_have_any = _Terms(cfg.get("must_have_any"))  # legacy compat
+        self.ignore_words = _Terms(cfg.get("ignore_words"))    # legacy compat
+        self.remote_ok = bool(cfg.get("remote_ok"))
+        # posting-age window as one epoch cutoff for the whole run
+        self.min_ts = _age_cutoff(cfg.get("min_posted_days_ago"), now)
+
+    def __call__(self, job: Dict[str, Any]) -> bool:
+        if not isinstance(job, dict):
+            return False
+
+        if self.min_ts is not None:
+            ts = job_ts(job)
+            if ts is not None and ts <= self.min_ts:
+                return False
+
+        title = _norm(job.get("title"))
+        if self.include_titles and not self.include_titles.any(title):
+            return False
+        if self.exclude_titles and self.exclude_titles.any(title):
+            return False
+
+        if self.keywords_any or self.must_have_any or self.ignore_words:
+            hay = f"{title}\n{_norm(strip_html(job.get('description') or ''))}"
+            if self.keywords_any and not self.keywords_any.any(hay):
+                return False
+            if self.must_have_any and not self.must_have_any.any(hay):
+                return False
+            if self.ignore_words and self.ignore_words.any(hay):
+                return False
+
+        loc = _norm(job.get("location"))
+        job_is_remote = bool(job.get("remote")) or ("remote" in (title + " " + loc))
+        if self.include_locations and not self.include_locations.any(loc):
+            if not (self.remote_ok and job_is_remote):
+                return False
+        if self.exclude_locations and self.exclude_locations.any(loc):
+            if not (self.remote_ok and job_is_remote):
+                return False
+
+        return True
+
+
+def compile_filter(cfg: Dict[str, Any], now: Optional[float] = None) -> CompiledFilter:
+    return CompiledFilter(cfg or {}, now)
 
 
 def match_job(job: Dict[str, Any], cfg: Dict[str, Any]) -> bool:
     """
     Decide whether a normalized job dict should be notified.
     Expected fields (best-effort): title, company, location, description, posted_at, remote.
+    (Reference implementation; hot loops should use compile_filter(cfg) instead.)
     """
     # --- Hard guard: ignore malformed items (e.g., SmartRecruiters edge cases) ---
     if not isinstance(job, dict):
@@ -90,11 +231,11 @@ def match_job(job: Dict[str, Any], cfg: Dict[str, Any]) -> bool:
     ignore_words = cfg.get("ignore_words") or []    # legacy compat
 
     # Posted window: only alert if posted/updated within the last N days
-    max_age_days = cfg.get("min_posted_days_ago")
-    if max_age_days is not None:
-        days = _days_since_iso(job.get("posted_at"))
+    cutoff = _age_cutoff(cfg.get("min_posted_days_ago"))
+    if cutoff is not None:
+        ts = job_ts(job)
         # If date is parseable and older than threshold -> skip
-        if days is not None and days > int(max_age_days):
+        if ts is not None and ts <= cutoff:
             return False
 
     # Title include/exclude
@@ -111,13 +252,13 @@ def match_job(job: Dict[str, Any], cfg: Dict[str, Any]) -> bool:
     if ignore_words and _match_any(hay, ignore_words):
         return False
 
-    # Location include/exclude (respect explicit remote flag too)
+    # Location include/exclude, on parsed places (respect explicit remote flag too)
     remote_ok = bool(cfg.get("remote_ok"))
     job_is_remote = bool(job.get("remote")) or ("remote" in (title + " " + loc))
-    if include_locations and not _match_any(loc, include_locations):
+    if include_locations and not _LocTerms(include_locations).any(loc):
         if not (remote_ok and job_is_remote):
             return False
-    if exclude_locations and _match_any(loc, exclude_locations):
+    if exclude_locations and _LocTerms(exclude_locations).any(loc):
         if not (remote_ok and job_is_remote):
             return False
 
@@ -0,0 +1,139 @@
+# utils/health.py
+"""
+Per-org health and circuit breaker, persisted in the org_health table.
+
+After `failure_threshold` consecutive failures (or one "permanent" failure such
+as 404/401/403) an org's circuit opens and it is skipped until open_until.
+The cool-down doubles with every further failure up to `max_cooldown`. When it
+expires the org gets one trial fetch: success closes the circuit, failure
+re-opens it for longer.
+"""
+import json
+import time
+from datetime import datetime
+
+LATENCY_WINDOW = 20  # samples kept per org
+YIELD_ALPHA = 0.3    # EWMA weight of the latest run's new-match count
+DEFAULT_LATENCY_MS = 3000  # assumed for orgs with no history yet
+PERMANENT = ("404", "401", "403", "410")
+
+
+def error_class(e) -> str:
+    """Short, stable description: "HTTPError 404", "ReadTimeout", ..."""
+    name = type(e).__name__
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    return f"{name} {status}" if status else name
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    xs = sorted(samples)
+    idx = min(len(xs) - 1, max(0, round(pct / 100 * (len(xs) - 1))))
+    return xs[idx]
+
+
+class HealthTracker:
+    def __init__(self, conn, failure_threshold=3, cooldown=3600, max_cooldown=7 * 86400, now=None):
+        self.conn = conn
+        self.threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown)
+        self.max_cooldown = float(max_cooldown)
+        self.now = time.time() if now is None else now
+        self.rows = {}
+        for key, fails, err, err_at, ok_at, until, lat, yrate, deferred in conn.execute(
+            "SELECT key, consecutive_failures, last_error, last_error_at, last_ok_at, open_until, latencies, "
+            "yield_rate, deferred FROM org_health"
+        ):
+            self.rows[key] = {
+                "fails": fails or 0, "error": err, "error_at": err_at, "ok_at": ok_at,
+                "open_until": until or 0, "latencies": json.loads(lat or "[]"),
+                "yield_rate": yrate or 0.0, "deferred": bool(deferred),
+            }
+        self.tripped = []   # keys whose circuit opened during this run
+        self.skipped = []   # keys skipped because their circuit was open
+        self._dirty = set()
+
+    def _row(self, key):
+        return self.rows.setdefault(key, {
+            "fails": 0, "error": None, "error_at": None, "ok_at": None, "open_until": 0, "latencies": [],
+            "yield_rate": 0.0, "deferred": False,
+        })
+
+    def allow(self, key) -> bool:
+        """False while the org's circuit is open (and remember it was skipped)."""
+        row = self.rows.get(key)
+        if row and row["open_until"] > self.now:
+            self.skipped.append(key)
+            return False
+        return True
+
+    def priority(self, key):
+        """
+        Sort key for scheduling (lower first): leftovers of a run that hit its
+        deadline, then highest expected new matches per second of fetch time.
+        """
+        row = self.rows.get(key)
+        if row is None:
+            return (1, -1.0 / DEFAULT_LATENCY_MS)
+        p50 = percentile(row["latencies"], 50) or DEFAULT_LATENCY_MS
+        return (0 if row["deferred"] else 1, -(row["yield_rate"] + 0.01) / max(p50, 1))
+
+    def defer(self, key):
+        """Not fetched because the run ran out of time: go first next run."""
+        self._row(key)["deferred"] = True
+        self._dirty.add(key)
+
+    def record_yield(self, key, new_matches: int):
+        row = self._row(key)
+        row["yield_rate"] = (1 - YIELD_ALPHA) * row["yield_rate"] + YIELD_ALPHA * new_matches
+        self._dirty.add(key)
+
+    def record(self, key, error=None, latency=None):
+        row = self._row(key)
+        row["deferred"] = False
+        stamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        if latency is not None:
+            row["latencies"] = (row["latencies"] + [round(latency * 1000)])[-LATENCY_WINDOW:]
+        if error is None:
+            row.update(fails=0, ok_at=stamp, open_until=0)
+        else:
+            cls = error_class(error) if isinstance(error, BaseException) else str(error)
+            row.update(fails=row["fails"] + 1, error=cls, error_at=stamp)
+            permanent = any(code in cls for code in PERMANENT)
+            if row["fails"] >= self.threshold or permanent:
+                extra = max(0, row["fails"] - (1 if permanent else self.threshold))
+                row["open_until"] = self.now + min(self.max_cooldown, self.cooldown * 2 ** extra)
+                self.tripped.append(key)
+        self._dirty.add(key)
+
+    def save(self):
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT OR REPLACE INTO org_health
+                    (key, consecutive_failures, last_error, last_error_at, last_ok_at, open_until, latencies,
+                     yield_rate, deferred)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (k, r["fails"], r["error"], r["error_at"], r["ok_at"], r["open_until"],
+                     json.dumps(r["latencies"]), r["yield_rate"], int(r["deferred"]))
+                    for k, r in ((k, self.rows[k]) for k in self._dirty)
+                ],
+            )
+        self._dirty.clear()
+
+    def describe(self, key) -> str:
+        r = self.rows.get(key) or {}
+        until = datetime.utcfromtimestamp(r.get("open_until") or 0).strftime("%m-%d %H:%M")
+        return f"{key} ({r.get('fails', 0)}x {r.get('error') or '?'}; retry after {until} UTC)"
+
+    def report(self):
+        """Rows for `main.py health`: key, fails, last error, open_until, p50/p95 ms."""
+        out = []
+        for key, r in sorted(self.rows.items()):
+            lat = r["latencies"]
+            out.append((key, r["fails"], r["error"] or "", r["open_until"] > self.now,
+                        percentile(lat, 50), percentile(lat, 95)))
+        return out
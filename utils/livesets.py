@@ -0,0 +1,63 @@
+# utils/livesets.py
+"""
+Compact per-org sets of live posting ids: each id becomes a 64-bit hash prefix
+(signed, so it fits an SQLite INTEGER), and a set is a sorted array('q') stored
+as a BLOB (8 bytes per posting). Two runs are compared with one linear merge.
+"""
+import sys
+import hashlib
+from array import array
+
+
+def id_hash(job_id) -> int:
+    """First 8 bytes of blake2b(id) as a signed 64-bit int."""
+    digest = hashlib.blake2b(str(job_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def build(ids) -> array:
+    """Sorted, de-duplicated hash array for an iterable of job ids."""
+    return array("q", sorted({id_hash(i) for i in ids if i is not None}))
+
+
+def pack(hashes: array) -> bytes:
+    """Little-endian bytes (the stored format is the same on every machine)."""
+    if sys.byteorder == "big":
+        hashes = array("q", hashes)
+        hashes.byteswap()
+    return hashes.tobytes()
+
+
+def unpack(blob) -> array:
+    out = array("q")
+    if blob:
+        out.frombytes(bytes(blob))
+        if sys.byteorder == "big":
+            out.byteswap()
+    return out
+
+
+def union(old: array, new: array) -> array:
+    """Sorted union of two hash arrays (a truncated listing can only add ids)."""
+    return array("q", sorted(set(old) | set(new)))
+
+
+def diff(old: array, new: array):
+    """(added, removed) hash lists between two sorted arrays, in one merge pass."""
+    added, removed = [], []
+    i = j = 0
+    n_old, n_new = len(old), len(new)
+    while i < n_old and j < n_new:
+        a, b = old[i], new[j]
+        if a == b:
+            i += 1
+            j += 1
+        elif a < b:
+            removed.append(a)
+            i += 1
+        else:
+            added.append(b)
+            j += 1
+    removed.extend(old[i:])
+    added.extend(new[j:])
+    return added, removed
@@ -0,0 +1,253 @@
+# utils/locations.py
+"""
+Free-text posting locations -> structured places.
+
+"San Francisco, CA", "USA - Remote", "London, England, UK; New York, NY" are
+folded (case, accents, dots), tokenized and looked up longest-match-first in a
+token trie built from the bundled gazetteer (utils/gazetteer.json).
+parse_location() is LRU-cached on the raw string: the same few hundred strings
+repeat across thousands of postings.
+"""
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+GAZETTEER = Path(__file__).with_name("gazetteer.json")
+REMOTE_WORDS = ("remote", "anywhere", "wfh", "work from home", "distributed", "telecommute")
+
+_SEGMENT = re.compile(r"[,;/|()\[\]\-–—]")
+# work-arrangement words whose first token is also a region code ("IN", "ON")
+_NOT_PLACE = re.compile(r"\b(?:in[\s\-–—]*(?:office|person)|on[\s\-–—]*site)\b")
+_TOKEN = re.compile(r"[a-z0-9]+")
+_END = ""  # trie key holding the entries of a complete phrase
+
+
+class Place(NamedTuple):
+    country: Optional[str] = None  # ISO code, e.g. "US"
+    region: Optional[str] = None   # e.g. "US-CA"
+    city: Optional[str] = None     # display name, e.g. "San Francisco"
+    remote: bool = False
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.lower().replace(".", "")  # "u.s." -> "us", "st. louis" -> "st louis"
+
+
+def _tokens(text: str):
+    """
+    [(token, segment_no, separator before the segment)]; segments are the
+    comma/dash/slash separated parts. "In-Office" / "on-site" are dropped.
+    """
+    text = _NOT_PLACE.sub(" ", _fold(text))
+    out, start, seg, sep = [], 0, 0, ""
+    for m in list(_SEGMENT.finditer(text)) + [None]:
+        part = text[start:m.start()] if m else text[start:]
+        out.extend((tok, seg, sep) for tok in _TOKEN.findall(part))
+        if m:
+            start, seg, sep = m.end(), seg + 1, m.group()
+    return out
+
+
+@lru_cache(maxsize=None)
+def _trie():
+    """Token trie: nested dicts, complete phrases carry [(kind, value, abbr)] under _END."""
+    data = json.loads(GAZETTEER.read_text(encoding="utf-8"))
+    root = {}
+
+    def add(phrase, entry):
+        node = root
+        for tok in _TOKEN.findall(_fold(phrase)):
+            node = node.setdefault(tok, {})
+        node.setdefault(_END, []).append(entry)
+
+    # regions first: a bare "Georgia" is the US state unless the string says otherwise
+    for code, reg in data["regions"].items():
+        for name in reg.get("names", []):
+            add(name, ("region", code, False))
+        for abbr in reg.get("codes", []):
+            add(abbr, ("region", code, True))  # "CA", "ON", "IN": only as a whole part
+    for code, names in data["countries"].items():
+        for name in names:
+            add(name, ("country", code, False))
+    for name, where, aliases in data["cities"]:
+        region = where if "-" in where else None
+        city = (name, region, where.split("-")[0])
+        for alias in [name] + list(aliases):
+            add(alias, ("city", city, False))
+    for word in REMOTE_WORDS:
+        add(word, ("remote", True, False))
+    return root
+
+
+def _country(entry):
+    kind, value, _ = entry
+    if kind == "country":
+        return value
+    if kind == "region":
+        return value.split("-")[0]
+    if kind == "city":
+        return value[2]
+    return None
+
+
+def _region(entry):
+    kind, value, _ = entry
+    if kind == "region":
+        return value
+    if kind == "city":
+        return value[1]
+    return None
+
+
+def _scan(tokens):
+    """
+    Longest gazetteer matches, left to right: [([candidate entries], matched text), ...].
+    A region code ("WA", "IN") counts only as a whole part that follows a comma
+    or a city ("Seattle, WA", "Seattle (WA)"), or as the entire string (a filter
+    term "ny"); elsewhere two letters are too often a word.
+    """
+    root, found, i, n = _trie(), [], 0, len(tokens)
+    seg_len = {}
+    for _, seg, _ in tokens:
+        seg_len[seg] = seg_len.get(seg, 0) + 1
+    while i < n:
+        node, best, j = root, None, i
+        after_city = bool(found) and any(e[0] == "city" for e in found[-1][0])
+        code_ok = n == 1 or tokens[i][2] == "," or after_city
+        while j < n and tokens[j][0] in node:
+            node = node[tokens[j][0]]
+            j += 1
+            entries = node.get(_END)
+            if entries:
+                whole = j - i == seg_len[tokens[i][1]] and tokens[i][1] == tokens[j - 1][1]
+                entries = [e for e in entries if (whole and code_ok) or not e[2]]
+                if entries:
+                    best = (entries, j)
+        if best:
+            found.append((best[0], " ".join(tok for tok, _, _ in tokens[i:best[1]])))
+            i = best[1]
+        else:
+            i += 1
+    return found
+
+
+def _qualified(matches):
+    """
+    Narrow each city (or region) by the region/country parts that follow it:
+    "Birmingham, AL, USA" is a Birmingham in Alabama, not the English one next
+    to a US state; "Paris, TX" is in Texas, "Columbus, GA" in Georgia,
+    "Victoria, TX" a town rather than the Australian state. A candidate that
+    agrees with the qualifier wins ("Cambridge, MA", "Tbilisi, Georgia");
+    if none does, the name becomes a city of the qualifying region. A region
+    only yields to a region of another country ("Ontario, Quebec" stays two
+    provinces). Returns a candidate list per match.
+    """
+    out = [cands for cands, _ in matches]
+    for i, (cands, text) in enumerate(matches):
+        kinds = {e[0] for e in cands}
+        if not kinds & {"city", "region"}:
+            continue
+        regions, countries = set(), set()  # what the following parts name
+        for later, _ in matches[i + 1:]:
+            later_kinds = {e[0] for e in later}
+            if later_kinds & {"city", "remote"}:
+                break  # the next location starts
+            regions.update(e[1] for e in later if e[0] == "region")
+            countries.update(e[1] for e in later if e[0] == "country")
+        if not (regions or countries):
+            continue
+        fits = [e for e in cands if _region(e) in regions] or [e for e in cands if _country(e) in countries]
+        if fits:
+            out[i] = fits
+            continue
+        if "city" not in kinds and {_country(e) for e in cands} & {r.split("-")[0] for r in regions}:
+            continue  # a region listed next to another region of the same country
+        region = next(iter(regions)) if len(regions) == 1 else None
+        country = region.split("-")[0] if region else (next(iter(countries)) if len(countries) == 1 else None)
+        if country is None:
+            continue
+        name = next((e[1][0] for e in cands if e[0] == "city"), text.title())
+        out[i] = [("city", (name, region, country), False)]
+    return out
+
+
+@lru_cache(maxsize=4096)
+def parse_location(raw: str) -> Tuple[Place, ...]:
+    """
+    Structured places in a location string, e.g.
+      "San Francisco, CA"          -> (Place("US", "US-CA", "San Francisco"),)
+      "Remote - USA"               -> (Place("US", remote=True),)
+      "London, UK; Toronto, ON"    -> (Place("GB", "GB-ENG", "London"), Place("CA", "CA-ON", "Toronto"))
+    Empty when nothing is recognized.
+    """
+    matches = _scan(_tokens(raw))
+    if not matches:
+        return ()
+    matches = _qualified(matches)
+
+    # ambiguous names (Cambridge, "WA") follow the countries named unambiguously
+    known = {_country(m[0]) for m in matches if len(m) == 1} - {None}
+    remote = False
+    places, cur = [], {}
+
+    def flush():
+        if cur:
+            places.append(cur.copy())
+            cur.clear()
+
+    for cands in matches:
+        kind, value, _ = next((e for e in cands if _country(e) in known), cands[0])
+        if kind == "remote":
+            remote = True
+            continue
+        country = _country((kind, value, False))
+        if cur.get("country") not in (None, country):
+            flush()
+        if kind == "city":
+            name, region, _ = value
+            if cur.get("city") or (region and cur.get("region") not in (None, region)):
+                flush()
+            cur["city"] = name
+            cur["region"] = cur.get("region") or region
+        elif kind == "region":
+            if cur.get("region") not in (None, value):
+                flush()
+            cur["region"] = value
+        cur["country"] = country
+    flush()
+
+    if not places:
+        return (Place(remote=True),)
+    return tuple(Place(p.get("country"), p.get("region"), p.get("city"), remote) for p in places)
+
+
+@lru_cache(maxsize=1024)
+def parse_term(raw: str) -> Tuple[Place, ...]:
+    """
+    Places a filter term stands for. Like parse_location(), except that a bare
+    ambiguous name ("georgia", "cambridge") keeps every reading, so the term
+    matches whichever one a posting means.
+    """
+    matches = _scan(_tokens(raw))
+    if len(matches) == 1 and len(matches[0][0]) > 1:
+        out = []
+        for entry in matches[0][0]:
+            city = entry[1][0] if entry[0] == "city" else None
+            out.append(Place(_country(entry), _region(entry), city))
+        return tuple(dict.fromkeys(out))
+    return parse_location(raw)
+
+
+def place_matches(pattern: Place, place: Place) -> bool:
+    """True if `place` satisfies every field `pattern` sets (a parsed filter term)."""
+    return (
+        (not pattern.country or pattern.country == place.country)
+        and (not pattern.region or pattern.region == place.region)
+        and (not pattern.city or pattern.city == place.city)
+        and (not pattern.remote or place.remote)
+    )
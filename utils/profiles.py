@@ -0,0 +1,186 @@
+# utils/profiles.py
+"""
+Named filter profiles that share one fetch. Every profile is an ordinary filter
+config (same keys as the top-level filters); ProfileIndex evaluates all of them
+in one pass per posting: each distinct term is checked at most once and its hit
+is fanned out to every profile that uses it (one bit per term, one mask per
+profile list).
+"""
+from typing import Any, Dict, List, Optional
+
+from utils.config import LIST_KEYS
+from utils.dates import job_ts
+from utils.filters import _norm, _age_cutoff, _parse_term, _parse_loc_term, _place_hit
+from utils.locations import parse_location
+from utils.text import strip_html
+
+DEFAULT = "default"
+FILTER_KEYS = LIST_KEYS + ("remote_ok", "min_posted_days_ago")
+
+
+def resolve_profiles(cfg: Dict[str, Any]):
+    """
+    [(name, filters_cfg, notify_cfg)] for every enabled profile.
+    "default" is the top-level filters + notify (unless profiles.default overrides
+    it); other profiles inherit any filter key they don't set from the top level.
+    """
+    base = cfg.get("filters") or cfg
+    base_filters = {k: base[k] for k in FILTER_KEYS if base.get(k) is not None}
+    profiles = dict(cfg.get("profiles") or {})
+
+    out = []
+    if DEFAULT not in profiles:
+        out.append((DEFAULT, base, cfg.get("notify") or {}))
+    for name, p in profiles.items():
+        p = p or {}
+        if p.get("enabled") is False:
+            continue
+        own = p.get("filters") or p
+        filters = dict(base_filters)
+        filters.update({k: v for k, v in own.items() if k in FILTER_KEYS})
+        notify = p.get("notify")
+        if notify is None and name == DEFAULT:
+            notify = cfg.get("notify")
+        out.append((str(name), filters, notify or {}))
+    return out
+
+
+class _TermTable:
+    """Distinct terms of one text field, each with its own bit."""
+
+    def __init__(self, locations=False):
+        self.terms = []   # [(bit, kind, value)]
+        self._bits = {}   # (kind, pattern) -> bit
+        self._parse = _parse_loc_term if locations else _parse_term
+
+    def mask(self, raw_terms) -> int:
+        m = 0
+        for raw in raw_terms or []:
+            parsed = self._parse(raw)
+            if parsed is None:
+                continue
+            kind, val = parsed
+            key = (kind, val.pattern if kind == "re" else val[1] if kind == "place" else val)
+            bit = self._bits.get(key)
+            if bit is None:
+                bit = self._bits[key] = 1 << len(self.terms)
+                self.terms.append((bit, kind, val))
+            m |= bit
+        return m
+
+    def hits(self, text: str, want: int) -> int:
+        """Bits of the wanted terms found in `text` (already normalized)."""
+        out, places = 0, None
+        for bit, kind, val in self.terms:
+            if not want & bit:
+                continue
+            if kind == "place":
+                if places is None:
+                    places = parse_location(text)  # once per posting, LRU-cached across postings
+                hit = _place_hit(val, text, places)
+            else:
+                hit = val in text if kind == "sub" else val.search(text)
+            if hit:
+                out |= bit
+        return out
+
+
+class _Profile:
+    def __init__(self, name, cfg, titles, hay, locs, now=None):
+        self.name = name
+        self.inc_title = titles.mask(cfg.get("include_titles"))
+        self.exc_title = titles.mask(cfg.get("exclude_titles"))
+        self.keywords_any = hay.mask(cfg.get("keywords_any"))
+        self.must_have_any = hay.mask(cfg.get("must_have_any"))
+        self.ignore_words = hay.mask(cfg.get("ignore_words"))
+        self.inc_loc = locs.mask(cfg.get("include_locations"))
+        self.exc_loc = locs.mask(cfg.get("exclude_locations"))
+        self.remote_ok = bool(cfg.get("remote_ok"))
+        self.min_ts = _age_cutoff(cfg.get("min_posted_days_ago"), now)
+        self.title_need = self.inc_title | self.exc_title
+        self.hay_need = self.keywords_any | self.must_have_any | self.ignore_words
+        self.loc_need = self.inc_loc | self.exc_loc
+
+
+class ProfileIndex:
+    """
+    index.match(job) -> names of the profiles whose filter accepts the job.
+    Same decisions as CompiledFilter(profile_cfg)(job) for every profile.
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, Any]], now: Optional[float] = None):
+        self._titles, self._hay, self._locs = _TermTable(), _TermTable(), _TermTable(locations=True)
+        self.profiles = [
+            _Profile(name, cfg or {}, self._titles, self._hay, self._locs, now) for name, cfg in profiles.items()
+        ]
+        self._any_age = any(p.min_ts is not None for p in self.profiles)
+
+    @property
+    def names(self) -> List[str]:
+        return [p.name for p in self.profiles]
+
+    def match(self, job: Dict[str, Any]) -> List[str]:
+        if not isinstance(job, dict):
+            return []
+        alive = self.profiles
+
+        if self._any_age:
+            ts = job_ts(job)
+            if ts is not None:
+                alive = [p for p in alive if p.min_ts is None or ts > p.min_ts]
+
+        title = _norm(job.get("title"))
+        want = 0
+        for p in alive:
+            want |= p.title_need
+        if want:
+            hit = self._titles.hits(title, want)
+            alive = [p for p in alive if (not p.inc_title or hit & p.inc_title) and not hit & p.exc_title]
+
+        # the description is only stripped when a surviving profile has keyword lists
+        want = 0
+        for p in alive:
+            want |= p.hay_need
+        if want:
+            hay = f"{title}\n{_norm(strip_html(job.get('description') or ''))}"
+            hit = self._hay.hits(hay, want)
+            alive = [
+                p for p in alive
+                if (not p.keywords_any or hit & p.keywords_any)
+                and (not p.must_have_any or hit & p.must_have_any)
+                and not hit & p.ignore_words
+            ]
+
+        want = 0
+        for p in alive:
+            want |= p.loc_need
+        if want:
+            loc = _norm(job.get("location"))
+            hit = self._locs.hits(loc, want)
+            job_is_remote = bool(job.get("remote")) or ("remote" in (title + " " + loc))
+            kept = []
+            for p in alive:
+                rejected = (p.inc_loc and not hit & p.inc_loc) or hit & p.exc_loc
+                if not rejected or (p.remote_ok and job_is_remote):
+                    kept.append(p)
+            alive = kept
+
+        return [p.name for p in alive]
+
+
+def listing_filter(filter_cfgs: Dict[str, Dict[str, Any]]):
+    """
+    Conservative pre-check for two-phase fetching, on listing fields only: title
+    and age, plus location for profiles without remote_ok (remote-ness may only
+    show in the description). Never rejects a posting that some profile's full
+    filter would accept. Returns job -> bool.
+    """
+    relaxed = {}
+    for name, cfg in filter_cfgs.items():
+        r = {k: cfg.get(k) for k in ("include_titles", "exclude_titles", "min_posted_days_ago")}
+        if not cfg.get("remote_ok"):
+            r["include_locations"] = cfg.get("include_locations")
+            r["exclude_locations"] = cfg.get("exclude_locations")
+        relaxed[name] = r
+    index = ProfileIndex(relaxed)
+    return lambda job: bool(index.match(job))
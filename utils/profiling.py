@@ -0,0 +1,262 @@
+# utils/profiling.py
+"""
+Opt-in run profiling: `main.py run --profile-run [cpu,mem]` or JOBWATCH_PROFILE=1
+(cpu / mem / 1 = both) in CI.
+
+cpu: every stage (fetch, filter, db, notify) gets its own cProfile profile.
+Fetch is profiled inside the worker threads, one profile per org call merged
+per stage, since that is where HTTP, JSON decoding and the sources' parsing run.
+From Python 3.12 only one cProfile profiler may be active per process, so
+there the workers record wall time (and memory) only and the fetch stage has
+no function table; the main-thread stages are profiled as before. Profiling
+never fails a fetch: a profiler that can't start is skipped.
+mem: tracemalloc runs for the whole run; each org fetch ends with a snapshot
+filtered to allocations made through its source module (taken while the
+result is still alive, after the fetch's time was taken), and the largest one
+per source is kept.
+
+Output, in state/profile-<ts>/ (profile-<ts>-2, -3... for runs or shards that
+started in the same second):
+  summary.json   stage wall/profiled seconds, top functions (self and cumulative),
+                 per-source peak and top allocation sites
+  <stage>.prof   raw pstats dump (python -m pstats, snakeviz)
+  <stage>.txt, memory.txt   the same top-N, readable
+Names are repo-relative ("sources/workday.py:88(_normalize)"), so summaries of
+different runs compare directly: python tools/profile_diff.py OLD NEW
+"""
+import io
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_ENV = "JOBWATCH_PROFILE"
+# 3.12+ (sys.monitoring) allows a single active profiler: none in the fetch workers there
+THREAD_PROFILES = sys.version_info < (3, 12)
+STAGES = ("fetch", "filter", "db", "notify")
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_modes(value) -> set:
+    """"1"/"all"/"cpu,mem" -> {"cpu", "mem"}; ""/"0"/None -> set()."""
+    text = str(value or "").strip().lower()
+    if text in ("", "0", "false", "no", "off"):
+        return set()
+    if text in ("1", "true", "yes", "on", "all"):
+        return {"cpu", "mem"}
+    modes = {m.strip() for m in text.split(",") if m.strip()}
+    unknown = modes - {"cpu", "mem"}
+    if unknown:
+        raise ValueError(f"unknown profile mode(s) {sorted(unknown)}; use cpu, mem or both")
+    return modes
+
+
+def _where(path, line=None, func=None) -> str:
+    """Repo-relative (or site-packages/stdlib-relative) location, stable across machines."""
+    path = str(path)
+    try:
+        path = Path(path).resolve().relative_to(ROOT).as_posix()
+    except (ValueError, OSError):
+        path = path.replace(os.sep, "/")
+        for marker in ("/site-packages/", "/lib/python"):
+            if marker in path:
+                path = path.split(marker, 1)[1]
+                if marker == "/lib/python":
+                    path = path.split("/", 1)[-1]  # drop "3.11/"
+                break
+    out = path
+    if line is not None:
+        out += f":{line}"
+    if func is not None:
+        out += f"({func})"
+    return out
+
+
+def _top_functions(stats, top):
+    rows = []
+    for (path, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        name = func if path == "~" else _where(path, line, func)  # "~" = builtins
+        rows.append({"func": name, "calls": ncalls, "self": round(tottime, 6), "cumulative": round(cumtime, 6)})
+    by_self = sorted(rows, key=lambda r: -r["self"])[:top]
+    by_cum = sorted(rows, key=lambda r: -r["cumulative"])[:top]
+    return by_self, by_cum
+
+
+def _start(prof):
+    """prof.enable(), or None when another profiler is already active (3.12+, or an outside one)."""
+    if prof is None:
+        return None
+    try:
+        prof.enable()
+    except ValueError as e:
+        print(f"[profile] cProfile not started: {e}")
+        return None
+    return prof
+
+
+def _new_dir(parent, name) -> Path:
+    """parent/name, or name-2, name-3... if a run started in the same second already has it."""
+    parent.mkdir(parents=True, exist_ok=True)
+    n = 1
+    while True:
+        out = parent / (name if n == 1 else f"{name}-{n}")
+        try:
+            out.mkdir()
+            return out
+        except FileExistsError:
+            n += 1
+
+
+class RunProfiler:
+    """No-op unless `modes` is non-empty; stage() and wrap() are safe to call either way."""
+
+    def __init__(self, modes=(), top=30, frames=12):
+        self.modes = set(modes)
+        self.top = top
+        self.frames = frames
+        self._lock = threading.Lock()
+        self._profiles = {}   # stage -> cProfile.Profile (main thread)
+        self._fetch = None    # pstats.Stats merged from the worker threads
+        self._wall = {}       # stage -> seconds spent inside stage()
+        self._peak = {}       # stage -> highest traced bytes while inside it
+        self._sources = {}    # source -> {"peak", "org", "sites"}
+        self.started = time.time()
+        if "mem" in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    @classmethod
+    def from_env(cls, flag=None):
+        """`flag` from the CLI (None = not given) wins over JOBWATCH_PROFILE."""
+        return cls(parse_modes(flag if flag is not None else os.getenv(PROFILE_ENV)))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.modes)
+
+    @contextmanager
+    def stage(self, name):
+        if not self.modes:
+            yield
+            return
+        prof = None
+        if "cpu" in self.modes:
+            prof = self._profiles.get(name) or self._profiles.setdefault(name, cProfile.Profile())
+        if "mem" in self.modes:
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        prof = _start(prof)
+        try:
+            yield
+        finally:
+            if prof:
+                prof.disable()
+            self._wall[name] = self._wall.get(name, 0.0) + time.perf_counter() - t0
+            if "mem" in self.modes:
+                self._peak[name] = max(self._peak.get(name, 0), tracemalloc.get_traced_memory()[1])
+
+    def wrap(self, plugin, label, fn):
+        """
+        Fetch callable for one org, profiled in whichever worker thread runs it.
+        The memory snapshot is its `after()`: the engine calls it once the fetch
+        has been timed (result still alive), so the seconds that go to org
+        health and scheduling don't include tracemalloc.take_snapshot().
+        """
+        if not self.modes:
+            return fn
+        module = "*/" + plugin.module.replace(".", "/") + ".py"
+
+        def run(payload):
+            prof = _start(cProfile.Profile()) if "cpu" in self.modes and THREAD_PROFILES else None
+            t0 = time.perf_counter()
+            try:
+                return fn(payload)
+            finally:
+                self._record_fetch(prof, time.perf_counter() - t0)
+
+        def snapshot():
+            try:
+                self._snapshot(plugin.key, label, module)
+            except Exception as e:  # the profile is only a report; the fetch itself succeeded
+                print(f"[profile] {plugin.key}:{label}: memory snapshot skipped ({e})")
+
+        if "mem" in self.modes:
+            run.after = snapshot
+        return run
+
+    def _record_fetch(self, prof, secs):
+        try:
+            if prof:
+                prof.disable()
+            with self._lock:
+                self._wall["fetch"] = self._wall.get("fetch", 0.0) + secs
+                if prof:
+                    if self._fetch is None:
+                        self._fetch = pstats.Stats(prof)
+                    else:
+                        self._fetch.add(prof)
+        except Exception as e:
+            print(f"[profile] fetch profile not recorded ({e})")
+
+    def _snapshot(self, source, label, module):
+        snap = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, module, all_frames=True)])
+        size = sum(t.size for t in snap.traces)
+        with self._lock:
+            if size <= self._sources.get(source, {}).get("peak", -1):
+                return
+        sites = [
+            {"site": _where(s.traceback[0].filename, s.traceback[0].lineno), "bytes": s.size, "blocks": s.count}
+            for s in snap.statistics("lineno")[:self.top]
+        ]
+        with self._lock:
+            if size > self._sources.get(source, {}).get("peak", -1):
+                self._sources[source] = {"peak": size, "org": label, "sites": sites}
+
+    def finish(self, out_dir=None):
+        """Write the report; returns its directory (None when profiling is off)."""
+        if not self.modes:
+            return None
+        stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(self.started))
+        if out_dir:
+            out = Path(out_dir)
+            out.mkdir(parents=True, exist_ok=True)
+        else:
+            out = _new_dir(Path("state"), f"profile-{stamp}")
+
+        summary = {"started": stamp, "modes": sorted(self.modes), "stages": {}, "sources": {}}
+        stats = {name: pstats.Stats(p) for name, p in self._profiles.items() if p.getstats()}
+        if self._fetch is not None:
+            stats["fetch"] = self._fetch
+        for name in [s for s in STAGES if s in self._wall] + sorted(set(self._wall) - set(STAGES)):
+            entry = {"wall_seconds": round(self._wall[name], 4)}
+            if name in self._peak:
+                entry["peak_traced_bytes"] = self._peak[name]
+            st = stats.get(name)
+            if st is not None:
+                entry["profiled_seconds"] = round(st.total_tt, 4)
+                entry["top_self"], entry["top_cumulative"] = _top_functions(st, self.top)
+                st.dump_stats(out / f"{name}.prof")
+                buf = io.StringIO()
+                st.stream = buf
+                st.sort_stats("cumulative").print_stats(self.top)
+                (out / f"{name}.txt").write_text(buf.getvalue(), encoding="utf-8")
+            summary["stages"][name] = entry
+
+        if "mem" in self.modes:
+            lines = []
+            for source, rec in sorted(self._sources.items()):
+                summary["sources"][source] = rec
+                lines.append(f"== {source}: {rec['peak'] / 1024:.0f} KiB live at the end of {rec['org']}")
+                lines.extend(f"  {s['bytes'] / 1024:>9.1f} KiB {s['blocks']:>7}  {s['site']}" for s in rec["sites"])
+            (out / "memory.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+            tracemalloc.stop()
+
+        (out / "summary.json").write_text(json.dumps(summary, indent=1), encoding="utf-8")
+        took = ", ".join(f"{k} {v['wall_seconds']:.2f}s" for k, v in summary["stages"].items())
+        print(f"[profile] {took} -> {out}")
+        return out
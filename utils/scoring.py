@@ -0,0 +1,103 @@
+# utils/scoring.py
+"""
+Relevance scoring for matched jobs, built on the same filter config:
+
+  score = title weight of the best include_titles hit (longer terms count more)
+        + keyword weight * distinct keywords_any hits (capped)
+        + recency weight * 0.5 ** (age_days / half_life)
+        + remote bonus
+
+Weights can be tuned under `scoring:` in config.yml.
+"""
+import re
+import time
+import heapq
+from typing import Dict, Any, Iterable, List, Optional
+
+from utils.text import strip_html
+from utils.dates import job_ts
+
+DEFAULTS = {
+    "title_weight": 3.0,       # per word of the matched include_titles term
+    "title_weights": {},       # explicit overrides, e.g. {"data engineer": 8}
+    "keyword_weight": 1.0,     # per distinct keywords_any hit
+    "keyword_cap": 5,
+    "recency_weight": 4.0,
+    "recency_half_life_days": 3,
+    "remote_bonus": 2.0,
+}
+
+
+def _pattern(terms: Iterable[str]) -> Optional["re.Pattern"]:
+    """One alternation for the whole list, so each text is scanned once per group."""
+    parts = []
+    for raw in terms or []:
+        term = (raw or "").strip()
+        if not term:
+            continue
+        if len(term) >= 2 and term.startswith("/") and term.endswith("/"):
+            try:
+                re.compile(term[1:-1])
+                parts.append(f"(?:{term[1:-1]})")
+                continue
+            except re.error:
+                term = term[1:-1]
+        parts.append(re.escape(term.lower()))
+    if not parts:
+        return None
+    # longest first so "data engineer" wins over "data"
+    parts.sort(key=len, reverse=True)
+    return re.compile("|".join(parts), flags=re.IGNORECASE)
+
+
+class Scorer:
+    def __init__(self, filters_cfg: Dict[str, Any], scoring_cfg: Optional[Dict[str, Any]] = None):
+        w = dict(DEFAULTS)
+        w.update(scoring_cfg or {})
+        self.w = w
+        self.title_re = _pattern(filters_cfg.get("include_titles"))
+        self.kw_re = _pattern(filters_cfg.get("keywords_any"))
+        self.title_overrides = {k.lower(): float(v) for k, v in (w.get("title_weights") or {}).items()}
+
+    def _title_score(self, title: str) -> float:
+        if not self.title_re:
+            return 0.0
+        best = 0.0
+        for m in self.title_re.finditer(title):
+            hit = m.group(0).lower()
+            best = max(best, self.title_overrides.get(hit, float(self.w["title_weight"]) * len(hit.split())))
+        return best
+
+    def score_batch(self, jobs: List[Dict[str, Any]], now: Optional[float] = None) -> List[float]:
+        """Score a whole batch with one clock read and one regex pass per text."""
+        now = time.time() if now is None else now
+        kw_w, kw_cap = float(self.w["keyword_weight"]), int(self.w["keyword_cap"])
+        rec_w, half = float(self.w["recency_weight"]), float(self.w["recency_half_life_days"]) or 1.0
+        remote_w = float(self.w["remote_bonus"])
+
+        out = []
+        for j in jobs:
+            title = (j.get("title") or "").lower()
+            s = self._title_score(title)
+            if self.kw_re:
+                hay = f"{title}\n{strip_html(j.get('description') or '').lower()}"
+                hits = {m.group(0).lower() for m in self.kw_re.finditer(hay)}
+                s += kw_w * min(len(hits), kw_cap)
+            ts = job_ts(j)
+            if ts is not None:
+                age_days = max(0.0, (now - ts) / 86400)
+                s += rec_w * 0.5 ** (age_days / half)
+            if j.get("remote") or "remote" in f"{title} {(j.get('location') or '').lower()}":
+                s += remote_w
+            out.append(round(s, 3))
+        return out
+
+    def score(self, job: Dict[str, Any]) -> float:
+        return self.score_batch([job])[0]
+
+
+def top_k(jobs: List[Dict[str, Any]], k: int, scorer: Scorer):
+    """Best `k` jobs as [(score, job)], highest first (heap, O(n log k))."""
+    scores = scorer.score_batch(jobs)
+    best = heapq.nlargest(k, range(len(jobs)), key=lambda i: (scores[i], -i))  # ties keep input order
+    return [(scores[i], jobs[i]) for i in best]
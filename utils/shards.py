@@ -0,0 +1,96 @@
+# utils/shards.py
+"""
+Sharded runs: `main.py run --shard i/N` fetches and filters only the orgs that
+rendezvous-hash to shard i and writes what it found to a gzip'd JSONL delta;
+`main.py merge` replays every delta into state/jobs.db and sends one digest.
+
+Rendezvous (highest-random-weight) hashing keeps assignments stable: going from
+N to N+1 shards moves only ~1/(N+1) of the orgs.
+
+Delta layout, one JSON object per line:
+  {"shard": i, "of": N, "created": "..."}                    header
+  {"key": "greenhouse:acme", "seconds": 1.2, "fetched": 40,
+   "ids": [...], "matches": [{"job": {...}, "profiles": [...], "sig": [g, h]}],
+   "truncated": "page cap"}                                   (only when the listing was cut off)
+  {"key": ..., "error": "HTTPError 404", "message": "..."}   failed org
+  {"key": ..., "deferred": true}                             out of time
+  {"done": true, "skipped": [...]}                           trailer (absent = shard died)
+"""
+import gzip
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+SHARD_DIR = Path("state") / "shards"
+
+
+def parse_spec(spec: str):
+    """"2/4" -> (2, 4); shards are numbered 1..N."""
+    try:
+        i, n = (int(x) for x in str(spec).split("/"))
+    except ValueError:
+        raise ValueError(f"bad shard spec {spec!r}; expected i/N, e.g. 1/4")
+    if n < 1 or not 1 <= i <= n:
+        raise ValueError(f"bad shard spec {spec!r}; need 1 <= i <= N")
+    return i, n
+
+
+def _weight(shard: int, key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(f"{shard}|{key}".encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def shard_of(key: str, n: int) -> int:
+    """Owner (1..n) of a "source:org" key."""
+    return max(range(1, n + 1), key=lambda s: _weight(s, key))
+
+
+def delta_path(i: int, n: int) -> Path:
+    return SHARD_DIR / f"delta-{i}-of-{n}.jsonl.gz"
+
+
+class DeltaWriter:
+    """Per-shard delta; written to a .part file and renamed once complete."""
+
+    def __init__(self, i: int, n: int, path=None):
+        self.path = Path(path) if path else delta_path(i, n)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp = self.path.with_name(self.path.name + ".part")
+        self._fh = gzip.open(self._tmp, "wt", encoding="utf-8")
+        self.orgs = 0
+        self._line({"shard": i, "of": n, "created": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")})
+
+    def _line(self, obj):
+        self._fh.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def org(self, key, **fields):
+        self.orgs += 1
+        self._line({"key": key, **fields})
+
+    def close(self, skipped=()):
+        self._line({"done": True, "skipped": list(skipped)})
+        self._fh.close()
+        self._tmp.replace(self.path)
+        return self.path
+
+
+def list_deltas():
+    return sorted(SHARD_DIR.glob("delta-*.jsonl.gz"))
+
+
+def read_delta(path):
+    """(header, [org records], trailer or None)."""
+    header, orgs, trailer = {}, [], None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for n, line in enumerate(fh):
+                rec = json.loads(line)
+                if n == 0:
+                    header = rec
+                elif rec.get("done"):
+                    trailer = rec
+                else:
+                    orgs.append(rec)
+    except (EOFError, OSError, ValueError) as e:  # truncated upload: keep what was complete
+        print(f"[merge] {path}: stopped reading at a damaged record ({e})")
+    return header, orgs, trailer
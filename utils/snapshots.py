@@ -0,0 +1,84 @@
+# utils/snapshots.py
+"""
+Compressed line-delimited archive of every normalized posting a run fetched,
+so filter changes can be previewed offline (`python main.py refilter`).
+
+Files live in state/snapshots/<UTC stamp>.jsonl.zst (or .jsonl.gz when the
+optional zstandard package is missing). Each line is one posting plus "_key"
+("source:org").
+"""
+import io
+import gzip
+import json
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SNAP_DIR = Path("state") / "snapshots"
+
+
+def _open_write(path: Path, zst: bool):
+    if zst:
+        raw = open(path, "wb")
+        return io.TextIOWrapper(zstandard.ZstdCompressor(level=6).stream_writer(raw), encoding="utf-8")
+    return gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+
+
+def _open_read(path: Path):
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} is zstd-compressed; pip install zstandard")
+        raw = open(path, "rb")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw), encoding="utf-8")
+    return gzip.open(path, "rt", encoding="utf-8")
+
+
+class SnapshotWriter:
+    def __init__(self, directory=SNAP_DIR, stamp=None):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = stamp or datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        ext = ".jsonl.zst" if zstandard is not None else ".jsonl.gz"
+        self.path = directory / f"{stamp}{ext}"
+        self._tmp = self.path.with_name(self.path.name + ".part")  # renamed on close()
+        self._f = _open_write(self._tmp, zst=zstandard is not None)
+        self.count = 0
+
+    def write(self, key, jobs):
+        for j in jobs:
+            rec = dict(j)
+            rec["_key"] = key
+            self._f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+            self._f.write("\n")
+            self.count += 1
+
+    def close(self):
+        self._f.close()
+        self._tmp.replace(self.path)
+        return self.path
+
+
+def list_snapshots(directory=SNAP_DIR):
+    """Snapshot files, oldest first."""
+    d = Path(directory)
+    if not d.exists():
+        return []
+    return sorted(p for p in d.iterdir() if p.name.endswith((".jsonl.gz", ".jsonl.zst")))
+
+
+def iter_snapshot(path):
+    """Stream postings from one snapshot file (constant memory)."""
+    with _open_read(Path(path)) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def prune_snapshots(keep: int, directory=SNAP_DIR):
+    files = list_snapshots(directory)
+    for p in files[:max(0, len(files) - int(keep))]:
+        p.unlink(missing_ok=True)